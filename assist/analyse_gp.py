@@ -1,12 +1,11 @@
 """
 # Author: Yinghao Li
-# Modified: November 4th, 2023
+# Modified: October 17th, 2026
 # ---------------------------------------
 # Description: Test table understanding on cell content retrieval.
 """
 
 import os.path as osp
-import re
 import json
 import sys
 import logging
@@ -17,16 +16,10 @@ from dataclasses import dataclass, field
 
 from src.argparser import ArgumentParser
 from src.io import set_logging, logging_args
-from src.game import MineField, ActionFeedback
+from src.game import ActionFeedback, replay_histories
 
 logger = logging.getLogger(__name__)
 
-action_type_map = {
-    "L": "left_click",
-    "M": "middle_click",
-    "R": "right_click",
-}
-
 
 @dataclass
 class Arguments:
@@ -39,6 +32,9 @@ class Arguments:
     result_dir: str = field(
         default="./output/board-solve", metadata={"help": "where the experiment results are saved."}
     )
+    replay_cache_dir: str = field(
+        default=None, metadata={"help": "where to cache the replayed game states. No caching if not specified."}
+    )
 
 
 def main(args: Arguments):
@@ -49,23 +45,32 @@ def main(args: Arguments):
     n_repeat = 0
     n_boards = 0
     n_flagged_mines = 0
+    n_mines = 0
     valid_actions = list()
 
-    for result_path in tqdm(glob.glob(osp.join(args.result_dir, "*.json"))):
-        file_name = osp.basename(result_path)
-        data_path = osp.join(args.data_dir, file_name)
+    file_names = list()
+    action_histories = list()
+    for result_path in glob.glob(osp.join(args.result_dir, "*.json")):
         with open(result_path, "r", encoding="utf-8") as f:
             result_dict = json.load(f)
         conversation = result_dict["conversation"]
         with open(result_path.replace(".json", ".txt"), "w", encoding="utf-8") as f:
             f.write(conversation)
 
-        action_history = result_dict["action_history"]
-        m = MineField(strict_winning_condition=True).load_board(data_path)
+        file_names.append(osp.basename(result_path))
+        action_histories.append(result_dict["action_history"])
+
+    data_paths = [osp.join(args.data_dir, file_name) for file_name in file_names]
+    for data_path in data_paths:
+        with open(data_path, "r", encoding="utf-8") as f:
+            n_mines += json.load(f)["n_mines"]
+    replays = replay_histories(
+        data_paths, action_histories, cache_dir=args.replay_cache_dir, strict_winning_condition=True
+    )
 
+    for file_name, action_history, replay in zip(tqdm(file_names), action_histories, replays):
         for idx, action in enumerate(action_history):
-            parsed_action = parse_action_str(action)
-            feedback = getattr(m, f"on_{action_type_map[parsed_action[0]]}")(*parsed_action[1:])
+            feedback = replay.feedback(idx)
 
             if idx == 0:
                 continue
@@ -82,7 +87,7 @@ def main(args: Arguments):
         n_actions += len(action_history) - 1
         n_repeat += len(action_history) - len(set(action_history))
         n_boards += 1
-        n_flagged_mines += m.n_correctly_flagged_mines
+        n_flagged_mines += replay.n_correctly_flagged_mines()
 
     logger.info(f"Total number of actions: {n_actions}")
     logger.info(f"Total number of valid actions: {n_valid_actions}, ratio: {n_valid_actions / n_actions:.3f}")
@@ -90,27 +95,13 @@ def main(args: Arguments):
     logger.info(f"Total number of wins: {n_win}, ratio: {n_win / n_boards:.3f}")
     logger.info(f"Total number of game overs: {n_game_over}, ratio: {n_game_over / n_boards:.3f}")
     logger.info(f"Total number of boards: {n_boards}")
-    logger.info(
-        f"Total number of flagged mines: {n_flagged_mines}, ratio: {n_flagged_mines / (n_boards*m.n_mines):.3f}"
-    )
+    logger.info(f"Total number of flagged mines: {n_flagged_mines}, ratio: {n_flagged_mines / n_mines:.3f}")
     valid_action_str = "\n".join(valid_actions)
     # logger.info(f"Valid actions: \n{valid_action_str}")
 
     return None
 
 
-def parse_action_str(action_str: str) -> str:
-    action_str = action_str.strip()
-    match_result = re.search(r"([LMR]) *\(( *\d+) *, *(\d+) *\)", action_str)
-    try:
-        action, row_idx, col_idx = match_result.groups()
-    except (AttributeError, TypeError):
-        # TODO: this can be improved to provide feedback to GPT
-        raise ValueError("Invalid response format.")
-
-    return action, int(row_idx), int(col_idx)
-
-
 if __name__ == "__main__":
     _time = datetime.now().strftime("%m.%d.%y-%H.%M")
     _current_file_name = osp.basename(__file__)
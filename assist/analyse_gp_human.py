@@ -1,12 +1,11 @@
 """
 # Author: Yinghao Li
-# Modified: November 9th, 2023
+# Modified: October 17th, 2026
 # ---------------------------------------
 # Description: Test table understanding on cell content retrieval.
 """
 
 import os.path as osp
-import re
 import json
 import sys
 import logging
@@ -17,16 +16,10 @@ from dataclasses import dataclass, field
 
 from src.argparser import ArgumentParser
 from src.io import set_logging, logging_args
-from src.game import MineField, ActionFeedback
+from src.game import ActionFeedback, replay_histories
 
 logger = logging.getLogger(__name__)
 
-action_type_map = {
-    "L": "left_click",
-    "M": "middle_click",
-    "R": "right_click",
-}
-
 
 @dataclass
 class Arguments:
@@ -36,6 +29,9 @@ class Arguments:
 
     # --- IO arguments ---
     data_dir: str = field(default="./data/", metadata={"help": "where the (to-be-)labeled dataset is saved."})
+    replay_cache_dir: str = field(
+        default=None, metadata={"help": "where to cache the replayed game states. No caching if not specified."}
+    )
 
 
 def main(args: Arguments):
@@ -46,18 +42,24 @@ def main(args: Arguments):
     n_repeat = 0
     n_boards = 0
     n_flagged_mines = 0
+    n_mines = 0
     valid_actions = list()
 
-    for data_path in tqdm(glob.glob(osp.join(args.data_dir, "*.json"))):
+    data_paths = glob.glob(osp.join(args.data_dir, "*.json"))
+    action_histories = list()
+    for data_path in data_paths:
         with open(data_path, "r", encoding="utf-8") as f:
             result_dict = json.load(f)
+        action_histories.append(result_dict["action_history"])
+        n_mines += result_dict["n_mines"]
 
-        action_history = result_dict["action_history"]
-        m = MineField(strict_winning_condition=True).load_board(data_path)
+    replays = replay_histories(
+        data_paths, action_histories, cache_dir=args.replay_cache_dir, strict_winning_condition=True
+    )
 
+    for action_history, replay in zip(tqdm(action_histories), replays):
         for idx, action in enumerate(action_history):
-            parsed_action = parse_action_str(action)
-            feedback = getattr(m, f"on_{action_type_map[parsed_action[0]]}")(*parsed_action[1:])
+            feedback = replay.feedback(idx)
 
             if idx == 0:
                 continue
@@ -73,7 +75,7 @@ def main(args: Arguments):
         n_actions += len(action_history) - 1
         n_repeat += len(action_history) - len(set(action_history))
         n_boards += 1
-        n_flagged_mines += m.n_correctly_flagged_mines
+        n_flagged_mines += replay.n_correctly_flagged_mines()
 
     logger.info(f"Total number of actions: {n_actions}")
     logger.info(f"Total number of valid actions: {n_valid_actions}, ratio: {n_valid_actions / n_actions:.3f}")
@@ -81,25 +83,11 @@ def main(args: Arguments):
     logger.info(f"Total number of wins: {n_win}, ratio: {n_win / n_boards:.3f}")
     logger.info(f"Total number of game overs: {n_game_over}, ratio: {n_game_over / n_boards:.3f}")
     logger.info(f"Total number of boards: {n_boards}")
-    logger.info(
-        f"Total number of flagged mines: {n_flagged_mines}, ratio: {n_flagged_mines / (n_boards*m.n_mines):.3f}"
-    )
+    logger.info(f"Total number of flagged mines: {n_flagged_mines}, ratio: {n_flagged_mines / n_mines:.3f}")
 
     return None
 
 
-def parse_action_str(action_str: str) -> str:
-    action_str = action_str.strip()
-    match_result = re.search(r"([LMR]) *\(( *\d+) *, *(\d+) *\)", action_str)
-    try:
-        action, row_idx, col_idx = match_result.groups()
-    except (AttributeError, TypeError):
-        # TODO: this can be improved to provide feedback to GPT
-        raise ValueError("Invalid response format.")
-
-    return action, int(row_idx), int(col_idx)
-
-
 if __name__ == "__main__":
     _time = datetime.now().strftime("%m.%d.%y-%H.%M")
     _current_file_name = osp.basename(__file__)
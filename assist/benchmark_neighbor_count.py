@@ -0,0 +1,101 @@
+"""
+# Author: Yinghao Li
+# Modified: October 16th, 2026
+# ---------------------------------------
+# Description: Benchmark per-cell and whole-board neighbor mine counting.
+"""
+
+import os.path as op
+import sys
+import time
+import logging
+import numpy as np
+from datetime import datetime
+from dataclasses import dataclass, field
+
+from src.argparser import ArgumentParser
+from src.io import set_logging, logging_args
+from src.game import MineField, count_neighbors
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class Arguments:
+    """
+    Arguments regarding the neighbor counting benchmark
+    """
+
+    board_sizes: list[str] = field(
+        default_factory=lambda: ["5x5", "9x9", "30x16", "1000x1000"],
+        metadata={"help": "Board sizes to benchmark, formatted as `{n_rows}x{n_cols}`."},
+    )
+    mine_density: float = field(default=0.15, metadata={"help": "Fraction of cells containing mines."})
+    n_repeats: int = field(default=20, metadata={"help": "Number of timed repeats for each board size."})
+    max_per_cell_cells: int = field(
+        default=10000, metadata={"help": "Run the per-cell baseline only once on boards larger than this."}
+    )
+    seed: int = field(default=42, metadata={"help": "Random seed."})
+    log_path: str = field(default=None, metadata={"help": "Path to save the log file."})
+
+
+def per_cell_counts(m: MineField) -> np.ndarray:
+    counts = np.empty((m.n_rows, m.n_cols), dtype=np.uint8)
+    for i in range(m.n_rows):
+        for j in range(m.n_cols):
+            counts[i, j] = m.count_mines(i, j)
+    return counts
+
+
+def time_func(func, n_repeats: int) -> float:
+    start = time.perf_counter()
+    for _ in range(n_repeats):
+        func()
+    return (time.perf_counter() - start) / n_repeats
+
+
+def main(args: Arguments):
+    for board_size in args.board_sizes:
+        n_rows, n_cols = (int(n) for n in board_size.split("x"))
+        n_mines = max(1, int(n_rows * n_cols * args.mine_density))
+
+        m = MineField(n_rows, n_cols, n_mines, seed=args.seed).place_mines()
+
+        assert np.array_equal(per_cell_counts(m), count_neighbors(m.board_mine)), "Neighbor counts mismatch!"
+
+        n_per_cell_repeats = 1 if n_rows * n_cols > args.max_per_cell_cells else args.n_repeats
+        per_cell_time = time_func(lambda: per_cell_counts(m), n_per_cell_repeats)
+        kernel_time = time_func(lambda: count_neighbors(m.board_mine), args.n_repeats)
+        infer_time = time_func(m.infer_board, args.n_repeats)
+
+        logger.info(
+            f"{board_size:>10} ({n_mines} mines): per-cell {per_cell_time * 1e3:10.3f} ms, "
+            f"kernel {kernel_time * 1e3:8.3f} ms, infer_board {infer_time * 1e3:8.3f} ms, "
+            f"speedup {per_cell_time / kernel_time:8.1f}x"
+        )
+
+    return None
+
+
+if __name__ == "__main__":
+    _time = datetime.now().strftime("%m.%d.%y-%H.%M")
+    _current_file_name = op.basename(__file__)
+    if _current_file_name.endswith(".py"):
+        _current_file_name = _current_file_name[:-3]
+
+    # --- set up arguments ---
+    parser = ArgumentParser(Arguments)
+    if len(sys.argv) == 2 and sys.argv[1].endswith(".json"):
+        # If we pass only one argument to the script, and it's the path to a json file,
+        # let's parse it to get our arguments.
+        (arguments,) = parser.parse_json_file(json_file=op.abspath(sys.argv[1]))
+    else:
+        (arguments,) = parser.parse_args_into_dataclasses()
+
+    if not getattr(arguments, "log_path", None):
+        arguments.log_path = op.join("./logs", f"{_current_file_name}", f"{_time}.log")
+
+    set_logging(log_path=arguments.log_path)
+    logging_args(arguments)
+
+    main(args=arguments)
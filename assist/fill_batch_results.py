@@ -0,0 +1,77 @@
+"""
+# Author: Yinghao Li
+# Modified: October 16th, 2026
+# ---------------------------------------
+# Description: Local stand-in for the batch endpoint that answers a batch request file.
+"""
+
+import os.path as op
+import sys
+import logging
+from datetime import datetime
+from dataclasses import dataclass, field
+
+from src.argparser import ArgumentParser
+from src.io import set_logging, logging_args
+from src.gpt import load_gpt_resources
+from src.backend import OpenAIBackend, MockBackend
+from src.batch import fill_batch_results
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class Arguments:
+    """
+    Arguments regarding the batch result filling
+    """
+
+    batch_requests_path: str = field(default=None, metadata={"help": "the batch request file to answer."})
+    batch_results_path: str = field(default=None, metadata={"help": "where to write the batch result file."})
+    gpt_backend: str = field(
+        default="mock", metadata={"help": "`mock` to answer with `mock_responses`, or `openai` to call the api."}
+    )
+    gpt_resource_path: str = field(
+        default="./resources/gpt35.16k.json",
+        metadata={"help": "path to the GPT resource file of the `openai` backend."},
+    )
+    mock_responses: list[str] = field(
+        default_factory=lambda: ["ANSWER: 1"], metadata={"help": "responses the `mock` backend serves in turn."}
+    )
+    log_path: str = field(default=None, metadata={"help": "Path to save the log file."})
+
+
+def main(args: Arguments):
+    if args.gpt_backend == "openai":
+        backend = OpenAIBackend(load_gpt_resources(args.gpt_resource_path))
+    elif args.gpt_backend == "mock":
+        backend = MockBackend(args.mock_responses)
+    else:
+        raise ValueError(f"Unsupported batch backend: {args.gpt_backend}")
+
+    fill_batch_results(args.batch_requests_path, args.batch_results_path, backend)
+    return None
+
+
+if __name__ == "__main__":
+    _time = datetime.now().strftime("%m.%d.%y-%H.%M")
+    _current_file_name = op.basename(__file__)
+    if _current_file_name.endswith(".py"):
+        _current_file_name = _current_file_name[:-3]
+
+    # --- set up arguments ---
+    parser = ArgumentParser(Arguments)
+    if len(sys.argv) == 2 and sys.argv[1].endswith(".json"):
+        # If we pass only one argument to the script, and it's the path to a json file,
+        # let's parse it to get our arguments.
+        (arguments,) = parser.parse_json_file(json_file=op.abspath(sys.argv[1]))
+    else:
+        (arguments,) = parser.parse_args_into_dataclasses()
+
+    if not getattr(arguments, "log_path", None):
+        arguments.log_path = op.join("./logs", f"{_current_file_name}", f"{_time}.log")
+
+    set_logging(log_path=arguments.log_path)
+    logging_args(arguments)
+
+    main(args=arguments)
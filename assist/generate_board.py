@@ -1,6 +1,6 @@
 """
 # Author: Yinghao Li
-# Modified: October 14th, 2023
+# Modified: October 16th, 2026
 # ---------------------------------------
 # Description: Generate Minesweeper boards for future use.
 """
@@ -15,7 +15,8 @@ from tqdm.auto import tqdm
 
 from src.argparser import ArgumentParser
 from src.io import set_logging, logging_args, init_dir
-from src.game import MineField
+from src.game import MineField, PackedMineField, BatchMineField
+from src.game.batch import LEFT_CLICK
 
 logger = logging.getLogger(__name__)
 
@@ -34,12 +35,23 @@ class Arguments:
     output_dir: str = field(default="./data/", metadata={"help": "where to save constructed dataset."})
     log_path: str = field(default=None, metadata={"help": "Path to save the log file."})
     overwrite_output: bool = field(default=False, metadata={"help": "Whether overwrite existing outputs."})
+    use_packed_engine: bool = field(
+        default=False, metadata={"help": "whether to use the bit-packed game engine instead of string boards."}
+    )
+    legacy_placement: bool = field(
+        default=False, metadata={"help": "whether to reproduce the legacy mine layouts of the boards in `data/`."}
+    )
+    use_batch_engine: bool = field(
+        default=False, metadata={"help": "whether to make the first clicks of all boards in one batched step."}
+    )
 
     def __post_init__(self):
         self.output_dir = op.join(self.output_dir, f"{self.n_rows}x{self.n_cols}-{self.n_mines}")
 
 
 def main(args: Arguments):
+    mine_field_cls = PackedMineField if args.use_packed_engine else MineField
+
     init_dir(args.output_dir, clear_original_content=args.overwrite_output)
     init_dir(op.join(args.output_dir, "01-10"), clear_original_content=args.overwrite_output)
     init_dir(op.join(args.output_dir, "10-20"), clear_original_content=args.overwrite_output)
@@ -48,27 +60,42 @@ def main(args: Arguments):
     init_dir(op.join(args.output_dir, "40-inf"), clear_original_content=args.overwrite_output)
 
     board_cache = np.array([], dtype=bool).reshape(0, args.n_rows, args.n_cols)
+    first_click = (int(np.ceil(args.n_rows / 2)), int(np.ceil(args.n_cols / 2)))
+
+    if args.use_batch_engine:
+        batch = BatchMineField(
+            args.n_board, args.n_rows, args.n_cols, args.n_mines, legacy_placement=args.legacy_placement
+        )
+        batch.step(np.full(args.n_board, LEFT_CLICK), *(np.full(args.n_board, idx) for idx in first_click))
+        batch_n_revealed_cells = batch.n_revealed_cells.tolist()
 
     for seed in tqdm(range(args.n_board)):
-        m = MineField(args.n_rows, args.n_cols, args.n_mines, seed=seed)
-        m.on_left_click(int(np.ceil(args.n_rows / 2)), int(np.ceil(args.n_cols / 2)))
+        m = mine_field_cls(
+            args.n_rows, args.n_cols, args.n_mines, seed=seed, legacy_placement=args.legacy_placement
+        )
+        if args.use_batch_engine:
+            m.board_mine = batch.board_mine[seed]
+            n_revealed_cells = batch_n_revealed_cells[seed]
+        else:
+            m.on_left_click(*first_click)
+            n_revealed_cells = m.n_revealed_cells
 
         if np.any(np.all(m.board_mine == board_cache, axis=(1, 2))):
             continue
         board_cache = np.vstack([board_cache, np.expand_dims(m.board_mine, axis=0)])
 
-        if m.n_revealed_cells >= 40:
+        if n_revealed_cells >= 40:
             sub_dir = "40-inf"
-        elif m.n_revealed_cells >= 30:
+        elif n_revealed_cells >= 30:
             sub_dir = "30-40"
-        elif m.n_revealed_cells >= 20:
+        elif n_revealed_cells >= 20:
             sub_dir = "20-30"
-        elif m.n_revealed_cells >= 10:
+        elif n_revealed_cells >= 10:
             sub_dir = "10-20"
         else:
             sub_dir = "01-10"
 
-        m.save_board(op.join(args.output_dir, sub_dir, f"{seed:03d}.json"), additional_addribute="n_revealed_cells")
+        m.save_board(op.join(args.output_dir, sub_dir, f"{seed:03d}.json"), n_revealed_cells=n_revealed_cells)
 
     logger.info("Done.")
     return None
@@ -0,0 +1,77 @@
+"""
+# Author: Yinghao Li
+# Modified: October 16th, 2026
+# ---------------------------------------
+# Description: Write the plain-text transcripts of played games from their outputs or journals.
+"""
+
+import os.path as op
+import sys
+import glob
+import json
+import logging
+from datetime import datetime
+from dataclasses import dataclass, field
+
+from src.argparser import ArgumentParser
+from src.io import set_logging, logging_args
+from src.journal import read_journal, journal_transcript
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class Arguments:
+    """
+    Arguments regarding the transcript writing
+    """
+
+    output_dir: str = field(default="./output/board-solve/", metadata={"help": "where the games are saved."})
+    overwrite: bool = field(default=False, metadata={"help": "whether to overwrite the existing transcripts."})
+    log_path: str = field(default=None, metadata={"help": "Path to save the log file."})
+
+
+def main(args: Arguments):
+    # finished games have an output; the journal of an unfinished game is its only record
+    paths = sorted(glob.glob(op.join(args.output_dir, "*.json")) + glob.glob(op.join(args.output_dir, "*.jsonl")))
+    for path in paths:
+        stem, ext = op.splitext(path)
+        if ext == ".jsonl" and op.exists(f"{stem}.json"):
+            continue
+        txt_path = f"{stem}.txt"
+        if op.exists(txt_path) and not args.overwrite:
+            continue
+
+        if ext == ".jsonl":
+            transcript = journal_transcript(read_journal(path))
+        else:
+            with open(path, "r", encoding="utf-8") as f:
+                transcript = json.load(f)["conversation"]
+        with open(txt_path, "w", encoding="utf-8") as f:
+            f.write(transcript)
+        logger.info(f"Transcript of {path} is written to {txt_path}.")
+    return None
+
+
+if __name__ == "__main__":
+    _time = datetime.now().strftime("%m.%d.%y-%H.%M")
+    _current_file_name = op.basename(__file__)
+    if _current_file_name.endswith(".py"):
+        _current_file_name = _current_file_name[:-3]
+
+    # --- set up arguments ---
+    parser = ArgumentParser(Arguments)
+    if len(sys.argv) == 2 and sys.argv[1].endswith(".json"):
+        # If we pass only one argument to the script, and it's the path to a json file,
+        # let's parse it to get our arguments.
+        (arguments,) = parser.parse_json_file(json_file=op.abspath(sys.argv[1]))
+    else:
+        (arguments,) = parser.parse_args_into_dataclasses()
+
+    if not getattr(arguments, "log_path", None):
+        arguments.log_path = op.join("./logs", f"{_current_file_name}", f"{_time}.log")
+
+    set_logging(log_path=arguments.log_path)
+    logging_args(arguments)
+
+    main(args=arguments)
@@ -0,0 +1,162 @@
+"""
+# Author: Yinghao Li
+# Modified: October 16th, 2026
+# ---------------------------------------
+# Description: Measure the prompt size of every board encoding along simulated games.
+"""
+
+import os.path as op
+import sys
+import glob
+import logging
+import numpy as np
+from datetime import datetime
+from dataclasses import dataclass, field
+
+from src.argparser import ArgumentParser
+from src.io import set_logging, logging_args, save_json
+from src.game import MineField, COORDINATE_ENCODINGS
+
+try:
+    import tiktoken
+except ImportError:
+    tiktoken = None
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class Arguments:
+    """
+    Arguments regarding the board encoding measurement
+    """
+
+    board_path_or_dir: str = field(
+        default=None, metadata={"help": "Board file or directory of board files. Use `board_specs` if not specified."}
+    )
+    board_specs: list[str] = field(
+        default_factory=lambda: ["5x5-4", "9x9-10", "16x16-40", "16x30-99"],
+        metadata={"help": "Boards to generate, formatted as `{n_rows}x{n_cols}-{n_mines}`."},
+    )
+    n_boards: int = field(default=20, metadata={"help": "Number of generated boards per board spec."})
+    progress_levels: list[float] = field(
+        default_factory=lambda: [0.1, 0.25, 0.5, 0.75, 0.9],
+        metadata={"help": "Fractions of revealed safe cells at which the board encodings are measured."},
+    )
+    tokenizer: str = field(default="cl100k_base", metadata={"help": "`tiktoken` encoding used to count tokens."})
+    seed: int = field(default=42, metadata={"help": "Random seed."})
+    output_path: str = field(default=None, metadata={"help": "Where to save the measurements as json."})
+    log_path: str = field(default=None, metadata={"help": "Path to save the log file."})
+
+
+def load_boards(args: Arguments) -> dict[str, list[MineField]]:
+    boards = dict()
+    if args.board_path_or_dir is not None:
+        if op.isdir(args.board_path_or_dir):
+            board_paths = sorted(glob.glob(op.join(args.board_path_or_dir, "**", "*.json"), recursive=True))
+        else:
+            board_paths = [args.board_path_or_dir]
+        for board_path in board_paths:
+            m = MineField().load_board(board_path)
+            boards.setdefault(f"{m.n_rows}x{m.n_cols}-{m.n_mines}", list()).append(m)
+        return boards
+
+    for board_spec in args.board_specs:
+        board_size, n_mines = board_spec.split("-")
+        n_rows, n_cols = (int(n) for n in board_size.split("x"))
+        boards[board_spec] = [
+            MineField(n_rows, n_cols, int(n_mines), seed=args.seed + idx).place_mines() for idx in range(args.n_boards)
+        ]
+    return boards
+
+
+def board_encodings(m: MineField) -> dict[str, str]:
+    encodings = {"table": m.to_str_table(with_row_column_ids=True)}
+    for encoding in COORDINATE_ENCODINGS:
+        encodings[f"coordinate-{encoding}"] = m.to_dict_table(encoding)
+    return encodings
+
+
+def simulate_progress(m: MineField, progress_levels: list[float], rng: np.random.Generator) -> list[dict[str, str]]:
+    """
+    Reveal random safe cells and collect the board encodings whenever a progress level is reached.
+    """
+    n_safe_cells = m.n_rows * m.n_cols - m.n_mines
+    safe_cells = np.argwhere(~m.board_mine)
+    m.on_left_click(*(safe_cells[rng.integers(len(safe_cells))] + 1))
+
+    snapshots = list()
+    for level in sorted(progress_levels):
+        while m.n_revealed_cells < level * n_safe_cells and not m.game_over:
+            unopened = np.argwhere(~m.board_mine & (m.board_disp == m.unchecked_cell))
+            if not len(unopened):
+                break
+            m.on_left_click(*(unopened[rng.integers(len(unopened))] + 1))
+        snapshots.append(board_encodings(m))
+    return snapshots
+
+
+def main(args: Arguments):
+    if tiktoken is None:
+        logger.warning("`tiktoken` is not installed; only the character counts are measured.")
+        encoder = None
+    else:
+        encoder = tiktoken.get_encoding(args.tokenizer)
+
+    rng = np.random.default_rng(args.seed)
+    results = dict()
+    for board_spec, mine_fields in load_boards(args).items():
+        n_chars = dict()
+        n_tokens = dict()
+        for m in mine_fields:
+            for level, encodings in zip(sorted(args.progress_levels), simulate_progress(m, args.progress_levels, rng)):
+                for name, text in encodings.items():
+                    n_chars.setdefault(name, dict()).setdefault(level, list()).append(len(text))
+                    if encoder is not None:
+                        n_tokens.setdefault(name, dict()).setdefault(level, list()).append(len(encoder.encode(text)))
+
+        results[board_spec] = dict()
+        logger.info(f"Board {board_spec} ({len(mine_fields)} boards), mean size at each progress level:")
+        for name in n_chars:
+            results[board_spec][name] = {
+                str(level): {
+                    "n_chars": float(np.mean(n_chars[name][level])),
+                    "n_tokens": float(np.mean(n_tokens[name][level])) if encoder is not None else None,
+                }
+                for level in n_chars[name]
+            }
+            sizes = ", ".join(
+                f"{level:.2f}: {v['n_chars']:8.1f} chars"
+                + (f" / {v['n_tokens']:7.1f} tokens" if v["n_tokens"] is not None else "")
+                for level, v in zip(n_chars[name], results[board_spec][name].values())
+            )
+            logger.info(f"  {name:>20}  {sizes}")
+
+    if args.output_path is not None:
+        save_json(results, args.output_path, collapse_level=4)
+
+    return None
+
+
+if __name__ == "__main__":
+    _time = datetime.now().strftime("%m.%d.%y-%H.%M")
+    _current_file_name = op.basename(__file__)
+    if _current_file_name.endswith(".py"):
+        _current_file_name = _current_file_name[:-3]
+
+    # --- set up arguments ---
+    parser = ArgumentParser(Arguments)
+    if len(sys.argv) == 2 and sys.argv[1].endswith(".json"):
+        # If we pass only one argument to the script, and it's the path to a json file,
+        # let's parse it to get our arguments.
+        (arguments,) = parser.parse_json_file(json_file=op.abspath(sys.argv[1]))
+    else:
+        (arguments,) = parser.parse_args_into_dataclasses()
+
+    if not getattr(arguments, "log_path", None):
+        arguments.log_path = op.join("./logs", f"{_current_file_name}", f"{_time}.log")
+
+    set_logging(log_path=arguments.log_path)
+    logging_args(arguments)
+
+    main(args=arguments)
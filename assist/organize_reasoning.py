@@ -1,6 +1,6 @@
 """
 # Author: Yinghao Li
-# Modified: November 11th, 2023
+# Modified: October 16th, 2026
 # ---------------------------------------
 # Description: Test table understanding on cell content retrieval.
 """
@@ -18,15 +18,10 @@ from dataclasses import dataclass, field
 
 from src.argparser import ArgumentParser
 from src.io import set_logging, logging_args, init_dir
-from src.game import MineField, ActionFeedback
+from src.game import MineField, PackedMineField, ActionFeedback, replay_histories
 
 logger = logging.getLogger(__name__)
 
-action_type_map = {
-    "L": "left_click",
-    "M": "middle_click",
-    "R": "right_click",
-}
 n_rows = 5
 n_cols = 5
 unchecked_cell = "?"
@@ -64,27 +59,37 @@ class Arguments:
         default="./output/board-solve", metadata={"help": "where the experiment results are saved."}
     )
     tgt_dir: str = field(default="./output/reasoning", metadata={"help": "where organized results are saved."})
+    use_packed_engine: bool = field(
+        default=False, metadata={"help": "whether to use the bit-packed game engine instead of string boards."}
+    )
+    replay_cache_dir: str = field(
+        default=None, metadata={"help": "where to cache the replayed game states. No caching if not specified."}
+    )
 
 
 def main(args: Arguments):
+    mine_field_cls = PackedMineField if args.use_packed_engine else MineField
+
     selected_boards = list()
     n_valid_actions_list = list()
 
     result_paths = glob.glob(osp.join(args.result_dir, "*.json"))
-    for result_path in tqdm(result_paths):
+    action_histories = list()
+    for result_path in result_paths:
         with open(result_path, "r", encoding="utf-8") as f:
             result_dict = json.load(f)
+        action_histories.append(result_dict["action_history"])
 
-        file_name = osp.basename(result_path)
-        data_path = osp.join(args.data_dir, file_name)
-
-        action_history = result_dict["action_history"]
-        m = MineField(strict_winning_condition=True).load_board(data_path)
+    data_paths = [osp.join(args.data_dir, osp.basename(result_path)) for result_path in result_paths]
+    replays = replay_histories(
+        data_paths, action_histories, cache_dir=args.replay_cache_dir, strict_winning_condition=True
+    )
+    result_replays = dict(zip(result_paths, replays))
 
+    for result_path, replay in zip(tqdm(result_paths), replays):
         n_valid_actions = 0
-        for idx, action in enumerate(action_history):
-            parsed_action = parse_action_str(action)
-            feedback = getattr(m, f"on_{action_type_map[parsed_action[0]]}")(*parsed_action[1:])
+        for idx in range(len(replay)):
+            feedback = replay.feedback(idx)
 
             if idx == 0:
                 continue
@@ -108,11 +113,10 @@ def main(args: Arguments):
             result_dict = json.load(f)
 
         file_name = osp.basename(result_path)
-        data_path = osp.join(args.data_dir, file_name)
         output_path = osp.join(args.tgt_dir, file_name.replace(".json", ".txt"))
         if osp.exists(output_path):
             continue
-        m = MineField(strict_winning_condition=True).load_board(data_path)
+        replay = result_replays[result_path]
 
         actions = result_dict["action_history"]
         if "responses" in result_dict:
@@ -125,10 +129,10 @@ def main(args: Arguments):
             if idx > 0:
                 conv += ">> USER:\n"
                 conv += feedback_to_prompt(actions[idx - 1], feedback)
+                m = replay.mine_field(idx, mine_field_cls, strict_winning_condition=True)
                 conv += f"--- CURRENT BOARD ---\n```\n{m.to_str_table()}\n```\n\n"
 
-            parsed_action = parse_action_str(action)
-            feedback = getattr(m, f"on_{action_type_map[parsed_action[0]]}")(*parsed_action[1:])
+            feedback = replay.feedback(idx)
 
             if idx == 0:
                 continue
@@ -150,18 +154,6 @@ def main(args: Arguments):
     return None
 
 
-def parse_action_str(action_str: str) -> tuple[str, int, int]:
-    action_str = action_str.strip()
-    match_result = re.search(r"([LMR]) *\(( *\d+) *, *(\d+) *\)", action_str)
-    try:
-        action, row_idx, col_idx = match_result.groups()
-    except (AttributeError, TypeError):
-        # TODO: this can be improved to provide feedback to GPT
-        raise ValueError("Invalid response format.")
-
-    return action, int(row_idx), int(col_idx)
-
-
 def feedback_to_prompt(action, feedback) -> str:
     if feedback == ActionFeedback.SUCCESS:
         return ""
@@ -1,12 +1,11 @@
 """
 # Author: Yinghao Li
-# Modified: October 25th, 2023
+# Modified: October 16th, 2026
 # ---------------------------------------
 # Description: Randomly sample progress boards from the original boards.
 """
 
 import os.path as op
-import re
 import json
 import sys
 import logging
@@ -18,17 +17,11 @@ from tqdm.auto import tqdm
 
 from src.argparser import ArgumentParser
 from src.io import set_logging, logging_args, init_dir, save_json
-from src.game import MineField, ActionFeedback
+from src.game import MineField, PackedMineField, ActionFeedback, replay_histories
 
 
 logger = logging.getLogger(__name__)
 
-action_type_map = {
-    "L": "left_click",
-    "M": "middle_click",
-    "R": "right_click",
-}
-
 
 @dataclass
 class Arguments:
@@ -43,13 +36,24 @@ class Arguments:
     )
     overwrite: bool = field(default=False, metadata={"help": "whether to overwrite existing boards."})
     seed: int = field(default=42, metadata={"help": "Random seed."})
+    use_packed_engine: bool = field(
+        default=False, metadata={"help": "whether to use the bit-packed game engine instead of string boards."}
+    )
+    replay_cache_dir: str = field(
+        default=None, metadata={"help": "where to cache the replayed game states. No caching if not specified."}
+    )
 
 
 def main(args: Arguments):
+    mine_field_cls = PackedMineField if args.use_packed_engine else MineField
+
     random.seed(args.seed)
     init_dir(args.output_dir, clear_original_content=False)
 
-    for board_path in tqdm(glob.glob(op.join(args.data_dir, "*"))):
+    board_paths = list()
+    board_dicts = list()
+    action_histories = list()
+    for board_path in glob.glob(op.join(args.data_dir, "*")):
         board_name = op.basename(board_path)
         output_board_path = op.join(args.output_dir, board_name)
         if op.exists(output_board_path) and not args.overwrite:
@@ -63,37 +67,31 @@ def main(args: Arguments):
         if len(board_dict.get("action_history", list())) == 0:
             continue
 
-        m = MineField()
-        m.load_board(board_path, load_action_history=True)
+        n_actions = max(1, random.randrange(len(board_dict["action_history"])))
 
-        n_actions = max(1, random.randrange(len(m.action_history)))
+        board_paths.append(board_path)
+        board_dicts.append(board_dict)
+        action_histories.append(board_dict["action_history"][:n_actions])
 
-        board_display = None
-        for action_idx in range(n_actions):
-            action = parse_action_str(m.action_history[action_idx])
-            feedback = getattr(m, f"on_{action_type_map[action[0]]}")(*action[1:])
-            if feedback != ActionFeedback.GAME_OVER:
-                board_display = m.str()
-            else:
+    replays = replay_histories(board_paths, action_histories, cache_dir=args.replay_cache_dir)
+
+    for board_path, board_dict, replay in zip(tqdm(board_paths), board_dicts, replays):
+        # stop at the first game over and keep the board before it
+        n_actions = len(replay)
+        for action_idx in range(len(replay)):
+            if replay.feedback(action_idx) == ActionFeedback.GAME_OVER:
                 n_actions = action_idx + 1
                 break
+        board_step = n_actions - 1 if replay.feedback(n_actions - 1) == ActionFeedback.GAME_OVER else n_actions
+
+        board_display = None
+        if board_step > 0:
+            board_display = replay.mine_field(board_step, mine_field_cls).to_str_table()
 
         board_dict["n_actions"] = n_actions
         board_dict["board_at_n_actions"] = board_display
 
-        save_json(board_dict, output_board_path, collapse_level=3)
-
-
-def parse_action_str(action_str: str):
-    action_str = action_str.strip()
-    match_result = re.search(r"([LMR]) *\(( *\d+) *, *(\d+) *\)", action_str)
-    try:
-        action, row_idx, col_idx = match_result.groups()
-    except (AttributeError, TypeError):
-        # TODO: this can be improved to provide feedback to GPT
-        raise ValueError("Invalid response format.")
-
-    return action, int(row_idx), int(col_idx)
+        save_json(board_dict, op.join(args.output_dir, op.basename(board_path)), collapse_level=3)
 
 
 if __name__ == "__main__":
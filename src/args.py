@@ -1,6 +1,6 @@
 """
 # Author: Yinghao Li
-# Modified: November 11th, 2023
+# Modified: October 16th, 2026
 # ---------------------------------------
 # Description: Base classes for arguments and configurations.
 """
@@ -38,18 +38,136 @@ class Arguments:
 
     gpt_resource_path: str = field(default="./resources/gpt35.16k.json", metadata={"help": "Path to GPT resources"})
     board_path_or_dir: str = field(default=None, metadata={"help": "Path to board file"})
+    gpt_cache_path: str = field(
+        default=None, metadata={"help": "path to the SQLite cache of GPT responses. No caching if not specified."}
+    )
+    gpt_cache_mode: str = field(
+        default="readwrite", metadata={"help": "response cache mode: `readwrite`, `readonly` or `bypass`."}
+    )
+    gpt_cache_max_age_days: Optional[float] = field(
+        default=None, metadata={"help": "drop cached responses older than this number of days."}
+    )
+    gpt_cache_max_size_mb: Optional[float] = field(
+        default=None, metadata={"help": "drop the least recently used responses beyond this cache size."}
+    )
+    gpt_requests_per_min: Optional[float] = field(
+        default=None, metadata={"help": "request quota per minute shared by all GPT calls of the process."}
+    )
+    gpt_tokens_per_min: Optional[float] = field(
+        default=None, metadata={"help": "token quota per minute shared by all GPT calls of the process."}
+    )
+    gpt_max_retries: int = field(
+        default=5, metadata={"help": "number of retries of a GPT call failed by rate limits or timeouts."}
+    )
+    gpt_retry_base_delay: float = field(
+        default=1.0, metadata={"help": "base delay in seconds of the jittered exponential retry backoff."}
+    )
+    gpt_backend: str = field(
+        default="openai", metadata={"help": "backend answering the GPT calls: `openai`, `replay` or `mock`."}
+    )
+    replay_dir: str = field(
+        default=None, metadata={"help": "output directory of the recorded games served by the `replay` backend."}
+    )
+    mock_latency: float = field(default=0.0, metadata={"help": "seconds the `mock` backend takes to respond."})
+    mock_latency_jitter: float = field(
+        default=0.0, metadata={"help": "maximum random deviation of the `mock` backend latency in seconds."}
+    )
+    mock_token_latency: float = field(
+        default=0.0, metadata={"help": "seconds the `mock` backend takes to generate each token."}
+    )
+    use_streaming: bool = field(
+        default=False,
+        metadata={"help": "whether to stream the responses and stop generating once the action line is complete."},
+    )
 
     strict_winning_condition: bool = field(default=False, metadata={"help": "Whether to use strict winning condition"})
     use_row_column_indices: bool = field(default=False, metadata={"help": "whether to use row and column indices."})
     use_compressed_history: bool = field(default=False, metadata={"help": "whether to use compressed history."})
+    context_policy: str = field(
+        default=None,
+        metadata={
+            "help": "how to fit the natural conversation in `max_context_tokens`: "
+            "`sliding_window`, `drop_boards` or `summarize`."
+        },
+    )
+    max_context_tokens: Optional[int] = field(
+        default=None, metadata={"help": "token budget of the natural conversation sent to GPT."}
+    )
+    history_max_actions: Optional[int] = field(
+        default=None,
+        metadata={"help": "number of latest actions listed in the compressed history; older ones are summarized."},
+    )
+    history_max_chars: Optional[int] = field(
+        default=None, metadata={"help": "character budget of the compressed history; older actions are summarized."}
+    )
     represent_board_as_coordinate: bool = field(
         default=False, metadata={"help": "whether to represent board as coordinate."}
     )
+    coordinate_encoding: str = field(
+        default="full",
+        metadata={
+            "help": "how to list the cells when representing board as coordinate: "
+            "`full` (every cell), `opened` (opened cells only), `rle` (runs of identical cells per row) "
+            "or `frontier` (flags and the border between opened and unopened cells)."
+        },
+    )
+    use_viewport: bool = field(
+        default=False,
+        metadata={
+            "help": "whether to show only windows around the frontier of the board, labeled with absolute "
+            "row and column indices, followed by a summary of the cells outside."
+        },
+    )
+    viewport_margin: int = field(default=2, metadata={"help": "number of cells shown around the frontier."})
+    viewport_max_windows: int = field(
+        default=3, metadata={"help": "maximum number of windows before they are merged into one."}
+    )
+    use_board_diff: bool = field(
+        default=False,
+        metadata={
+            "help": "whether to send only the changed cells instead of the full board between checkpoints "
+            "in the natural conversation mode."
+        },
+    )
+    board_diff_checkpoint_interval: int = field(
+        default=10,
+        metadata={
+            "help": "number of steps between two full boards when using board diffs; "
+            "only the first board is full if non-positive."
+        },
+    )
     no_example_1: bool = field(default=False, metadata={"help": "whether to exclude example 1."})
     no_example_2: bool = field(default=False, metadata={"help": "whether to exclude example 2."})
     no_example_3: bool = field(default=False, metadata={"help": "whether to exclude example 3."})
+    use_packed_engine: bool = field(
+        default=False, metadata={"help": "whether to use the bit-packed game engine instead of string boards."}
+    )
+    legacy_placement: bool = field(
+        default=False, metadata={"help": "whether to place mines with the legacy global-seed layouts."}
+    )
+
+    n_concurrent_games: int = field(
+        default=1, metadata={"help": "number of games played concurrently with the asynchronous client."}
+    )
 
     output_dir: str = field(default="./output/board-solve/", metadata={"help": "Output directory"})
+    run_summary_path: str = field(
+        default=None, metadata={"help": "where to save the aggregated GPT call statistics of the run."}
+    )
+    save_journal: bool = field(
+        default=True, metadata={"help": "append the messages and steps of each game to a `.jsonl` journal as played."}
+    )
+    journal_fsync: str = field(
+        default="step",
+        metadata={"help": "when to fsync the journal: `none` (flush only), after every `step`, or every `message`."},
+    )
+    checkpoint_interval: int = field(
+        default=10, metadata={"help": "save a checkpoint of each unfinished game every this many steps; 0 to disable."}
+    )
+    resume_games: bool = field(
+        default=True,
+        metadata={"help": "continue interrupted games from their checkpoints and journals instead of starting over."},
+    )
 
 
 @dataclass
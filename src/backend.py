@@ -0,0 +1,322 @@
+"""
+# Author: Yinghao Li
+# Modified: October 17th, 2026
+# ---------------------------------------
+# Description: Backends answering the completion requests of `GPT`.
+"""
+
+import re
+import json
+import time
+import random
+import asyncio
+import logging
+import os.path as osp
+import openai
+from typing import AsyncIterator, Callable, Iterator, Optional, Union
+
+from .limiter import count_tokens, estimate_prompt_tokens
+
+logger = logging.getLogger(__name__)
+
+__all__ = [
+    "Backend",
+    "OpenAIBackend",
+    "ReplayBackend",
+    "MockBackend",
+    "BACKENDS",
+    "build_backend",
+    "random_action_script",
+]
+
+BACKENDS = ("openai", "replay", "mock")
+
+# connection settings of the resource files that `openai` accepts per request
+OPENAI_REQUEST_SETTINGS = ("api_key", "api_base", "api_type", "api_version", "organization")
+
+
+class Backend:
+    """
+    Answers the completion requests built by `GPT.request_kwargs` with api-shaped responses.
+
+    `stream` and `astream` yield (text delta, finish reason) pairs as the response is generated, and stop
+    generating when the caller closes them. The finish reason is `None` until the last delta.
+    `cacheable` tells whether the responses may be stored in the response cache; the offline backends return
+    recorded or made-up text that must not be mistaken for model output later.
+    """
+
+    cacheable = True
+
+    def create(self, request_kwargs: dict) -> dict:
+        raise NotImplementedError
+
+    async def acreate(self, request_kwargs: dict) -> dict:
+        return self.create(request_kwargs)
+
+    def stream(self, request_kwargs: dict) -> Iterator[tuple[str, Optional[str]]]:
+        # without native streaming, the complete response is replayed in chunks
+        choice = self.create(request_kwargs)["choices"][0]
+        yield from stream_chunks(choice_text(choice), choice.get("finish_reason"))
+
+    async def astream(self, request_kwargs: dict) -> AsyncIterator[tuple[str, Optional[str]]]:
+        choice = (await self.acreate(request_kwargs))["choices"][0]
+        for chunk in stream_chunks(choice_text(choice), choice.get("finish_reason")):
+            yield chunk
+
+    def skip(self, n_requests: int) -> None:
+        """
+        Pass over the first `n_requests` requests, answered before a resumed game was interrupted.
+        """
+        return None
+
+
+class OpenAIBackend(Backend):
+    """
+    The `openai` api, with the connection settings of a resource file passed with every request instead of being
+    set on the `openai` module, so that backends with different settings can live in one process.
+    """
+
+    def __init__(self, resources: dict):
+        self.settings = {k: resources[k] for k in OPENAI_REQUEST_SETTINGS if resources.get(k)}
+
+    @staticmethod
+    def api(request_kwargs: dict):
+        return openai.Completion if "prompt" in request_kwargs else openai.ChatCompletion
+
+    def create(self, request_kwargs: dict) -> dict:
+        return self.api(request_kwargs).create(**request_kwargs, **self.settings)
+
+    async def acreate(self, request_kwargs: dict) -> dict:
+        return await self.api(request_kwargs).acreate(**request_kwargs, **self.settings)
+
+    def stream(self, request_kwargs: dict) -> Iterator[tuple[str, Optional[str]]]:
+        chunks = self.api(request_kwargs).create(**request_kwargs, stream=True, **self.settings)
+        try:
+            for chunk in chunks:
+                if chunk["choices"]:
+                    choice = chunk["choices"][0]
+                    yield choice_delta(choice), choice.get("finish_reason")
+        finally:
+            # drops the connection, so the server stops generating
+            chunks.close()
+
+    async def astream(self, request_kwargs: dict) -> AsyncIterator[tuple[str, Optional[str]]]:
+        chunks = await self.api(request_kwargs).acreate(**request_kwargs, stream=True, **self.settings)
+        try:
+            async for chunk in chunks:
+                if chunk["choices"]:
+                    choice = chunk["choices"][0]
+                    yield choice_delta(choice), choice.get("finish_reason")
+        finally:
+            await chunks.aclose()
+
+
+class ReplayBackend(Backend):
+    """
+    Serves the responses recorded in a `tasks/ms.py` output file in the order of the steps.
+
+    Each game has its own `GPT` and hence its own replay backend, so the n-th request is the n-th step.
+    """
+
+    cacheable = False
+
+    def __init__(self, responses: list[str], name: str = None):
+        self.responses = responses
+        self.name = name
+        self.step_idx = 0
+
+    @classmethod
+    def from_output(cls, output_path: str) -> "ReplayBackend":
+        """
+        Load the responses of a game output; older outputs without `responses` are read from the conversation.
+
+        `responses` leaves out a last response that failed to parse, which the conversation keeps.
+        """
+        with open(output_path, "r", encoding="utf-8") as f:
+            output_dict = json.load(f)
+
+        conversation_responses = [
+            content for role, content in split_conversation(output_dict["conversation"]) if role == "ASSISTANT"
+        ]
+        responses = output_dict.get("responses")
+        if responses is None:
+            responses = conversation_responses
+        elif conversation_responses and responses[-1:] != conversation_responses[-1:]:
+            responses = responses + conversation_responses[-1:]
+        return cls(responses, name=output_path)
+
+    @classmethod
+    def from_dir(cls, replay_dir: str, board_path: str) -> "ReplayBackend":
+        """
+        Load the recorded game on the board at `board_path` from an output directory of `tasks/ms.py`.
+        """
+        return cls.from_output(osp.join(replay_dir, osp.basename(board_path)))
+
+    def create(self, request_kwargs: dict) -> dict:
+        if self.step_idx >= len(self.responses):
+            # the recorded game ended here, e.g., at the step limit of its run
+            raise ValueError(f"{self.name} has no recorded response of step {self.step_idx + 1}.")
+        response = self.responses[self.step_idx]
+        self.step_idx += 1
+        return completion_dict(request_kwargs, response)
+
+    def skip(self, n_requests: int) -> None:
+        self.step_idx += n_requests
+        return None
+
+
+class MockBackend(Backend):
+    """
+    Scripted backend answering after a configurable latency, for profiling and load-testing without the api.
+
+    `script` is a list of responses served in turn (and then from the start again), or a function from the
+    request to the response. A response takes `latency` (give or take `latency_jitter`) seconds to start and
+    `token_latency` seconds per generated token.
+    """
+
+    cacheable = False
+
+    def __init__(
+        self,
+        script: Union[list[str], Callable[[dict], str]],
+        latency: float = 0.0,
+        latency_jitter: float = 0.0,
+        token_latency: float = 0.0,
+        seed: int = None,
+    ):
+        self.script = script
+        self.latency = latency
+        self.latency_jitter = latency_jitter
+        self.token_latency = token_latency
+        self.rng = random.Random(seed)
+        self.n_requests = 0
+
+    def next_response(self, request_kwargs: dict) -> str:
+        if callable(self.script):
+            response = self.script(request_kwargs)
+        else:
+            response = self.script[self.n_requests % len(self.script)]
+        self.n_requests += 1
+        return response
+
+    def sample_latency(self) -> float:
+        return max(0.0, self.latency + self.rng.uniform(-self.latency_jitter, self.latency_jitter))
+
+    def create(self, request_kwargs: dict) -> dict:
+        response = self.next_response(request_kwargs)
+        time.sleep(self.sample_latency() + self.token_latency * count_tokens(response))
+        return completion_dict(request_kwargs, response)
+
+    async def acreate(self, request_kwargs: dict) -> dict:
+        response = self.next_response(request_kwargs)
+        await asyncio.sleep(self.sample_latency() + self.token_latency * count_tokens(response))
+        return completion_dict(request_kwargs, response)
+
+    def stream(self, request_kwargs: dict) -> Iterator[tuple[str, Optional[str]]]:
+        response = self.next_response(request_kwargs)
+        time.sleep(self.sample_latency())
+        for chunk in stream_chunks(response, "stop"):
+            time.sleep(self.token_latency)
+            yield chunk
+
+    async def astream(self, request_kwargs: dict) -> AsyncIterator[tuple[str, Optional[str]]]:
+        response = self.next_response(request_kwargs)
+        await asyncio.sleep(self.sample_latency())
+        for chunk in stream_chunks(response, "stop"):
+            await asyncio.sleep(self.token_latency)
+            yield chunk
+
+
+def random_action_script(n_rows: int, n_cols: int, seed: int = None) -> Callable[[dict], str]:
+    """
+    Script of a player clicking random cells of an `n_rows` by `n_cols` board, mostly with the left button.
+    """
+    rng = random.Random(seed)
+
+    def script(request_kwargs: dict) -> str:
+        action = rng.choices("LRM", weights=(8, 1, 1))[0]
+        return f"REASONING: Mock response.\nACTION: {action}({rng.randint(1, n_rows)},{rng.randint(1, n_cols)})"
+
+    return script
+
+
+def choice_text(choice: dict) -> str:
+    return choice["text"] if "text" in choice else choice["message"]["content"]
+
+
+def choice_delta(choice: dict) -> str:
+    if "text" in choice:
+        return choice["text"]
+    return choice["delta"].get("content") or ""
+
+
+def stream_chunks(
+    response: str, finish_reason: Optional[str], chunk_size: int = 4
+) -> Iterator[tuple[str, Optional[str]]]:
+    """
+    Split a complete response into stream deltas of about one token each.
+    """
+    n_chunks = max((len(response) + chunk_size - 1) // chunk_size, 1)
+    for idx in range(n_chunks):
+        yield response[idx * chunk_size : (idx + 1) * chunk_size], finish_reason if idx == n_chunks - 1 else None
+
+
+def completion_dict(request_kwargs: dict, response: str, finish_reason: str = "stop") -> dict:
+    """
+    Wrap `response` the way the `openai` api answers `request_kwargs`, with approximate token usage.
+    """
+    if "prompt" in request_kwargs:
+        choice = {"text": response, "index": 0, "finish_reason": finish_reason}
+    else:
+        choice = {"message": {"role": "assistant", "content": response}, "index": 0, "finish_reason": finish_reason}
+
+    prompt_tokens = estimate_prompt_tokens(request_kwargs)
+    completion_tokens = count_tokens(response)
+    return {
+        "choices": [choice],
+        "usage": {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens,
+        },
+    }
+
+
+def split_conversation(conversation: str) -> list[tuple[str, str]]:
+    """
+    Split the transcript written by `MessageCache.__str__` into (role, content) pairs.
+    """
+    parts = re.split(r"(?m)^>> (SYSTEM|USER|ASSISTANT):\n", conversation)
+    # every message is followed by a blank line
+    return [(role, content.removesuffix("\n\n")) for role, content in zip(parts[1::2], parts[2::2])]
+
+
+def build_backend(
+    name: str,
+    board_path: Optional[str] = None,
+    replay_dir: Optional[str] = None,
+    mock_latency: float = 0.0,
+    mock_latency_jitter: float = 0.0,
+    mock_token_latency: float = 0.0,
+    board_size: Optional[tuple[int, int]] = None,
+    seed: int = None,
+) -> Optional[Backend]:
+    """
+    Backend of a game named by `gpt_backend`, or `None` for the `openai` api that `GPT` sets up from its resources.
+    """
+    if name == "openai":
+        return None
+    if name == "replay":
+        if replay_dir is None or board_path is None:
+            raise ValueError("The replay backend needs `replay_dir` and a board file.")
+        return ReplayBackend.from_dir(replay_dir, board_path)
+    if name == "mock":
+        n_rows, n_cols = board_size
+        return MockBackend(
+            random_action_script(n_rows, n_cols, seed=seed),
+            latency=mock_latency,
+            latency_jitter=mock_latency_jitter,
+            token_latency=mock_token_latency,
+            seed=seed,
+        )
+    raise ValueError(f"Unknown GPT backend: {name}")
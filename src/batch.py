@@ -0,0 +1,115 @@
+"""
+# Author: Yinghao Li
+# Modified: October 16th, 2026
+# ---------------------------------------
+# Description: Batch request files in the OpenAI batch format, and a local stand-in filling their results.
+"""
+
+import os
+import json
+import logging
+import os.path as osp
+from typing import Optional
+from tqdm.auto import tqdm
+
+from .backend import Backend
+
+logger = logging.getLogger(__name__)
+
+__all__ = ["BATCH_MODES", "write_batch_requests", "read_batch_requests", "read_batch_results", "fill_batch_results"]
+
+# export: write the requests to `batch_requests_path` instead of calling the api
+# ingest: read the responses from `batch_results_path` instead of calling the api
+BATCH_MODES = ("export", "ingest")
+
+
+def write_batch_requests(requests: list[tuple[str, dict]], path: str) -> None:
+    """
+    Write (custom id, `GPT.request_kwargs`) pairs as a JSONL batch file, one request per line.
+    """
+    if osp.dirname(path):
+        os.makedirs(osp.dirname(path), exist_ok=True)
+
+    custom_ids = set()
+    with open(path, "w", encoding="utf-8") as f:
+        for custom_id, request_kwargs in requests:
+            if custom_id in custom_ids:
+                raise ValueError(f"Duplicated custom id {custom_id} in the batch.")
+            custom_ids.add(custom_id)
+
+            # the batch endpoint names the engine `model` and rejects unset parameters
+            body = {"model" if k == "engine" else k: v for k, v in request_kwargs.items() if v is not None}
+            url = "/v1/completions" if "prompt" in request_kwargs else "/v1/chat/completions"
+            line = {"custom_id": custom_id, "method": "POST", "url": url, "body": body}
+            f.write(json.dumps(line, ensure_ascii=False) + "\n")
+
+    logger.info(f"Wrote {len(custom_ids)} requests to {path}.")
+    return None
+
+
+def read_batch_requests(path: str) -> list[tuple[str, dict]]:
+    """
+    Read a batch file back into (custom id, `GPT.request_kwargs`) pairs.
+    """
+    requests = list()
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            request = json.loads(line)
+            request_kwargs = {"engine" if k == "model" else k: v for k, v in request["body"].items()}
+            requests.append((request["custom_id"], request_kwargs))
+    return requests
+
+
+def read_batch_results(path: str) -> dict[str, Optional[str]]:
+    """
+    Read the response text of every custom id from a batch result file; failed requests map to `None`.
+    """
+    results = dict()
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            result = json.loads(line)
+            response = result.get("response") or dict()
+            if result.get("error") or response.get("status_code") != 200:
+                logger.warning(f"Request {result['custom_id']} failed: {result.get('error') or response}")
+                results[result["custom_id"]] = None
+                continue
+
+            choice = response["body"]["choices"][0]
+            results[result["custom_id"]] = choice["text"] if "text" in choice else choice["message"]["content"]
+    return results
+
+
+def fill_batch_results(requests_path: str, results_path: str, backend: Backend) -> None:
+    """
+    Answer every request of a batch file with `backend` and write the results in the batch result format,
+    standing in for the batch endpoint.
+    """
+    requests = read_batch_requests(requests_path)
+    if osp.dirname(results_path):
+        os.makedirs(osp.dirname(results_path), exist_ok=True)
+
+    with open(results_path, "w", encoding="utf-8") as f:
+        for idx, (custom_id, request_kwargs) in enumerate(tqdm(requests)):
+            try:
+                body = backend.create(request_kwargs)
+                line = {
+                    "id": f"batch_req_{idx}",
+                    "custom_id": custom_id,
+                    "response": {"status_code": 200, "body": body},
+                    "error": None,
+                }
+            except Exception as e:
+                line = {
+                    "id": f"batch_req_{idx}",
+                    "custom_id": custom_id,
+                    "response": None,
+                    "error": {"code": type(e).__name__, "message": str(e)},
+                }
+            f.write(json.dumps(line, ensure_ascii=False) + "\n")
+
+    logger.info(f"Wrote the results of {len(requests)} requests to {results_path}.")
+    return None
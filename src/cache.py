@@ -0,0 +1,209 @@
+"""
+# Author: Yinghao Li
+# Modified: October 16th, 2026
+# ---------------------------------------
+# Description: Persistent, content-addressed cache of GPT responses.
+"""
+
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+import logging
+import os.path as osp
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+__all__ = ["ResponseCache", "get_response_cache", "CACHE_MODES"]
+
+# readwrite: serve hits and store new responses
+# readonly:  serve hits but never write, e.g., when several runs share a frozen cache
+# bypass:    neither read nor write, so every request goes to the API
+CACHE_MODES = ("readwrite", "readonly", "bypass")
+
+# evict at most once every this many writes
+EVICTION_INTERVAL = 100
+
+# path -> cache shared by all `GPT` instances of the process
+response_caches = dict()
+response_caches_lock = threading.Lock()
+
+
+class ResponseCache:
+    """
+    SQLite cache from request keys to responses.
+
+    A key is the hash of the engine, the messages or prompt and all sampling parameters, so two requests share
+    an entry only if the API would see the same request. Entries older than `max_age_days` are dropped, and the
+    least recently used entries are dropped once the stored responses exceed `max_size_mb`.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        mode: str = "readwrite",
+        max_age_days: Optional[float] = None,
+        max_size_mb: Optional[float] = None,
+    ):
+        if mode not in CACHE_MODES:
+            raise ValueError(f"Unknown cache mode: {mode}")
+        self.path = path
+        self.mode = mode
+        self.max_age_days = max_age_days
+        self.max_size_mb = max_size_mb
+
+        self.n_hits = 0
+        self.n_misses = 0
+        self.n_writes = 0
+        self.n_evicted = 0
+
+        self.lock = threading.Lock()
+        self.connection = None
+        if mode == "bypass":
+            return
+
+        if mode == "readonly":
+            if not osp.exists(path):
+                logger.warning(f"Response cache {path} does not exist; every request is a miss.")
+                return
+            self.connection = sqlite3.connect(f"file:{path}?mode=ro", uri=True, check_same_thread=False)
+            return
+
+        if osp.dirname(path):
+            os.makedirs(osp.dirname(path), exist_ok=True)
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "key TEXT PRIMARY KEY, response TEXT NOT NULL, size INTEGER NOT NULL, "
+            "created REAL NOT NULL, accessed REAL NOT NULL)"
+        )
+        self.connection.execute("CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed)")
+        self.connection.commit()
+        self.evict()
+
+    @staticmethod
+    def key(request_kwargs: dict) -> str:
+        """
+        Content address of a request, see `GPT.request_kwargs`.
+        """
+        serialized = json.dumps(request_kwargs, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+        return hashlib.sha256(serialized.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        if self.connection is None:
+            self.n_misses += 1
+            return None
+
+        with self.lock:
+            row = self.connection.execute("SELECT response FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is not None and self.mode == "readwrite":
+                self.connection.execute("UPDATE responses SET accessed = ? WHERE key = ?", (time.time(), key))
+                self.connection.commit()
+
+        if row is None:
+            self.n_misses += 1
+            return None
+        self.n_hits += 1
+        return row[0]
+
+    def put(self, key: str, response: str) -> None:
+        if self.connection is None or self.mode != "readwrite":
+            return None
+
+        now = time.time()
+        with self.lock:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO responses (key, response, size, created, accessed) VALUES (?, ?, ?, ?, ?)",
+                (key, response, len(response.encode("utf-8")), now, now),
+            )
+            self.connection.commit()
+            self.n_writes += 1
+        if self.n_writes % EVICTION_INTERVAL == 0:
+            self.evict()
+        return None
+
+    def evict(self) -> None:
+        """
+        Drop expired entries, then the least recently used ones until the cache fits in `max_size_mb`.
+        """
+        if self.connection is None or self.mode != "readwrite":
+            return None
+
+        with self.lock:
+            n_evicted = 0
+            if self.max_age_days is not None:
+                expire_before = time.time() - self.max_age_days * 86400
+                deleted = self.connection.execute("DELETE FROM responses WHERE created < ?", (expire_before,))
+                n_evicted += deleted.rowcount
+
+            if self.max_size_mb is not None:
+                max_size = int(self.max_size_mb * 2**20)
+                total_size = self.connection.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+                if total_size > max_size:
+                    # the running sum over entries from the most recently used keeps those within the budget
+                    n_evicted += self.connection.execute(
+                        "DELETE FROM responses WHERE key IN ("
+                        "SELECT key FROM (SELECT key, SUM(size) OVER (ORDER BY accessed DESC, key) AS kept "
+                        "FROM responses) WHERE kept > ?)",
+                        (max_size,),
+                    ).rowcount
+            self.connection.commit()
+
+        self.n_evicted += n_evicted
+        if n_evicted:
+            logger.info(f"Evicted {n_evicted} entries from response cache {self.path}.")
+        return None
+
+    @property
+    def stats(self) -> dict:
+        n_requests = self.n_hits + self.n_misses
+        return {
+            "mode": self.mode,
+            "hits": self.n_hits,
+            "misses": self.n_misses,
+            "hit_rate": self.n_hits / n_requests if n_requests else 0.0,
+            "writes": self.n_writes,
+            "evicted": self.n_evicted,
+        }
+
+    def log_stats(self) -> None:
+        stats = self.stats
+        logger.info(
+            f"Response cache {self.path} ({stats['mode']}): {stats['hits']} hits, {stats['misses']} misses "
+            f"(hit rate {stats['hit_rate']:.2%}), {stats['writes']} writes, {stats['evicted']} evicted."
+        )
+        return None
+
+    def close(self) -> None:
+        if self.connection is not None:
+            with self.lock:
+                self.connection.close()
+                self.connection = None
+        return None
+
+
+def get_response_cache(
+    path: Optional[str],
+    mode: str = "readwrite",
+    max_age_days: Optional[float] = None,
+    max_size_mb: Optional[float] = None,
+) -> Optional[ResponseCache]:
+    """
+    Get the response cache at `path` shared within the process, or `None` if `path` is `None`.
+
+    The settings of the first call for a path are kept.
+    """
+    if path is None:
+        return None
+
+    path = osp.abspath(path)
+    with response_caches_lock:
+        cache = response_caches.get(path)
+        if cache is None:
+            cache = ResponseCache(path, mode=mode, max_age_days=max_age_days, max_size_mb=max_size_mb)
+            response_caches[path] = cache
+    return cache
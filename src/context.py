@@ -0,0 +1,210 @@
+"""
+# Author: Yinghao Li
+# Modified: October 17th, 2026
+# ---------------------------------------
+# Description: Token-budgeted context policies pruning the natural conversation sent to GPT.
+"""
+
+import re
+import logging
+from typing import Optional
+
+from .limiter import count_tokens
+
+logger = logging.getLogger(__name__)
+
+__all__ = ["ContextPolicy", "SlidingWindowPolicy", "DropBoardsPolicy", "SummarizePolicy", "CONTEXT_POLICIES"]
+
+# the system message and the initial prompt with the game instructions are always sent
+N_PINNED_MESSAGES = 2
+
+board_pattern = re.compile(r"(--- (?:CURRENT BOARD|CHANGED CELLS) ---\n)```\n.*?\n```", re.DOTALL)
+action_pattern = re.compile(r"[LMR] *\( *\d+ *, *\d+ *\)")
+
+
+def reference_board_idx(messages: list[dict[str, str]]) -> Optional[int]:
+    """
+    Index of the latest full board if changed cells are listed after it, `None` otherwise.
+    """
+    has_diff = False
+    for idx in range(len(messages) - 1, -1, -1):
+        message = messages[idx]
+        if message["role"] != "user":
+            continue
+        if "--- CURRENT BOARD ---" in message["content"]:
+            return idx if has_diff else None
+        has_diff = has_diff or "--- CHANGED CELLS ---" in message["content"]
+    return None
+
+
+class ContextPolicy:
+    """
+    Selects the messages of a conversation sent to the model so that they fit in `max_tokens`.
+
+    The system message, the initial prompt and the latest message are always kept, and so are the latest full
+    board and the turns after it when the later prompts list the changed cells against it. Older turns are
+    dropped oldest first and in (response, next prompt) pairs, so that the kept turns still alternate. `prune`
+    returns the messages to send and a record of what was pruned, or `None` if the conversation already fits.
+    """
+
+    name = None
+
+    def __init__(self, max_tokens: int):
+        self.max_tokens = max_tokens
+
+    def prune(self, messages: list[dict[str, str]], n_tokens: list[int]) -> tuple[list[dict[str, str]], Optional[dict]]:
+        n_total_tokens = sum(n_tokens)
+        if n_total_tokens <= self.max_tokens:
+            return messages, None
+
+        # the changed cells are relative to the latest full board, so it and the turns after it are kept
+        reference_idx = reference_board_idx(messages)
+        messages, n_tokens, record = self.compress(messages, n_tokens)
+        total = sum(n_tokens)
+        dropped = list()
+        summary = None
+        n_summary_tokens = 0
+        idx = N_PINNED_MESSAGES
+        # the last message is the prompt to answer
+        n_droppable = len(messages) - 1 if reference_idx is None else reference_idx
+        while idx + 1 < n_droppable and total + n_summary_tokens > self.max_tokens:
+            dropped += [idx, idx + 1]
+            total -= n_tokens[idx] + n_tokens[idx + 1]
+            # the summary replaces the dropped turns, so it counts against the budget
+            summary = self.summarize(messages, dropped)
+            n_summary_tokens = count_tokens(summary["content"]) if summary is not None else 0
+            idx += 2
+        total += n_summary_tokens
+
+        dropped_set = set(dropped)
+        kept = [message for idx, message in enumerate(messages) if idx not in dropped_set]
+        if summary is not None:
+            kept.insert(N_PINNED_MESSAGES, summary)
+        if total > self.max_tokens:
+            logger.warning(f"The context has {total} tokens after pruning, over the budget of {self.max_tokens}.")
+
+        record.update(
+            {
+                "policy": self.name,
+                "n_tokens": n_total_tokens,
+                "n_sent_tokens": total,
+                "dropped_messages": dropped,
+                "summarized": summary is not None,
+                "reference_board": reference_idx,
+                "over_budget": total > self.max_tokens,
+            }
+        )
+        return kept, record
+
+    def compress(self, messages: list[dict[str, str]], n_tokens: list[int]) -> tuple[list, list[int], dict]:
+        """
+        Shrink messages in place of dropping them; returns the new messages, their token counts and a record.
+        """
+        return messages, n_tokens, dict()
+
+    def summarize(self, messages: list[dict[str, str]], dropped: list[int]) -> Optional[dict[str, str]]:
+        """
+        Message standing in for the dropped messages, or `None` to drop them without a trace.
+        """
+        return None
+
+
+class SlidingWindowPolicy(ContextPolicy):
+    """
+    Keep the latest turns that fit in the budget.
+    """
+
+    name = "sliding_window"
+
+
+class DropBoardsPolicy(ContextPolicy):
+    """
+    Remove the boards from the prompts before the latest full board, oldest first, while keeping the responses
+    and hence the actions; drop whole turns only if that is not enough.
+
+    The changed cells after the latest full board are kept since they are relative to it, and the pinned initial
+    prompt keeps its board like the other pinned messages.
+    """
+
+    name = "drop_boards"
+    placeholder = "(omitted; see the latest board)"
+
+    def __init__(self, max_tokens: int):
+        super().__init__(max_tokens)
+        # message index -> (content, token count) without the boards, as the old prompts never change
+        self.stripped = dict()
+
+    def strip(self, idx: int, content: str) -> tuple[str, int]:
+        if idx not in self.stripped:
+            stripped = board_pattern.sub(rf"\1{self.placeholder}", content)
+            self.stripped[idx] = (stripped, count_tokens(stripped))
+        return self.stripped[idx]
+
+    def compress(self, messages: list[dict[str, str]], n_tokens: list[int]) -> tuple[list, list[int], dict]:
+        latest_board_idx = max(
+            (
+                idx
+                for idx, message in enumerate(messages)
+                if message["role"] == "user" and "--- CURRENT BOARD ---" in message["content"]
+            ),
+            default=0,
+        )
+
+        messages = list(messages)
+        n_tokens = list(n_tokens)
+        total = sum(n_tokens)
+        dropped_boards = list()
+        for idx in range(N_PINNED_MESSAGES, latest_board_idx):
+            if total <= self.max_tokens:
+                break
+            message = messages[idx]
+            if message["role"] != "user" or not board_pattern.search(message["content"]):
+                continue
+            content, n_stripped_tokens = self.strip(idx, message["content"])
+            total -= n_tokens[idx] - n_stripped_tokens
+            messages[idx] = {"role": message["role"], "content": content}
+            n_tokens[idx] = n_stripped_tokens
+            dropped_boards.append(idx)
+
+        return messages, n_tokens, {"dropped_boards": dropped_boards}
+
+
+class SummarizePolicy(ContextPolicy):
+    """
+    Replace the oldest turns with a message listing the actions taken in them.
+    """
+
+    name = "summarize"
+
+    def __init__(self, max_tokens: int):
+        super().__init__(max_tokens)
+        # message index -> action of the response, as the dropped turns never change
+        self.actions = dict()
+
+    def action(self, messages: list[dict[str, str]], idx: int) -> str:
+        if idx not in self.actions:
+            response = messages[idx]["content"]
+            tag_idx = response.rfind("ACTION:")
+            match = action_pattern.search(response, tag_idx + len("ACTION:") if tag_idx >= 0 else 0)
+            action = re.sub(r"\s+", "", match.group()) if match else "(unparsable)"
+            # an invalid action is reported at the start of the next prompt
+            if messages[idx + 1]["content"].startswith("Your previous action"):
+                action += " (invalid)"
+            self.actions[idx] = action
+        return self.actions[idx]
+
+    def summarize(self, messages: list[dict[str, str]], dropped: list[int]) -> Optional[dict[str, str]]:
+        actions = [self.action(messages, idx) for idx in dropped if messages[idx]["role"] == "assistant"]
+
+        content = (
+            f"--- EARLIER TURNS ---\n"
+            f"{len(actions)} earlier turns are omitted. Your actions in them, oldest first: {', '.join(actions)}.\n"
+        )
+        return {"role": "user", "content": content}
+
+
+CONTEXT_POLICIES = {
+    SlidingWindowPolicy.name: SlidingWindowPolicy,
+    DropBoardsPolicy.name: DropBoardsPolicy,
+    SummarizePolicy.name: SummarizePolicy,
+}
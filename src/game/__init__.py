@@ -1,6 +1,24 @@
-from .core import MineField, ActionFeedback
+from .core import MineField, ActionFeedback, BoardDelta, count_neighbors
+from .packed import PackedMineField
+from .batch import BatchMineField, parse_actions
+from .render import StrTableRenderer, COORDINATE_ENCODINGS
+from .replay import Replay, compile_actions, replay_histories, replay_board
 
-__all__ = ["MineField", "ActionFeedback"]
+__all__ = [
+    "MineField",
+    "PackedMineField",
+    "BatchMineField",
+    "ActionFeedback",
+    "BoardDelta",
+    "count_neighbors",
+    "parse_actions",
+    "StrTableRenderer",
+    "COORDINATE_ENCODINGS",
+    "Replay",
+    "compile_actions",
+    "replay_histories",
+    "replay_board",
+]
 
 try:
     from .gui import MinesweeperGUI
@@ -0,0 +1,334 @@
+"""
+# Author: Yinghao Li
+# Modified: October 16th, 2026
+# ---------------------------------------
+# Description: Step many minesweeper games of the same size in lockstep.
+"""
+
+import json
+import numpy as np
+import logging
+from typing import Union
+
+from .core import MineField, ActionFeedback, count_neighbors, action_pattern
+from .packed import CODE_MASK, MINE_CODE, REVEALED, FLAGGED, OPENED, build_symbol_luts
+
+logger = logging.getLogger(__name__)
+
+# action type codes accepted by `BatchMineField.step`
+NO_ACTION = -1
+LEFT_CLICK = 0
+RIGHT_CLICK = 1
+MIDDLE_CLICK = 2
+
+# feedback code of games that did not act in a step
+NO_FEEDBACK = -1
+
+action_type_codes = {"L": LEFT_CLICK, "R": RIGHT_CLICK, "M": MIDDLE_CLICK}
+
+
+def parse_actions(actions: list[str]) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Convert `MineField.action_history` strings such as "L(3,4)" into `BatchMineField.step` arrays.
+
+    `None` or an empty string stands for a game that does not act in the step.
+    """
+    action_types = np.full(len(actions), NO_ACTION, dtype=np.int8)
+    rows = np.zeros(len(actions), dtype=np.int64)
+    cols = np.zeros(len(actions), dtype=np.int64)
+    for idx, action in enumerate(actions):
+        if not action:
+            continue
+        match = action_pattern.fullmatch(action)
+        if match is None:
+            raise ValueError(f"Invalid action: {action}")
+        action_types[idx] = action_type_codes[match.group(1)]
+        rows[idx] = int(match.group(2))
+        cols[idx] = int(match.group(3))
+    return action_types, rows, cols
+
+
+class BatchMineField:
+    """
+    A batch of minesweeper games of the same size stepped together.
+
+    Every game follows the rules of `MineField`, but all games are stored in stacked (n_games, n_rows, n_cols)
+    arrays with the cell encoding of `PackedMineField`, and each step applies one action per game with
+    whole-batch array operations. Action histories and per-action deltas are not recorded.
+    """
+
+    def __init__(
+        self,
+        n_games: int,
+        n_rows=9,
+        n_cols=9,
+        n_mines=10,
+        seeds=None,
+        empty_cell=".",
+        mine_cell="*",
+        flag_cell="F",
+        unchecked_cell="?",
+        strict_winning_condition=False,
+        legacy_placement=False,
+    ):
+        self.n_games = n_games
+        self.n_rows = n_rows
+        self.n_cols = n_cols
+        self.n_mines = n_mines
+        self.strict_winning_condition = strict_winning_condition
+        self.legacy_placement = legacy_placement
+        self.seeds = np.arange(n_games) if seeds is None else np.asarray(seeds)
+        assert len(self.seeds) == n_games, "Need one seed per game."
+
+        self.board_state = np.zeros((n_games, n_rows, n_cols), dtype=np.uint8)
+        self.board_mine = np.zeros((n_games, n_rows, n_cols), dtype=bool)
+        # mines of the other games are placed at their first left click, as `MineField` does
+        self.mines_placed = np.zeros(n_games, dtype=bool)
+
+        self.true_lut, self.disp_lut = build_symbol_luts(empty_cell, mine_cell, flag_cell, unchecked_cell)
+
+        self.first_move = np.ones(n_games, dtype=bool)
+        self.game_over = np.zeros(n_games, dtype=bool)
+        self.game_win = np.zeros(n_games, dtype=bool)
+
+    @classmethod
+    def from_board_files(cls, paths: list[str], **kwargs) -> "BatchMineField":
+        """
+        Create a batch from boards saved by `MineField.save_board`.
+        """
+        board_dicts = list()
+        for path in paths:
+            with open(path, "r", encoding="utf-8") as f:
+                board_dicts.append(json.load(f))
+
+        n_rows, n_cols, n_mines = (board_dicts[0][k] for k in ("n_rows", "n_cols", "n_mines"))
+        assert all(
+            (d["n_rows"], d["n_cols"]) == (n_rows, n_cols) for d in board_dicts
+        ), "All boards in a batch must have the same size."
+
+        batch = cls(len(paths), n_rows, n_cols, n_mines, seeds=[d["seed"] for d in board_dicts], **kwargs)
+        batch.set_mines(np.array([d["board_mine"] for d in board_dicts]).astype(bool))
+        return batch
+
+    def set_mines(self, board_mine: np.ndarray, games=None) -> "BatchMineField":
+        """
+        Use pre-defined mine layouts for the selected games (all games by default).
+        """
+        games = np.arange(self.n_games) if games is None else np.asarray(games)
+        self.board_mine[games] = board_mine
+        self.mines_placed[games] = True
+        return self
+
+    @property
+    def board_disp(self) -> np.ndarray:
+        return self.disp_lut[self.board_state]
+
+    @property
+    def board_true(self) -> np.ndarray:
+        return self.true_lut[self.board_state & CODE_MASK]
+
+    @property
+    def n_revealed_cells(self) -> np.ndarray:
+        return np.count_nonzero(self.board_state & OPENED, axis=(1, 2))
+
+    @property
+    def n_correctly_flagged_mines(self) -> np.ndarray:
+        return np.count_nonzero(self.board_state == (FLAGGED | MINE_CODE), axis=(1, 2))
+
+    def step(self, action_types, rows, cols) -> np.ndarray:
+        """
+        Apply one action to every game.
+
+        Parameters
+        ----------
+        action_types: `LEFT_CLICK`, `RIGHT_CLICK`, `MIDDLE_CLICK`, or `NO_ACTION` for each game
+        rows: 1-based row index of each action
+        cols: 1-based column index of each action
+
+        Returns
+        -------
+        int8 array of `ActionFeedback` values, `NO_FEEDBACK` for the games without an action
+        """
+        action_types = np.asarray(action_types)
+        x = np.asarray(rows, dtype=np.int64) - 1
+        y = np.asarray(cols, dtype=np.int64) - 1
+        assert action_types.shape == x.shape == y.shape == (self.n_games,), "Need one action per game."
+
+        feedback = np.full(self.n_games, NO_FEEDBACK, dtype=np.int8)
+        pending = action_types != NO_ACTION
+
+        def resolve(mask, code):
+            resolved = mask & pending
+            feedback[resolved] = code.value
+            pending[resolved] = False
+            return resolved
+
+        left = action_types == LEFT_CLICK
+        right = action_types == RIGHT_CLICK
+        middle = action_types == MIDDLE_CLICK
+
+        # checks in the same order as the `MineField` action handlers
+        resolve(right & self.first_move, ActionFeedback.START_BY_RIGHT_CLICK)
+        resolve(middle & self.first_move, ActionFeedback.START_BY_MIDDLE_CLICK)
+        valid = (x >= 0) & (x < self.n_rows) & (y >= 0) & (y < self.n_cols)
+        resolve(~valid, ActionFeedback.UNEXIST_CELL)
+        resolve(self.game_over, ActionFeedback.GAME_OVER)
+
+        games = np.arange(self.n_games)
+        x = np.where(valid, x, 0)
+        y = np.where(valid, y, 0)
+
+        first = left & self.first_move & pending
+        if np.any(first):
+            self.start_games(games[first], x[first], y[first])
+
+        state = self.board_state[games, x, y]
+        flagged = (state & FLAGGED) != 0
+        revealed = (state & REVEALED) != 0
+        numbered = (state & CODE_MASK) != 0
+        is_mine = (state & CODE_MASK) == MINE_CODE
+
+        resolve(left & ~first & flagged, ActionFeedback.LEFT_CLICK_FLAG_CELL)
+        resolve(left & ~first & revealed & ~numbered, ActionFeedback.LEFT_CLICK_EMPTY_CELL)
+        resolve(left & ~first & revealed, ActionFeedback.LEFT_CLICK_NUMBER_CELL)
+        resolve(right & revealed & numbered, ActionFeedback.RIGHT_CLICK_NUMBER_CELL)
+        resolve(right & revealed, ActionFeedback.RIGHT_CLICK_EMPTY_CELL)
+        resolve(middle & revealed & ~numbered, ActionFeedback.MIDDLE_CLICK_EMPTY_CELL)
+        resolve(middle & flagged, ActionFeedback.MIDDLE_CLICK_FLAG_CELL)
+        resolve(middle & ~revealed, ActionFeedback.MIDDLE_CLICK_UNCHECKED_CELL)
+
+        lost = left & is_mine & pending
+        self.game_over[lost] = True
+        resolve(lost, ActionFeedback.GAME_OVER)
+
+        # right click toggles the flag
+        toggled = right & pending
+        self.board_state[games[toggled], x[toggled], y[toggled]] ^= FLAGGED
+
+        # middle click opens the neighbors of a number cell whose flags are all placed correctly
+        chorded = middle & pending
+        chord_games, seed_rows, seed_cols = self.check_chords(games[chorded], x[chorded], y[chorded], feedback)
+        pending &= feedback == NO_FEEDBACK
+
+        opened = left & pending
+        self.reveal(
+            np.concatenate([games[opened], chord_games]),
+            np.concatenate([x[opened], seed_rows]),
+            np.concatenate([y[opened], seed_cols]),
+        )
+        self.first_move[first & pending] = False
+
+        won = pending & self.check_game_win(pending)
+        self.game_win |= won
+        resolve(won, ActionFeedback.GAME_WIN)
+        resolve(pending, ActionFeedback.SUCCESS)
+        return feedback
+
+    def start_games(self, games: np.ndarray, x: np.ndarray, y: np.ndarray) -> None:
+        """
+        Place the mines that are not placed yet and reset the boards of the games making their first move.
+        """
+        for game, i, j in zip(games.tolist(), x.tolist(), y.tolist()):
+            if self.mines_placed[game]:
+                continue
+            seed = int(self.seeds[game])
+            m = MineField(self.n_rows, self.n_cols, self.n_mines, seed=seed, legacy_placement=self.legacy_placement)
+            self.board_mine[game] = m.place_mines(exclude=(i, j)).board_mine
+            self.mines_placed[game] = True
+
+        board_mine = self.board_mine[games]
+        codes = count_neighbors(board_mine)
+        codes[board_mine] = MINE_CODE
+        self.board_state[games] = codes
+        return None
+
+    def check_chords(self, games: np.ndarray, x: np.ndarray, y: np.ndarray, feedback: np.ndarray):
+        """
+        Check the flags around middle-clicked number cells.
+
+        Writes the feedback of the rejected and the lost games into `feedback`.
+
+        Returns
+        -------
+        game indices, rows, and columns of the unflagged neighbors to open
+        """
+        offsets = np.array([(dr, dc) for dr in (-1, 0, 1) for dc in (-1, 0, 1)])
+        nx = x[:, None] + offsets[:, 0]
+        ny = y[:, None] + offsets[:, 1]
+        inside = (nx >= 0) & (nx < self.n_rows) & (ny >= 0) & (ny < self.n_cols)
+        nx = np.where(inside, nx, 0)
+        ny = np.where(inside, ny, 0)
+
+        neighbors = self.board_state[games[:, None], nx, ny]
+        neighbor_flags = inside & ((neighbors & FLAGGED) != 0)
+        n_flags = np.count_nonzero(neighbor_flags, axis=1)
+        wrong_flags = np.any(neighbor_flags & ((neighbors & CODE_MASK) != MINE_CODE), axis=1)
+        number = self.board_state[games, x, y] & CODE_MASK
+
+        no_flag = n_flags == 0
+        lost = ~no_flag & wrong_flags
+        mismatch = ~no_flag & ~lost & (n_flags != number)
+        feedback[games[no_flag]] = ActionFeedback.MIDDLE_CLICK_NUMBER_CELL_NO_FLAG.value
+        feedback[games[lost]] = ActionFeedback.GAME_OVER.value
+        feedback[games[mismatch]] = ActionFeedback.MIDDLE_CLICK_NUMBER_CELL_NUMBER_MISMATCH.value
+        self.game_over[games[lost]] = True
+
+        to_open = (~(no_flag | lost | mismatch))[:, None] & inside & ~neighbor_flags
+        seed_games = np.broadcast_to(games[:, None], to_open.shape)
+        return seed_games[to_open], nx[to_open], ny[to_open]
+
+    def reveal(self, games: np.ndarray, x: np.ndarray, y: np.ndarray) -> None:
+        """
+        Reveal unopened cells and flood the blank areas connected to them.
+
+        Several cells of the same game may be given at once; the result equals revealing them one by one.
+        """
+        if not len(games):
+            return None
+
+        batch_games, batch_idx = np.unique(games, return_inverse=True)
+        state = self.board_state[batch_games]
+        unopened = (state & OPENED) == 0
+        blank = (state & CODE_MASK) == 0
+
+        frontier = np.zeros(state.shape, dtype=bool)
+        frontier[batch_idx, x, y] = True
+        frontier &= unopened
+        revealed = frontier.copy()
+
+        # breadth-first flood, one layer per iteration, restricted to the games that are still spreading
+        active = np.arange(len(batch_games))
+        while True:
+            spreading = frontier & blank[active]
+            keep = np.any(spreading, axis=(1, 2))
+            if not np.any(keep):
+                break
+            active, spreading = active[keep], spreading[keep]
+            frontier = (count_neighbors(spreading) > 0) & unopened[active] & ~revealed[active]
+            revealed[active] |= frontier
+
+        state[revealed] |= REVEALED
+        self.board_state[batch_games] = state
+        return None
+
+    def check_game_win(self, games: np.ndarray) -> np.ndarray:
+        """
+        Whether each game is won; only the games selected by the boolean mask `games` are checked.
+        """
+        win = np.zeros(self.n_games, dtype=bool)
+        if not np.any(games):
+            return win
+
+        state = self.board_state[games]
+        board_mine = self.board_mine[games]
+        all_flagged = np.all(((state & FLAGGED) != 0) == board_mine, axis=(1, 2))
+        if not self.strict_winning_condition:
+            all_flagged |= np.all(((state & REVEALED) != 0) | board_mine, axis=(1, 2))
+        win[games] = all_flagged
+        return win
+
+    def feedbacks(self, codes: Union[np.ndarray, list[int]]) -> list:
+        """
+        Convert feedback codes to `ActionFeedback` members, `None` for the games without an action.
+        """
+        return [None if code == NO_FEEDBACK else ActionFeedback(code) for code in np.asarray(codes).tolist()]
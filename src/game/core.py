@@ -1,27 +1,45 @@
 """
 # Author: Yinghao Li
-# Modified: November 4th, 2023
+# Modified: October 16th, 2026
 # ---------------------------------------
 # Description: Implement the minesweeper game.
 # Reference: https://github.com/pyGuru123/Python-Games/tree/master/MineSweeper
 """
 
 import re
-import json
 import copy
+import json
+import struct
+import threading
 import numpy as np
 import logging
 from itertools import product
 from enum import Enum
-from typing import Union
+from typing import Union, Optional
+from dataclasses import dataclass
 
 from src.io import save_json
+from .render import StrTableRenderer, render_coordinate_cells, render_coordinate_runs
 
 logger = logging.getLogger(__name__)
 
 whitespace_start_end = re.compile(r"^[ \t]+|[ \t]+$", re.MULTILINE)
 tailing_comma = re.compile(r",$", re.MULTILINE)
 
+action_pattern = re.compile(r"([LRM])\((\d+),(\d+)\)")
+action_handlers = {"L": "on_left_click", "R": "on_right_click", "M": "on_middle_click"}
+
+# snapshot header: magic, n_rows, n_cols, n_mines, seed, state flags
+snapshot_header = struct.Struct("<4sIIIqB")
+SNAPSHOT_MAGIC = b"MSF1"
+SNAPSHOT_FIRST_MOVE = 1
+SNAPSHOT_GAME_OVER = 2
+SNAPSHOT_HAS_MINES = 4
+SNAPSHOT_INFERRED = 8
+
+# per-thread `RandomState` reseeded for every legacy placement, as constructing one is much slower than seeding it
+legacy_random_states = threading.local()
+
 
 def replace_idx_quotes(s):
     lines = s.split("\n")
@@ -31,6 +49,111 @@ def replace_idx_quotes(s):
     return "\n".join(lines)
 
 
+def count_neighbors(mask: np.ndarray) -> np.ndarray:
+    """
+    Count the `True` cells within the 3x3 window centered at every cell, the center cell included.
+
+    The last two axes of `mask` are treated as rows and columns, so a stack of boards is counted in one call.
+    The window is summed as a padded, separable shifted sum, which takes a constant number of array operations
+    regardless of the board size.
+
+    Parameters
+    ----------
+    mask: boolean array with shape (..., n_rows, n_cols)
+
+    Returns
+    -------
+    uint8 array with the same shape as `mask`
+    """
+    mask = np.asarray(mask)
+    padded = np.zeros(mask.shape[:-2] + (mask.shape[-2] + 2, mask.shape[-1] + 2), dtype=np.uint8)
+    padded[..., 1:-1, 1:-1] = mask
+    row_sum = padded[..., :-2, :] + padded[..., 1:-1, :] + padded[..., 2:, :]
+    return row_sum[..., :-2] + row_sum[..., 1:-1] + row_sum[..., 2:]
+
+
+def shifted_pairs(n_rows: int, n_cols: int, dr: int, dc: int) -> tuple[tuple[slice, slice], tuple[slice, slice]]:
+    """
+    Slices selecting every cell `(i, j)` and its neighbor `(i + dr, j + dc)` that both lie on the board.
+    """
+    src = (slice(max(0, -dr), n_rows - max(0, dr)), slice(max(0, -dc), n_cols - max(0, dc)))
+    dst = (slice(max(0, dr), n_rows - max(0, -dr)), slice(max(0, dc), n_cols - max(0, -dc)))
+    return src, dst
+
+
+def label_blank_regions(blank: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Label the 8-connected components of blank cells and collect the cells each component opens.
+
+    A region consists of the blank cells of one component plus their numbered border, i.e., exactly the cells
+    that are revealed when any blank cell of the component is opened on an untouched board.
+    Components are found with vectorized union-find (hooking to the smaller root + pointer jumping),
+    so labeling takes a few whole-board array passes without recursion.
+
+    Parameters
+    ----------
+    blank: boolean array with shape (n_rows, n_cols)
+
+    Returns
+    -------
+    board_region: region index of each blank cell, -1 for the other cells
+    region_ptr: region `r` owns `region_cells[region_ptr[r]:region_ptr[r + 1]]`
+    region_cells: flattened cell indices of all regions, sorted by region
+    """
+    n_rows, n_cols = blank.shape
+    n_cells = n_rows * n_cols
+    cell_ids = np.arange(n_cells).reshape(n_rows, n_cols)
+
+    # edges between 8-connected blank cells, each pair listed once
+    edge_src, edge_dst = list(), list()
+    for dr, dc in ((0, 1), (1, -1), (1, 0), (1, 1)):
+        src, dst = shifted_pairs(n_rows, n_cols, dr, dc)
+        connected = blank[src] & blank[dst]
+        edge_src.append(cell_ids[src][connected])
+        edge_dst.append(cell_ids[dst][connected])
+    edge_src = np.concatenate(edge_src)
+    edge_dst = np.concatenate(edge_dst)
+
+    parent = np.arange(n_cells)
+    while True:
+        root_src = parent[edge_src]
+        root_dst = parent[edge_dst]
+        unmerged = root_src != root_dst
+        if not unmerged.any():
+            break
+        edge_src, edge_dst = edge_src[unmerged], edge_dst[unmerged]
+        root_src, root_dst = root_src[unmerged], root_dst[unmerged]
+        np.minimum.at(parent, np.maximum(root_src, root_dst), np.minimum(root_src, root_dst))
+        while True:
+            grandparent = parent[parent]
+            if np.array_equal(grandparent, parent):
+                break
+            parent = grandparent
+
+    blank_ids = cell_ids[blank]
+    roots = blank_ids[parent[blank_ids] == blank_ids]
+    n_regions = len(roots)
+    root_regions = np.full(n_cells, -1, dtype=np.int64)
+    root_regions[roots] = np.arange(n_regions)
+    board_region = root_regions[parent].reshape(n_rows, n_cols)
+    board_region[~blank] = -1
+
+    # (region, cell) keys of the numbered border, which may be shared by several blank cells of a region
+    border_keys = list()
+    for dr, dc in product((-1, 0, 1), repeat=2):
+        if dr == dc == 0:
+            continue
+        src, dst = shifted_pairs(n_rows, n_cols, dr, dc)
+        bordering = blank[src] & ~blank[dst]
+        border_keys.append(board_region[src][bordering] * n_cells + cell_ids[dst][bordering])
+    border_keys = np.unique(np.concatenate(border_keys))
+    keys = np.sort(np.concatenate([board_region[blank] * n_cells + blank_ids, border_keys]))
+
+    region_ptr = np.searchsorted(keys // n_cells, np.arange(n_regions + 1))
+    region_cells = keys % n_cells
+    return board_region, region_ptr, region_cells
+
+
 class ActionFeedback(Enum):
     SUCCESS = 0
     UNEXIST_CELL = 1
@@ -50,11 +173,40 @@ class ActionFeedback(Enum):
     START_BY_MIDDLE_CLICK = 15
 
 
+@dataclass
+class BoardDelta:
+    """
+    Cells changed by one state-changing action, in the order they were written.
+    """
+
+    action: str
+    rows: np.ndarray
+    cols: np.ndarray
+    old: np.ndarray
+    new: np.ndarray
+    # whether the game is over after the action
+    game_over: bool = False
+    # whether the action is applied to an untouched board
+    first_move: bool = False
+
+    def __len__(self):
+        return len(self.rows)
+
+    def __iter__(self):
+        """
+        Iterate over `(row, col, old, new)` tuples with 0-based coordinates.
+        """
+        return zip(self.rows.tolist(), self.cols.tolist(), self.old.tolist(), self.new.tolist())
+
+
 class MineField:
     """
     Class to implement the minesweeper game.
     """
 
+    # boards modified in place by actions, which forks must not share
+    mutable_boards = ("board_disp",)
+
     def __init__(
         self,
         n_rows=9,
@@ -67,18 +219,24 @@ class MineField:
         flag_cell="F",
         unchecked_cell="?",
         strict_winning_condition=False,
+        legacy_placement=False,
     ):
         self.n_rows = n_rows
         self.n_cols = n_cols
         self.n_mines = n_mines
         self.display_on_action = display_on_action
         self.strict_winning_condition = strict_winning_condition
+        self.legacy_placement = legacy_placement
 
         self.board_true = None
         self.board_disp = None
         self.board_mine = None
         self.board_disp_with_index = None
-        self.board_disp_prev = None
+        # row-cached `to_str_table` renderer, created on first use
+        self.table_renderer = None
+        self.board_region = None
+        self.region_ptr = None
+        self.region_cells = None
 
         self.empty_cell = empty_cell
         self.mine_cell = mine_cell
@@ -89,7 +247,20 @@ class MineField:
         self.game_over = False
         self.action_history = list()
 
+        # per-action cell changes, used for incremental display updates and undo/redo
+        self.delta_log = list()
+        self.redo_log = list()
+        self.pending_changes = list()
+
+        # running counters maintained by `write_cells`
+        self.n_mines_placed = None
+        self.n_unchecked_cells = None
+        self.n_unrevealed_safe_cells = None
+        self.n_correct_flags = 0
+        self.n_incorrect_flags = 0
+
         self.seed = seed
+        self.rng = None
         self.init_disp_board()
 
     def place_mines(self, num: int = None, exclude: tuple[int, int] = None):
@@ -98,34 +269,79 @@ class MineField:
 
         assert num <= self.n_rows * self.n_cols
 
-        np.random.seed(self.seed)
-        board_rand = np.random.rand(self.n_rows, self.n_cols)
+        if self.legacy_placement:
+            self.board_mine = self.place_mines_legacy(num, exclude)
+            return self
+
+        n_cells = self.n_rows * self.n_cols
+        excluded = None if exclude is None else exclude[0] * self.n_cols + exclude[1]
+        n_candidates = n_cells if excluded is None else n_cells - 1
+        assert num <= n_candidates
+
+        # sample mine cells among the candidates, then skip over the excluded cell
+        self.rng = np.random.default_rng(self.seed)
+        mine_cells = self.rng.choice(n_candidates, size=num, replace=False, shuffle=False)
+        if excluded is not None:
+            mine_cells[mine_cells >= excluded] += 1
 
-        board_rand_flat_sorted = np.sort(board_rand.flatten())
-        threshold = board_rand_flat_sorted[num - 1]
+        board_bool = np.zeros(n_cells, dtype=bool)
+        board_bool[mine_cells] = True
+        self.board_mine = board_bool.reshape(self.n_rows, self.n_cols)
+
+        return self
+
+    def place_mines_legacy(self, num: int, exclude: tuple[int, int] = None) -> np.ndarray:
+        """
+        Reproduce the layouts of the original global-seed placement, e.g., to regenerate the boards in `data/`.
+
+        The legacy random stream comes from a per-thread `RandomState`, so the global numpy state is untouched.
+        """
+        if not hasattr(legacy_random_states, "random_state"):
+            legacy_random_states.random_state = np.random.RandomState()
+        self.rng = legacy_random_states.random_state
+        self.rng.seed(self.seed)
+        board_rand = self.rng.rand(self.n_rows, self.n_cols)
+
+        # only the `num`-th smallest value (and the next one) is needed, so a partition replaces the full sort
+        board_rand_flat_partitioned = np.partition(board_rand.flatten(), num - 1)
+        threshold = board_rand_flat_partitioned[num - 1]
 
         board_bool = board_rand <= threshold
 
         if exclude and board_bool[exclude]:
-            threshold = board_rand_flat_sorted[num]
+            threshold = board_rand_flat_partitioned[num:].min()
             board_bool = board_rand <= threshold
             board_bool[exclude] = False
 
-        self.board_mine = board_bool
-
-        return self
+        return board_bool
 
     def init_disp_board(self):
         self.board_disp = np.empty((self.n_rows, self.n_cols), dtype=str)
         self.board_disp.fill(self.unchecked_cell)
+        self.reset_counters()
+        return self
+
+    def reset_counters(self):
+        """
+        Reset the running counters for a board with every cell unopened.
+        """
+        n_cells = self.n_rows * self.n_cols
+        self.n_mines_placed = None if self.board_mine is None else int(np.count_nonzero(self.board_mine))
+        self.n_unchecked_cells = n_cells
+        self.n_unrevealed_safe_cells = None if self.board_mine is None else n_cells - self.n_mines_placed
+        self.n_correct_flags = 0
+        self.n_incorrect_flags = 0
         return self
 
     def infer_board(self):
+        # a mine cell surrounded by 8 mines counts 9 with itself; mine cells are overwritten below
+        number_symbols = np.array([self.empty_cell] + [str(i) for i in range(1, 9)] + [self.mine_cell])
         self.board_true = np.empty((self.n_rows, self.n_cols), dtype=str)
-        for i, j in product(range(self.n_rows), range(self.n_cols)):
-            self.board_true[i, j] = str(self.count_mines(i, j))
+        self.board_true[:] = number_symbols[count_neighbors(self.board_mine)]
         self.board_true[self.board_mine] = self.mine_cell
-        self.board_true[self.board_true == "0"] = self.empty_cell
+        self.board_region, self.region_ptr, self.region_cells = label_blank_regions(
+            self.board_true == self.empty_cell
+        )
 
     def on_first_move(self, x, y):
         if self.board_mine is None:
@@ -138,10 +354,9 @@ class MineField:
         if self.board_true[x, y] == self.mine_cell:
             return self.on_game_over()
 
-        self.board_disp_prev = copy.deepcopy(self.board_disp)
-        # self.board_disp[x, y] = self.board_true[x, y]
         self.update_adjacent_cells(x, y)
         self.first_move = False
+        self.commit_delta(first_move=True)
 
         if self.display_on_action:
             self.display()
@@ -179,12 +394,8 @@ class MineField:
         if self.board_true[x, y] == self.mine_cell:
             return self.on_game_over()
 
-        self.board_disp_prev = copy.deepcopy(self.board_disp)
-        if self.board_true[x, y] == self.empty_cell:
-            self.update_adjacent_cells(x, y)
-        # number cell
-        else:
-            self.board_disp[x, y] = self.board_true[x, y]
+        self.update_adjacent_cells(x, y)
+        self.commit_delta()
 
         if self.display_on_action:
             self.display()
@@ -216,11 +427,11 @@ class MineField:
         elif self.board_disp[x, y] == self.empty_cell:
             return ActionFeedback.RIGHT_CLICK_EMPTY_CELL
 
-        self.board_disp_prev = copy.deepcopy(self.board_disp)
         if self.board_disp[x, y] == self.unchecked_cell:
-            self.board_disp[x, y] = self.flag_cell
+            self.write_cells([x * self.n_cols + y], self.flag_cell)
         elif self.board_disp[x, y] == self.flag_cell:
-            self.board_disp[x, y] = self.unchecked_cell
+            self.write_cells([x * self.n_cols + y], self.unchecked_cell)
+        self.commit_delta()
 
         if self.display_on_action:
             self.display()
@@ -268,17 +479,16 @@ class MineField:
             ]
             != self.mine_cell
         ):
-            self.board_disp_prev = copy.deepcopy(self.board_disp)
             return self.on_game_over()
 
         if np.sum(self.board_disp[r_start:r_end, c_start:c_end] == self.flag_cell) != int(self.board_true[x, y]):
             return ActionFeedback.MIDDLE_CLICK_NUMBER_CELL_NUMBER_MISMATCH
 
-        self.board_disp_prev = copy.deepcopy(self.board_disp)
         for i, j in product(range(r_start, r_end), range(c_start, c_end)):
             if self.board_disp[i, j] == self.flag_cell:
                 continue
             self.update_adjacent_cells(i, j)
+        self.commit_delta()
 
         if self.display_on_action:
             self.display()
@@ -289,41 +499,216 @@ class MineField:
         return ActionFeedback.SUCCESS
 
     def on_game_over(self):
-        self.game_over = True
+        if not self.game_over:
+            self.game_over = True
+            self.commit_delta(first_move=self.first_move)
         if self.display_on_action:
             logger.info("Game Over! Please Restart!")
             self.display()
         return ActionFeedback.GAME_OVER
 
     def check_game_win(self):
-        if np.all((self.board_disp == self.flag_cell) == self.board_mine):
+        # all mines and only mines are flagged
+        if not self.n_incorrect_flags and self.n_correct_flags == self.n_mines_placed:
             return True
 
         if not self.strict_winning_condition:
-            if np.all((self.board_disp[~self.board_mine] == self.board_true[~self.board_mine])):
+            # all safe cells are revealed
+            if not self.n_unrevealed_safe_cells:
                 return True
 
         return False
 
     @property
     def n_correctly_flagged_mines(self):
-        number = int(np.sum(self.board_mine[self.board_disp == self.flag_cell]))
-        return number
+        return self.n_correct_flags
 
     def update_adjacent_cells(self, x, y):
+        """
+        Reveal an unopened cell and, if it is blank, its connected blank area.
+        """
         if not self.is_valid_cell(x, y) or not self.board_disp[x, y] == self.unchecked_cell:
             return None
 
-        if self.board_true[x, y] == self.empty_cell:
-            self.board_disp[x, y] = self.empty_cell
+        if not self.board_true[x, y] == self.empty_cell:
+            self.write_cells([x * self.n_cols + y], self.board_true[x, y])
+            return None
 
-            for i, j in product(range(x - 1, x + 2), range(y - 1, y + 2)):
-                self.update_adjacent_cells(i, j)
-        else:
-            self.board_disp[x, y] = self.board_true[x, y]
+        region = self.board_region[x, y]
+        cells = self.region_cells[self.region_ptr[region] : self.region_ptr[region + 1]]
+        disp_flat = self.board_disp.reshape(-1)
+        cells_disp = disp_flat[cells]
+
+        # The precomputed region is exactly what the flood fill opens as long as none of its blank cells
+        # has been touched; otherwise, flags may cut the region and we fall back to the explicit flood fill.
+        interior = self.board_region.reshape(-1)[cells] == region
+        if np.all(cells_disp[interior] == self.unchecked_cell):
+            to_reveal = cells[cells_disp == self.unchecked_cell]
+            self.write_cells(to_reveal, self.board_true.reshape(-1)[to_reveal])
+            return None
+
+        revealed = {x * self.n_cols + y}
+        stack = [(x, y)]
+        while stack:
+            i, j = stack.pop()
+            if not self.board_true[i, j] == self.empty_cell:
+                continue
+            rows = range(max(i - 1, 0), min(i + 2, self.n_rows))
+            cols = range(max(j - 1, 0), min(j + 2, self.n_cols))
+            for ni, nj in product(rows, cols):
+                cell = ni * self.n_cols + nj
+                if cell not in revealed and self.board_disp[ni, nj] == self.unchecked_cell:
+                    revealed.add(cell)
+                    stack.append((ni, nj))
+
+        to_reveal = np.fromiter(revealed, dtype=np.int64, count=len(revealed))
+        self.write_cells(to_reveal, self.board_true.reshape(-1)[to_reveal])
+        return None
+
+    @property
+    def delta_board(self) -> np.ndarray:
+        """
+        The board whose cell values are recorded in `delta_log`.
+        """
+        return self.board_disp
+
+    def write_cells(self, cells, values) -> None:
+        """
+        Write values to flattened cell indices and record the overwritten values for the current action.
+        """
+        board_flat = self.delta_board.reshape(-1)
+        old = board_flat[cells]
+        self.pending_changes.append((np.asarray(cells), old))
+        board_flat[cells] = values
+        self.update_counters(cells, old, board_flat[cells])
+        return None
+
+    def cell_status(self, values: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Whether each of the `delta_board` values is an unopened cell and whether it is a flagged cell.
+        """
+        return values == self.unchecked_cell, values == self.flag_cell
+
+    def update_counters(self, cells, old: np.ndarray, new: np.ndarray) -> None:
+        """
+        Update the running counters after the values of `cells` change from `old` to `new`.
+        """
+        mine = self.board_mine.reshape(-1)[cells]
+        old_unchecked, old_flagged = self.cell_status(old)
+        new_unchecked, new_flagged = self.cell_status(new)
 
+        # per-category changes, indexed by `unchecked + 2 * flagged + 4 * mine`
+        categories = np.concatenate(
+            (old_unchecked + 2 * old_flagged + 4 * mine, new_unchecked + 2 * new_flagged + 4 * mine + 8)
+        )
+        counts = np.bincount(categories, minlength=16)
+        changes = counts[8:] - counts[:8]
+
+        self.n_unchecked_cells += int(changes[1] + changes[5])
+        self.n_unrevealed_safe_cells -= int(changes[0])
+        self.n_correct_flags += int(changes[6])
+        self.n_incorrect_flags += int(changes[2])
+        return None
+
+    def commit_delta(self, first_move: bool = False) -> None:
+        """
+        Close the changes written by the current action into a `BoardDelta`.
+        """
+        if self.pending_changes:
+            cells = np.concatenate([cells for cells, _ in self.pending_changes])
+            old = np.concatenate([old for _, old in self.pending_changes])
+        else:
+            cells = np.empty(0, dtype=np.int64)
+            old = np.empty(0, dtype=self.delta_board.dtype)
+        rows, cols = np.divmod(cells, self.n_cols)
+        new = self.delta_board.reshape(-1)[cells]
+
+        action = self.action_history[-1] if self.action_history else ""
+        self.delta_log.append(BoardDelta(action, rows, cols, old, new, game_over=self.game_over, first_move=first_move))
+        self.pending_changes = list()
+        self.redo_log = list()
         return None
 
+    def to_display_delta(self, delta: BoardDelta) -> BoardDelta:
+        """
+        Convert a recorded delta to display symbols.
+        """
+        return delta
+
+    @property
+    def last_delta(self) -> Optional[BoardDelta]:
+        """
+        Display changes of the last state-changing action, or `None` if there is none.
+        """
+        if not self.delta_log:
+            return None
+        return self.to_display_delta(self.delta_log[-1])
+
+    def deltas_since(self, n_deltas: int) -> list[BoardDelta]:
+        """
+        Display changes of all state-changing actions after the first `n_deltas` ones.
+        """
+        return [self.to_display_delta(delta) for delta in self.delta_log[n_deltas:]]
+
+    def changed_mask(self, n_deltas: int) -> np.ndarray:
+        """
+        Cells whose displayed symbol differs from the one before the actions after the first `n_deltas` ones.
+
+        A cell that is changed and then changed back, e.g., flagged and unflagged, is not included.
+        """
+        board_disp = self.board_disp
+        board_before = board_disp.copy()
+        # restore the old symbols from the latest change to the earliest, so that the earliest one is kept
+        for delta in reversed(self.deltas_since(n_deltas)):
+            board_before[delta.rows[::-1], delta.cols[::-1]] = delta.old[::-1]
+        return board_before != board_disp
+
+    def to_diff_table(self, n_deltas: int) -> str:
+        """
+        List the cells changed after the first `n_deltas` deltas as "(row,col): symbol" lines.
+        """
+        return render_coordinate_cells(self.board_disp, self.changed_mask(n_deltas))
+
+    def undo(self) -> Optional[BoardDelta]:
+        """
+        Revert the last state-changing action.
+
+        Only the board state is reverted; `action_history` keeps recording every issued action.
+
+        Returns
+        -------
+        The reverted delta in display symbols, or `None` if there is nothing to undo.
+        """
+        if not self.delta_log:
+            return None
+        delta = self.delta_log.pop()
+        # revert in reverse writing order in case a cell is written more than once
+        self.write_cells((delta.rows * self.n_cols + delta.cols)[::-1], delta.old[::-1])
+        self.pending_changes = list()
+        self.game_over = False
+        self.first_move = delta.first_move
+        self.redo_log.append(delta)
+        return self.to_display_delta(delta)
+
+    def redo(self) -> Optional[BoardDelta]:
+        """
+        Re-apply the last undone action.
+
+        Returns
+        -------
+        The re-applied delta in display symbols, or `None` if there is nothing to redo.
+        """
+        if not self.redo_log:
+            return None
+        delta = self.redo_log.pop()
+        self.write_cells(delta.rows * self.n_cols + delta.cols, delta.new)
+        self.pending_changes = list()
+        self.game_over = delta.game_over
+        # a game lost on the first click keeps the board untouched
+        self.first_move = delta.first_move and delta.game_over
+        self.delta_log.append(delta)
+        return self.to_display_delta(delta)
+
     def is_mine(self, row, col):
         return self.board_mine[row, col]
 
@@ -349,9 +734,20 @@ class MineField:
 
     @property
     def n_revealed_cells(self):
-        return int(np.sum(self.board_disp != self.unchecked_cell))
+        return self.n_rows * self.n_cols - self.n_unchecked_cells
 
     def to_str_table(self, with_row_column_ids=True) -> str:
+        if self.table_renderer is None:
+            self.table_renderer = StrTableRenderer(self.empty_cell, self.flag_cell, self.unchecked_cell)
+        str_arr = self.table_renderer.render(self.board_disp, with_row_column_ids)
+        if str_arr is None:
+            str_arr = self.to_str_table_legacy(with_row_column_ids)
+        return str_arr
+
+    def to_str_table_legacy(self, with_row_column_ids=True) -> str:
+        """
+        Render the table with `np.array2string`; the reference output of `StrTableRenderer`.
+        """
         if with_row_column_ids:
             self.add_index()
             str_arr = np.array2string(self.board_disp_with_index, separator=",")
@@ -367,12 +763,269 @@ class MineField:
         str_arr = whitespace_start_end.sub("", str_arr)
         return str_arr
 
-    def to_dict_table(self) -> dict:
-        coord_value_list = [
-            f"({i+1},{j+1}): {self.board_disp[i, j]}" for i, j in product(range(self.n_cols), range(self.n_rows))
-        ]
-        coord_value_str = "\n".join(coord_value_list)
-        return coord_value_str
+    def opened_mask(self) -> np.ndarray:
+        """
+        Cells that are revealed or flagged.
+        """
+        return self.board_disp != self.unchecked_cell
+
+    def frontier_mask(self) -> np.ndarray:
+        """
+        Revealed cells adjacent to an unrevealed cell, unrevealed cells adjacent to a revealed cell, and all flags.
+        """
+        board_disp = self.board_disp
+        flagged = board_disp == self.flag_cell
+        closed = (board_disp == self.unchecked_cell) | flagged
+        revealed = ~closed
+        return (revealed & (count_neighbors(closed) > 0)) | (closed & (count_neighbors(revealed) > 0)) | flagged
+
+    def to_dict_table(self, encoding: str = "full", window: tuple[int, int, int, int] = None) -> str:
+        """
+        Represent the board as "(row,col): symbol" mappings.
+
+        Parameters
+        ----------
+        encoding: one of `COORDINATE_ENCODINGS`, i.e., "full", "opened", "rle" or "frontier"
+        window: only list the cells in this 0-based, end-exclusive (row_start, row_end, col_start, col_end) window
+        """
+        row_start, row_end, col_start, col_end = window if window is not None else (0, self.n_rows, 0, self.n_cols)
+        board_disp = self.board_disp[row_start:row_end, col_start:col_end]
+
+        if encoding == "full":
+            return render_coordinate_cells(board_disp, None, row_start, col_start)
+        elif encoding == "opened":
+            mask = self.opened_mask()[row_start:row_end, col_start:col_end]
+            return render_coordinate_cells(board_disp, mask, row_start, col_start)
+        elif encoding == "rle":
+            return render_coordinate_runs(board_disp, row_start, col_start)
+        elif encoding == "frontier":
+            mask = self.frontier_mask()[row_start:row_end, col_start:col_end]
+            return render_coordinate_cells(board_disp, mask, row_start, col_start)
+        raise ValueError(f"Unknown coordinate encoding: {encoding}")
+
+    def viewport_windows(self, margin: int = 2, max_windows: int = 3) -> list[tuple[int, int, int, int]]:
+        """
+        Rectangular windows around the frontier, see `frontier_mask`.
+
+        Each frontier component is grown by `margin` cells and covered by its bounding box; overlapping boxes are
+        merged, and all boxes collapse into a single one if there are more than `max_windows`.
+        The whole board is a single window before any cell is opened.
+
+        Returns
+        -------
+        0-based, end-exclusive (row_start, row_end, col_start, col_end) windows, sorted by position
+        """
+        frontier = self.frontier_mask()
+        if not frontier.any():
+            return [(0, self.n_rows, 0, self.n_cols)]
+
+        grown = frontier
+        for _ in range(margin):
+            grown = count_neighbors(grown) > 0
+        # `label_blank_regions` labels 8-connected components of any mask
+        labels = label_blank_regions(grown)[0]
+        rows, cols = np.nonzero(grown)
+        cell_labels = labels[rows, cols]
+        n_labels = int(cell_labels.max()) + 1
+        row_start = np.full(n_labels, self.n_rows)
+        col_start = np.full(n_labels, self.n_cols)
+        row_end = np.zeros(n_labels, dtype=int)
+        col_end = np.zeros(n_labels, dtype=int)
+        np.minimum.at(row_start, cell_labels, rows)
+        np.minimum.at(col_start, cell_labels, cols)
+        np.maximum.at(row_end, cell_labels, rows + 1)
+        np.maximum.at(col_end, cell_labels, cols + 1)
+        windows = [tuple(int(v) for v in window) for window in zip(row_start, row_end, col_start, col_end)]
+
+        merged = True
+        while merged and len(windows) > 1:
+            merged = False
+            for i, j in product(range(len(windows)), repeat=2):
+                (r0, r1, c0, c1), (s0, s1, d0, d1) = windows[i], windows[j]
+                if i < j and r0 < s1 and s0 < r1 and c0 < d1 and d0 < c1:
+                    windows[i] = (min(r0, s0), max(r1, s1), min(c0, d0), max(c1, d1))
+                    windows.pop(j)
+                    merged = True
+                    break
+
+        if len(windows) > max_windows:
+            r0, r1, c0, c1 = zip(*windows)
+            windows = [(min(r0), max(r1), min(c0), max(c1))]
+        return sorted(windows)
+
+    def viewport_summary(self, windows: list[tuple[int, int, int, int]]) -> str:
+        """
+        One line describing the windows and the cells outside of them.
+        """
+        board_disp = self.board_disp
+        outside = np.ones(board_disp.shape, dtype=bool)
+        for row_start, row_end, col_start, col_end in windows:
+            outside[row_start:row_end, col_start:col_end] = False
+
+        shown = "; ".join(f"rows {r0 + 1}-{r1} x columns {c0 + 1}-{c1}" for r0, r1, c0, c1 in windows)
+        summary = f"SHOWN: {shown} of the {self.n_rows} by {self.n_cols} board."
+        n_outside = int(np.count_nonzero(outside))
+        if not n_outside:
+            return summary
+
+        n_unchecked = int(np.count_nonzero(board_disp[outside] == self.unchecked_cell))
+        n_flagged = int(np.count_nonzero(board_disp[outside] == self.flag_cell))
+        n_opened = n_outside - n_unchecked - n_flagged
+        summary += (
+            f" The {n_outside} cells outside are {n_unchecked} unopened, {n_flagged} flagged and {n_opened} opened."
+        )
+        return summary
+
+    def to_str_viewport(self, margin: int = 2, max_windows: int = 3) -> str:
+        """
+        Render the windows around the frontier as tables with absolute indices, followed by a summary line.
+        """
+        if self.table_renderer is None:
+            self.table_renderer = StrTableRenderer(self.empty_cell, self.flag_cell, self.unchecked_cell)
+        board_disp = self.board_disp
+        windows = self.viewport_windows(margin, max_windows)
+        tables = [self.table_renderer.render_window(board_disp, window) for window in windows]
+        return "\n\n".join(tables + [self.viewport_summary(windows)])
+
+    def to_dict_viewport(self, encoding: str = "full", margin: int = 2, max_windows: int = 3) -> str:
+        """
+        List the cells of the windows around the frontier, followed by a summary line.
+        """
+        windows = self.viewport_windows(margin, max_windows)
+        listings = [self.to_dict_table(encoding, window) for window in windows]
+        return "\n\n".join(listings + [self.viewport_summary(windows)])
+
+    def reset_game(self) -> None:
+        """
+        Drop the boards and the game progress before loading a new board.
+        """
+        self.board_true = None
+        self.board_disp = None
+        self.board_disp_with_index = None
+        self.board_region = None
+        self.region_ptr = None
+        self.region_cells = None
+
+        self.first_move = True
+        self.game_over = False
+        self.delta_log = list()
+        self.redo_log = list()
+        self.pending_changes = list()
+        return None
+
+    def apply_action(self, action: str) -> ActionFeedback:
+        """
+        Apply an action written as in `action_history`, e.g., "L(3,4)".
+        """
+        match = action_pattern.fullmatch(action)
+        if match is None:
+            raise ValueError(f"Invalid action: {action}")
+        return getattr(self, action_handlers[match.group(1)])(int(match.group(2)), int(match.group(3)))
+
+    def fork(self, keep_history: bool = True) -> "MineField":
+        """
+        Copy the game so that both copies can be played independently.
+
+        The mine layout and the inferred boards never change in place, so they are shared instead of copied.
+        Without `keep_history`, the fork starts with empty action history and delta logs.
+        """
+        forked = copy.copy(self)
+        for name in self.mutable_boards:
+            board = getattr(self, name)
+            setattr(forked, name, None if board is None else board.copy())
+        forked.board_disp_with_index = None
+        forked.table_renderer = None
+        forked.action_history = list(self.action_history) if keep_history else list()
+        forked.delta_log = list(self.delta_log) if keep_history else list()
+        forked.redo_log = list(self.redo_log) if keep_history else list()
+        forked.pending_changes = list()
+        return forked
+
+    def peek(self, action: str) -> tuple[ActionFeedback, Optional[BoardDelta]]:
+        """
+        Evaluate an action without changing the game.
+
+        Returns
+        -------
+        The action feedback and the cells it would change in display symbols (`None` if the board is unchanged).
+        """
+        forked = self.fork(keep_history=False)
+        feedback = forked.apply_action(action)
+        return feedback, forked.last_delta
+
+    def encode_cells(self, revealed: np.ndarray, flagged: np.ndarray) -> np.ndarray:
+        """
+        `delta_board` values of an inferred board with the given revealed and flagged cells.
+        """
+        board = np.where(revealed, self.board_true, self.unchecked_cell)
+        board[flagged] = self.flag_cell
+        return board
+
+    def snapshot(self) -> bytes:
+        """
+        Serialize the game state into a compact bytes blob, see `restore`.
+
+        The blob holds the board size and seed, the bit-packed mine, revealed, and flagged cells, and the
+        action history. Delta logs and display settings are not included.
+        """
+        state = 0
+        state |= SNAPSHOT_FIRST_MOVE if self.first_move else 0
+        state |= SNAPSHOT_GAME_OVER if self.game_over else 0
+        state |= SNAPSHOT_HAS_MINES if self.board_mine is not None else 0
+        state |= SNAPSHOT_INFERRED if self.board_region is not None else 0
+
+        unchecked, flagged = self.cell_status(self.delta_board)
+        blob = [snapshot_header.pack(SNAPSHOT_MAGIC, self.n_rows, self.n_cols, self.n_mines, self.seed, state)]
+        if self.board_mine is not None:
+            blob.append(np.packbits(self.board_mine).tobytes())
+        blob.append(np.packbits(~unchecked & ~flagged).tobytes())
+        blob.append(np.packbits(flagged).tobytes())
+        blob.append("\n".join(self.action_history).encode("utf-8"))
+        return b"".join(blob)
+
+    def restore(self, blob: bytes) -> "MineField":
+        """
+        Restore the game state from a `snapshot` blob.
+        """
+        magic, n_rows, n_cols, n_mines, seed, state = snapshot_header.unpack_from(blob)
+        if magic != SNAPSHOT_MAGIC:
+            raise ValueError("Not a minesweeper snapshot.")
+
+        self.n_rows, self.n_cols, self.n_mines, self.seed = n_rows, n_cols, n_mines, seed
+        n_cells = n_rows * n_cols
+        n_bytes = (n_cells + 7) // 8
+        offset = snapshot_header.size
+
+        def unpack_cells():
+            nonlocal offset
+            bits = np.frombuffer(blob, dtype=np.uint8, count=n_bytes, offset=offset)
+            offset += n_bytes
+            return np.unpackbits(bits, count=n_cells).astype(bool).reshape(n_rows, n_cols)
+
+        self.reset_game()
+        self.board_mine = unpack_cells() if state & SNAPSHOT_HAS_MINES else None
+        revealed = unpack_cells()
+        flagged = unpack_cells()
+        history = blob[offset:].decode("utf-8")
+        self.action_history = history.split("\n") if history else list()
+
+        self.init_disp_board()
+        if state & SNAPSHOT_INFERRED:
+            self.set_opened_cells(revealed, flagged)
+        self.first_move = bool(state & SNAPSHOT_FIRST_MOVE)
+        self.game_over = bool(state & SNAPSHOT_GAME_OVER)
+        return self
+
+    def set_opened_cells(self, revealed: np.ndarray, flagged: np.ndarray) -> "MineField":
+        """
+        Infer the board from the placed mines and open the given cells, without recording a delta.
+        """
+        self.infer_board()
+        self.init_disp_board()
+        opened = np.flatnonzero(revealed | flagged)
+        self.write_cells(opened, self.encode_cells(revealed, flagged).reshape(-1)[opened])
+        self.pending_changes = list()
+        return self
 
     def save_board(self, path: str, additional_addribute: Union[list[str], str] = None, **kwargs) -> None:
         if additional_addribute is None:
@@ -403,13 +1056,7 @@ class MineField:
         self.n_cols = board_dict["n_cols"]
         self.n_mines = board_dict["n_mines"]
 
-        self.board_true = None
-        self.board_disp = None
-        self.board_disp_with_index = None
-
-        self.first_move = True
-        self.game_over = False
-
+        self.reset_game()
         self.board_mine = np.array(board_dict["board_mine"]).astype(bool)
         self.init_disp_board()
 
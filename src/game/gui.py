@@ -1,6 +1,6 @@
 """
 # Author: Yinghao Li
-# Modified: October 27th, 2023
+# Modified: October 16th, 2026
 # ---------------------------------------
 # Description: GUI for Minesweeper
 """
@@ -154,9 +154,11 @@ class MinesweeperGUI(QMainWindow):
         return x, y
 
     def update_cells_by_content(self):
-        updated_cells_x, updated_cells_y = np.where(self.m.board_disp != self.m.board_disp_prev)
-        for x, y in zip(updated_cells_x, updated_cells_y):
-            value = str(self.m.board_disp[x, y])
+        delta = self.m.last_delta
+        if delta is None:
+            return self
+
+        for x, y, _, value in delta:
             if value == self.m.empty_cell:
                 value = " "
             self.cells[x][y].setText(value)
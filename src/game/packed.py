@@ -0,0 +1,367 @@
+"""
+# Author: Yinghao Li
+# Modified: October 17th, 2026
+# ---------------------------------------
+# Description: Minesweeper engine with compact integer cell states.
+"""
+
+import numpy as np
+import logging
+from itertools import product
+from dataclasses import replace
+
+from .core import MineField, ActionFeedback, BoardDelta, count_neighbors, label_blank_regions
+
+logger = logging.getLogger(__name__)
+
+# Each cell is a single uint8:
+#   bits 0-3: number of neighboring mines (0-8), or `MINE_CODE` for a mine cell
+#   bit 4:    the cell is revealed
+#   bit 5:    the cell is flagged
+CODE_MASK = 0x0F
+MINE_CODE = 0x09
+REVEALED = 0x10
+FLAGGED = 0x20
+OPENED = REVEALED | FLAGGED
+
+
+def build_symbol_luts(empty_cell: str, mine_cell: str, flag_cell: str, unchecked_cell: str):
+    """
+    Lookup tables from packed cell states to the true and the displayed board symbols.
+
+    Returns
+    -------
+    true_lut: symbol of each `state & CODE_MASK`
+    disp_lut: displayed symbol of each `state`
+    """
+    numbers = [str(i) for i in range(1, 9)]
+    true_symbols = [empty_cell] + numbers + [mine_cell] + [empty_cell] * (CODE_MASK - MINE_CODE)
+    true_lut = np.array(true_symbols, dtype=str)
+    disp_lut = np.empty(FLAGGED << 1, dtype=str)
+    disp_lut.fill(unchecked_cell)
+    disp_lut[REVEALED : REVEALED + CODE_MASK + 1] = true_lut
+    disp_lut[FLAGGED:] = flag_cell
+    return true_lut, disp_lut
+
+
+class PackedMineField(MineField):
+    """
+    Minesweeper game backed by a uint8 state array instead of string boards.
+
+    The public interface is identical to `MineField`. `board_disp` and `board_true` are rendered from the
+    packed state only when accessed and kept until the state changes, so the action handlers never compare or
+    allocate strings.
+    """
+
+    mutable_boards = ("board_state",)
+
+    def __init__(
+        self,
+        n_rows=9,
+        n_cols=9,
+        n_mines=10,
+        seed=42,
+        display_on_action=False,
+        empty_cell=".",
+        mine_cell="*",
+        flag_cell="F",
+        unchecked_cell="?",
+        strict_winning_condition=False,
+        legacy_placement=False,
+    ):
+        self.board_state = None
+        self.board_inferred = False
+        # `board_disp` and `board_true` rendered from `board_state`, dropped whenever the state changes
+        self.disp_cache = None
+        self.true_cache = None
+        # lookup tables from packed states to display symbols
+        self.true_lut, self.disp_lut = build_symbol_luts(empty_cell, mine_cell, flag_cell, unchecked_cell)
+
+        super().__init__(
+            n_rows=n_rows,
+            n_cols=n_cols,
+            n_mines=n_mines,
+            seed=seed,
+            display_on_action=display_on_action,
+            empty_cell=empty_cell,
+            mine_cell=mine_cell,
+            flag_cell=flag_cell,
+            unchecked_cell=unchecked_cell,
+            strict_winning_condition=strict_winning_condition,
+            legacy_placement=legacy_placement,
+        )
+
+    @property
+    def board_disp(self):
+        if self.disp_cache is None and self.board_state is not None:
+            self.disp_cache = self.disp_lut[self.board_state]
+        return self.disp_cache
+
+    @board_disp.setter
+    def board_disp(self, value):
+        # `MineField` resets its string boards to `None`; here they are rendered from `board_state`
+        if value is not None:
+            raise AttributeError("The boards of a packed game are set through `board_state`.")
+        self.disp_cache = None
+
+    @property
+    def board_true(self):
+        if not self.board_inferred:
+            return None
+        if self.true_cache is None:
+            self.true_cache = self.true_lut[self.board_state & CODE_MASK]
+        return self.true_cache
+
+    @board_true.setter
+    def board_true(self, value):
+        if value is not None:
+            raise AttributeError("The boards of a packed game are set through `board_state`.")
+        self.true_cache = None
+
+    def init_disp_board(self):
+        if self.board_state is None:
+            self.board_state = np.zeros((self.n_rows, self.n_cols), dtype=np.uint8)
+        else:
+            self.board_state &= CODE_MASK
+        self.disp_cache = None
+        self.reset_counters()
+        return self
+
+    def infer_board(self):
+        codes = count_neighbors(self.board_mine)
+        codes[self.board_mine] = MINE_CODE
+        self.board_state = codes | (self.board_state & OPENED)
+        self.board_inferred = True
+        self.disp_cache = None
+        self.true_cache = None
+        self.board_region, self.region_ptr, self.region_cells = label_blank_regions(codes == 0)
+
+    def on_first_move(self, x, y):
+        if self.board_mine is None:
+            self.place_mines(exclude=(x, y))
+
+        self.infer_board()
+        self.init_disp_board()
+        self.add_index()
+
+        if self.board_mine[x, y]:
+            return self.on_game_over()
+
+        self.update_adjacent_cells(x, y)
+        self.first_move = False
+        self.commit_delta(first_move=True)
+
+        if self.display_on_action:
+            self.display()
+
+        if self.check_game_win():
+            return ActionFeedback.GAME_WIN
+
+        return ActionFeedback.SUCCESS
+
+    def on_left_click(self, x: int, y: int):
+        """
+        Left click event handler.
+        """
+        self.action_history.append(f"L({x},{y})")
+        x -= 1
+        y -= 1
+
+        if not self.is_valid_cell(x, y):
+            return ActionFeedback.UNEXIST_CELL
+
+        if self.game_over:
+            return self.on_game_over()
+
+        if self.first_move:
+            return self.on_first_move(x, y)
+
+        # invalid operations
+        state = int(self.board_state[x, y])
+        if state & FLAGGED:
+            return ActionFeedback.LEFT_CLICK_FLAG_CELL
+        elif state & REVEALED:
+            if state & CODE_MASK:
+                return ActionFeedback.LEFT_CLICK_NUMBER_CELL
+            return ActionFeedback.LEFT_CLICK_EMPTY_CELL
+
+        if state & CODE_MASK == MINE_CODE:
+            return self.on_game_over()
+
+        self.update_adjacent_cells(x, y)
+        self.commit_delta()
+
+        if self.display_on_action:
+            self.display()
+
+        if self.check_game_win():
+            return ActionFeedback.GAME_WIN
+
+        return ActionFeedback.SUCCESS
+
+    def on_right_click(self, x: int, y: int):
+        """
+        Right click event handler.
+        """
+        self.action_history.append(f"R({x},{y})")
+        if self.first_move:
+            return ActionFeedback.START_BY_RIGHT_CLICK
+
+        x -= 1
+        y -= 1
+
+        if not self.is_valid_cell(x, y):
+            return ActionFeedback.UNEXIST_CELL
+
+        if self.game_over:
+            return self.on_game_over()
+
+        state = int(self.board_state[x, y])
+        if state & REVEALED:
+            if state & CODE_MASK:
+                return ActionFeedback.RIGHT_CLICK_NUMBER_CELL
+            return ActionFeedback.RIGHT_CLICK_EMPTY_CELL
+
+        self.write_cells([x * self.n_cols + y], state ^ FLAGGED)
+        self.commit_delta()
+
+        if self.display_on_action:
+            self.display()
+
+        if self.check_game_win():
+            return ActionFeedback.GAME_WIN
+
+        return ActionFeedback.SUCCESS
+
+    def on_middle_click(self, x: int, y: int):
+        """
+        Middle click event handler.
+        """
+        self.action_history.append(f"M({x},{y})")
+        if self.first_move:
+            return ActionFeedback.START_BY_MIDDLE_CLICK
+
+        x -= 1
+        y -= 1
+
+        if not self.is_valid_cell(x, y):
+            return ActionFeedback.UNEXIST_CELL
+
+        if self.game_over:
+            return self.on_game_over()
+
+        state = int(self.board_state[x, y])
+        if state & FLAGGED:
+            return ActionFeedback.MIDDLE_CLICK_FLAG_CELL
+        elif not state & REVEALED:
+            return ActionFeedback.MIDDLE_CLICK_UNCHECKED_CELL
+        elif not state & CODE_MASK:
+            return ActionFeedback.MIDDLE_CLICK_EMPTY_CELL
+
+        r_start = max(x - 1, 0)
+        r_end = min(x + 2, self.n_rows)
+        c_start = max(y - 1, 0)
+        c_end = min(y + 2, self.n_cols)
+
+        neighbors = self.board_state[r_start:r_end, c_start:c_end]
+        flagged = (neighbors & FLAGGED).astype(bool)
+        n_flags = int(np.count_nonzero(flagged))
+
+        if not n_flags:
+            return ActionFeedback.MIDDLE_CLICK_NUMBER_CELL_NO_FLAG
+
+        if np.any(neighbors[flagged] & CODE_MASK != MINE_CODE):
+            return self.on_game_over()
+
+        if n_flags != state & CODE_MASK:
+            return ActionFeedback.MIDDLE_CLICK_NUMBER_CELL_NUMBER_MISMATCH
+
+        for i, j in zip(*np.nonzero(~flagged)):
+            self.update_adjacent_cells(r_start + i, c_start + j)
+        self.commit_delta()
+
+        if self.display_on_action:
+            self.display()
+
+        if self.check_game_win():
+            return ActionFeedback.GAME_WIN
+
+        return ActionFeedback.SUCCESS
+
+    def update_adjacent_cells(self, x, y):
+        """
+        Reveal an unopened cell and, if it is blank, its connected blank area.
+        """
+        state = self.board_state
+        if not self.is_valid_cell(x, y) or state[x, y] & OPENED:
+            return None
+
+        if state[x, y] & CODE_MASK:
+            self.write_cells([x * self.n_cols + y], state[x, y] | REVEALED)
+            return None
+
+        region = self.board_region[x, y]
+        cells = self.region_cells[self.region_ptr[region] : self.region_ptr[region + 1]]
+        state_flat = state.reshape(-1)
+        cells_state = state_flat[cells]
+
+        # see `MineField.update_adjacent_cells` for when the precomputed region can be used
+        interior = self.board_region.reshape(-1)[cells] == region
+        if not np.any(cells_state[interior] & OPENED):
+            to_reveal = cells[(cells_state & OPENED) == 0]
+            self.write_cells(to_reveal, state_flat[to_reveal] | REVEALED)
+            return None
+
+        revealed = {x * self.n_cols + y}
+        stack = [(x, y)]
+        while stack:
+            i, j = stack.pop()
+            if state[i, j] & CODE_MASK:
+                continue
+            rows = range(max(i - 1, 0), min(i + 2, self.n_rows))
+            cols = range(max(j - 1, 0), min(j + 2, self.n_cols))
+            for ni, nj in product(rows, cols):
+                cell = ni * self.n_cols + nj
+                if cell not in revealed and not state[ni, nj] & OPENED:
+                    revealed.add(cell)
+                    stack.append((ni, nj))
+
+        to_reveal = np.fromiter(revealed, dtype=np.int64, count=len(revealed))
+        self.write_cells(to_reveal, state_flat[to_reveal] | REVEALED)
+        return None
+
+    @property
+    def delta_board(self) -> np.ndarray:
+        return self.board_state
+
+    def cell_status(self, values: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        return (values & OPENED) == 0, (values & FLAGGED) != 0
+
+    def to_display_delta(self, delta: BoardDelta) -> BoardDelta:
+        return replace(delta, old=self.disp_lut[delta.old], new=self.disp_lut[delta.new])
+
+    def write_cells(self, cells, values) -> None:
+        super().write_cells(cells, values)
+        self.disp_cache = None
+        return None
+
+    def reset_game(self) -> None:
+        self.board_state = None
+        self.disp_cache = None
+        self.true_cache = None
+        self.board_disp_with_index = None
+        self.board_inferred = False
+        self.board_region = None
+        self.region_ptr = None
+        self.region_cells = None
+
+        self.first_move = True
+        self.game_over = False
+        self.delta_log = list()
+        self.redo_log = list()
+        self.pending_changes = list()
+        return None
+
+    def encode_cells(self, revealed: np.ndarray, flagged: np.ndarray) -> np.ndarray:
+        codes = self.board_state & CODE_MASK
+        return codes | (revealed * np.uint8(REVEALED)) | (flagged * np.uint8(FLAGGED))
@@ -0,0 +1,172 @@
+"""
+# Author: Yinghao Li
+# Modified: October 16th, 2026
+# ---------------------------------------
+# Description: Render boards into the text tables used in prompts.
+"""
+
+import numpy as np
+import logging
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+__all__ = ["StrTableRenderer", "COORDINATE_ENCODINGS", "render_coordinate_cells", "render_coordinate_runs"]
+
+# board symbols that could change the meaning of the legacy regexes or of `repr`
+UNSAFE_SYMBOLS = set("'\"`,[]\\^-") | set("0123456789")
+
+# board encodings of `MineField.to_dict_table`:
+#   full:     every cell as a "(row,col): symbol" line
+#   opened:   only the revealed and flagged cells, the unlisted ones are unopened
+#   rle:      one line per row with runs of identical symbols merged into "(row,start)-(row,end): symbol"
+#   frontier: only the flags and the cells on the border between revealed and unrevealed areas
+COORDINATE_ENCODINGS = ("full", "opened", "rle", "frontier")
+
+
+class StrTableRenderer:
+    """
+    Render boards into the same text as `MineField.to_str_table_legacy`, byte for byte, with string joins.
+
+    Every cell symbol is mapped to a precomputed token, and the rendered lines of each board row are cached
+    together with the row content, so a render after an action only re-renders the rows the action touched.
+    Lines are wrapped where `np.array2string` would wrap them. `render` returns `None` for the cases it does not
+    reproduce: boards that `np.array2string` would summarize, non-default print options, and symbols that
+    interact with the legacy regexes.
+    """
+
+    def __init__(self, empty_cell: str = ".", flag_cell: str = "F", unchecked_cell: str = "?"):
+        self.empty_cell = empty_cell
+        self.flag_cell = flag_cell
+        self.unchecked_cell = unchecked_cell
+        self.quoted_symbols = set("12345678") | {empty_cell, flag_cell, unchecked_cell}
+        self.symbols_safe = all(
+            len(symbol) == 1 and symbol.isprintable() and not symbol.isspace() and symbol not in UNSAFE_SYMBOLS
+            for symbol in (empty_cell, flag_cell, unchecked_cell)
+        )
+
+        # symbol -> token, e.g., "1" -> "`1'" and "*" -> "'*'"
+        self.tokens = dict()
+        # with_row_column_ids -> (line width, rendered board, rendered lines of each table row)
+        self.row_cache = dict()
+
+    def token(self, symbol: str) -> str:
+        if symbol not in self.tokens:
+            self.tokens[symbol] = f"`{symbol}'" if symbol in self.quoted_symbols else f"'{symbol}'"
+        return self.tokens[symbol]
+
+    def can_render(self, board_disp: np.ndarray, with_row_column_ids: bool) -> bool:
+        options = np.get_printoptions()
+        n_cells = (board_disp.shape[0] + 1) * (board_disp.shape[1] + 1) if with_row_column_ids else board_disp.size
+        return (
+            self.symbols_safe
+            and options["legacy"] is False
+            and options["formatter"] is None
+            and n_cells <= options["threshold"]
+            and board_disp.dtype.kind == "U"
+            and board_disp.dtype.itemsize == np.dtype("U1").itemsize
+        )
+
+    def render(self, board_disp: np.ndarray, with_row_column_ids: bool = True) -> Optional[str]:
+        if not self.can_render(board_disp, with_row_column_ids):
+            return None
+
+        # `np.array2string` indents the cells of a 2D array by 2 characters and wraps a row before a cell would
+        # cross `linewidth - 2`; every cell takes 3 characters plus a separator
+        line_width = np.get_printoptions()["linewidth"]
+        cells_per_line = max((line_width - 3) // 4, 1)
+
+        cached = self.row_cache.get(with_row_column_ids)
+        if cached is None or cached[0] != line_width or cached[1].shape != board_disp.shape:
+            rendered_board = np.empty_like(board_disp)
+            row_lines = [None] * board_disp.shape[0]
+            changed_rows = range(board_disp.shape[0])
+        else:
+            _, rendered_board, row_lines = cached
+            changed_rows = np.flatnonzero(np.any(rendered_board != board_disp, axis=1)).tolist()
+
+        for row_idx in changed_rows:
+            symbols = board_disp[row_idx].tolist()
+            if with_row_column_ids:
+                symbols = [str(row_idx + 1)[0]] + symbols
+            row_lines[row_idx] = self.render_row(symbols, cells_per_line, with_row_column_ids)
+        rendered_board[changed_rows] = board_disp[changed_rows]
+        self.row_cache[with_row_column_ids] = (line_width, rendered_board, row_lines)
+
+        lines = list()
+        if with_row_column_ids:
+            header = [str(idx)[0] for idx in range(board_disp.shape[1] + 1)]
+            lines.append(self.render_header(header, cells_per_line))
+        lines.extend(row_lines)
+        return "\n".join(lines)
+
+    def render_window(self, board_disp: np.ndarray, window: tuple[int, int, int, int]) -> str:
+        """
+        Render a window of the board as a table labeled with the absolute row and column indices, e.g.,
+        `"0","4","5","6"` for the header of columns 4 to 6. Rows are never wrapped.
+
+        Parameters
+        ----------
+        board_disp: the displayed board
+        window: 0-based, end-exclusive (row_start, row_end, col_start, col_end)
+        """
+        row_start, row_end, col_start, col_end = window
+        lines = [",".join(['"0"'] + [f'"{col_idx}"' for col_idx in range(col_start + 1, col_end + 1)])]
+        for row_idx, row in enumerate(board_disp[row_start:row_end, col_start:col_end].tolist(), start=row_start + 1):
+            lines.append(",".join([f'"{row_idx}"'] + [self.token(symbol) for symbol in row]))
+        return "\n".join(lines)
+
+    def render_row(self, symbols: list[str], cells_per_line: int, with_row_column_ids: bool) -> str:
+        lines = list()
+        for start in range(0, len(symbols), cells_per_line):
+            chunk = symbols[start : start + cells_per_line]
+            tokens = [self.token(symbol) for symbol in chunk]
+            if with_row_column_ids:
+                # `replace_idx_quotes` double-quotes the first number of every line but the first one
+                for idx, symbol in enumerate(chunk):
+                    if symbol.isdigit():
+                        tokens[idx] = f'"{symbol}"'
+                        break
+            lines.append(",".join(tokens))
+        return "\n".join(lines)
+
+    def render_header(self, symbols: list[str], cells_per_line: int) -> str:
+        first_line = ",".join(f'"{symbol}"' for symbol in symbols[:cells_per_line])
+        if len(symbols) <= cells_per_line:
+            return first_line
+        return f"{first_line}\n{self.render_row(symbols[cells_per_line:], cells_per_line, True)}"
+
+
+def render_coordinate_cells(board_disp: np.ndarray, mask: np.ndarray = None, row_offset=0, col_offset=0) -> str:
+    """
+    List the cells as "(row,col): symbol" lines in row-major order, only those in `mask` if it is given.
+
+    The offsets are added to the 1-based coordinates when `board_disp` is a window of a larger board.
+    """
+    if mask is None:
+        mask = np.ones(board_disp.shape, dtype=bool)
+    rows, cols = np.nonzero(mask)
+    symbols = board_disp[rows, cols].tolist()
+    rows = (rows + row_offset + 1).tolist()
+    cols = (cols + col_offset + 1).tolist()
+    return "\n".join(f"({i},{j}): {s}" for i, j, s in zip(rows, cols, symbols))
+
+
+def render_coordinate_runs(board_disp: np.ndarray, row_offset=0, col_offset=0) -> str:
+    """
+    List every row as runs of identical symbols, e.g., "(2,1)-(2,4): ?; (2,5): 1; (2,6)-(2,9): .".
+    """
+    lines = list()
+    for row_idx, row in enumerate(board_disp.tolist(), start=row_offset + 1):
+        runs = list()
+        start = 0
+        for col_idx in range(1, len(row) + 1):
+            if col_idx < len(row) and row[col_idx] == row[start]:
+                continue
+            if col_idx - start == 1:
+                runs.append(f"({row_idx},{col_offset + start + 1}): {row[start]}")
+            else:
+                runs.append(f"({row_idx},{col_offset + start + 1})-({row_idx},{col_offset + col_idx}): {row[start]}")
+            start = col_idx
+        lines.append("; ".join(runs))
+    return "\n".join(lines)
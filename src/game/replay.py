@@ -0,0 +1,264 @@
+"""
+# Author: Yinghao Li
+# Modified: October 16th, 2026
+# ---------------------------------------
+# Description: Replay recorded action histories and cache the per-step game states.
+"""
+
+import os
+import re
+import json
+import pickle
+import hashlib
+import numpy as np
+import os.path as osp
+import logging
+from typing import Iterator, Optional
+from dataclasses import dataclass
+
+from .core import MineField, ActionFeedback
+from .packed import MINE_CODE, REVEALED, FLAGGED, build_symbol_luts
+from .batch import BatchMineField, NO_ACTION, action_type_codes
+
+logger = logging.getLogger(__name__)
+
+__all__ = ["Replay", "ReplayStep", "compile_actions", "replay_histories", "replay_board"]
+
+# lenient action format of LLM responses, same as `parse_action_str` in the task scripts
+loose_action_pattern = re.compile(r"([LMR]) *\(( *\d+) *, *(\d+) *\)")
+
+# bump when the cached arrays change meaning
+REPLAY_CACHE_VERSION = b"replay-v1"
+
+
+def compile_actions(action_history: list[str]) -> np.ndarray:
+    """
+    Compile action strings into an int array with one (action type, row, column) row per action.
+
+    Action types are the `BatchMineField` codes; rows and columns stay 1-based.
+    """
+    actions = np.zeros((len(action_history), 3), dtype=np.int64)
+    for idx, action_str in enumerate(action_history):
+        match_result = loose_action_pattern.search(action_str.strip())
+        if match_result is None:
+            raise ValueError("Invalid response format.")
+        action, row_idx, col_idx = match_result.groups()
+        actions[idx] = action_type_codes[action], int(row_idx), int(col_idx)
+    return actions
+
+
+@dataclass
+class ReplayStep:
+    """
+    Game state right after one replayed action.
+    """
+
+    step: int
+    action: str
+    feedback: ActionFeedback
+    board_disp: np.ndarray
+
+
+@dataclass
+class Replay:
+    """
+    Per-step states of an action history replayed on a board.
+
+    Step `k` is the state after the first `k` actions, so step 0 is the untouched board and
+    `feedbacks[k - 1]` is the feedback of the action leading to step `k`.
+    """
+
+    board_path: str
+    action_history: list[str]
+    feedbacks: np.ndarray
+    # packed cell states (see `PackedMineField`) with shape (n_actions + 1, n_rows, n_cols)
+    board_states: np.ndarray
+    first_move: np.ndarray
+    game_over: np.ndarray
+
+    empty_cell: str = "."
+    mine_cell: str = "*"
+    flag_cell: str = "F"
+    unchecked_cell: str = "?"
+
+    def __len__(self):
+        return len(self.feedbacks)
+
+    def feedback(self, action_idx: int) -> ActionFeedback:
+        return ActionFeedback(int(self.feedbacks[action_idx]))
+
+    def board_disp(self, step: int) -> np.ndarray:
+        _, disp_lut = build_symbol_luts(self.empty_cell, self.mine_cell, self.flag_cell, self.unchecked_cell)
+        return disp_lut[self.board_states[step]]
+
+    def n_correctly_flagged_mines(self, step: int = -1) -> int:
+        return int(np.count_nonzero(self.board_states[step] == (FLAGGED | MINE_CODE)))
+
+    def mine_field(self, step: int, mine_field_cls=MineField, **kwargs) -> MineField:
+        """
+        Load the board into a new game and bring it to the state at `step`.
+
+        The keyword arguments are passed to the game constructor.
+        """
+        step = range(len(self.board_states))[step]
+        m = mine_field_cls(**kwargs).load_board(self.board_path)
+        m.action_history = list(self.action_history[:step])
+
+        # the board is inferred at the first left click, even if it hits a mine
+        if not self.first_move[step] or self.game_over[step]:
+            state = self.board_states[step]
+            m.set_opened_cells((state & REVEALED) != 0, (state & FLAGGED) != 0)
+        m.first_move = bool(self.first_move[step])
+        m.game_over = bool(self.game_over[step])
+        return m
+
+    def __iter__(self) -> Iterator[ReplayStep]:
+        """
+        Lazily yield the state after each action.
+        """
+        _, disp_lut = build_symbol_luts(self.empty_cell, self.mine_cell, self.flag_cell, self.unchecked_cell)
+        for idx, action in enumerate(self.action_history):
+            feedback = ActionFeedback(int(self.feedbacks[idx]))
+            yield ReplayStep(idx + 1, action, feedback, disp_lut[self.board_states[idx + 1]])
+
+
+def replay_cache_key(board_bytes: bytes, action_history: list[str], strict_winning_condition: bool) -> str:
+    hasher = hashlib.sha1(REPLAY_CACHE_VERSION)
+    hasher.update(board_bytes)
+    hasher.update(b"\0strict" if strict_winning_condition else b"\0loose")
+    hasher.update("\n".join(action_history).encode("utf-8"))
+    return hasher.hexdigest()
+
+
+def load_cached_replay(path: str) -> Optional[dict]:
+    # the cache is a local, self-written directory, and pickle loads an order of magnitude faster than npz
+    if not osp.exists(path):
+        return None
+    try:
+        with open(path, "rb") as f:
+            return pickle.load(f)
+    except (OSError, EOFError, pickle.UnpicklingError):
+        logger.warning(f"Ignoring corrupted replay cache {path}.")
+        return None
+
+
+def save_cached_replay(path: str, arrays: dict) -> None:
+    # write to a temporary file first so that concurrent readers never see a partial file
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        pickle.dump(arrays, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_path, path)
+    return None
+
+
+def replay_histories(
+    board_paths: list[str],
+    action_histories: list[list[str]],
+    cache_dir: str = None,
+    strict_winning_condition: bool = False,
+    **kwargs,
+) -> list[Replay]:
+    """
+    Replay action histories on their boards.
+
+    Histories without a cached result are replayed together with `BatchMineField`, one batch per board size.
+    With `cache_dir`, the per-step states are cached on disk, keyed by the board file content and the history.
+
+    Parameters
+    ----------
+    board_paths: board files saved by `MineField.save_board`
+    action_histories: action strings to replay on each board
+    cache_dir: directory of the replay cache; the cache is disabled if `None`
+    strict_winning_condition: passed to the game engine
+    kwargs: board symbols kept by the returned `Replay`s
+
+    Returns
+    -------
+    One `Replay` per board, in input order
+    """
+    assert len(board_paths) == len(action_histories), "Need one action history per board."
+    if cache_dir is not None:
+        os.makedirs(cache_dir, exist_ok=True)
+
+    results = [None] * len(board_paths)
+    uncached = dict()  # (n_rows, n_cols) -> list of (index, board dict, cache path)
+    for idx, (board_path, action_history) in enumerate(zip(board_paths, action_histories)):
+        with open(board_path, "rb") as f:
+            board_bytes = f.read()
+
+        cache_path = None
+        if cache_dir is not None:
+            key = replay_cache_key(board_bytes, action_history, strict_winning_condition)
+            cache_path = osp.join(cache_dir, f"{key}.pkl")
+            results[idx] = load_cached_replay(cache_path)
+            if results[idx] is not None:
+                continue
+
+        board_dict = json.loads(board_bytes)
+        uncached.setdefault((board_dict["n_rows"], board_dict["n_cols"]), list()).append(
+            (idx, board_dict, cache_path)
+        )
+
+    for (n_rows, n_cols), items in uncached.items():
+        indices = [idx for idx, _, _ in items]
+        actions = [compile_actions(action_histories[idx]) for idx in indices]
+        batch = BatchMineField(
+            len(items),
+            n_rows,
+            n_cols,
+            seeds=[board_dict["seed"] for _, board_dict, _ in items],
+            strict_winning_condition=strict_winning_condition,
+        )
+        batch.set_mines(np.array([board_dict["board_mine"] for _, board_dict, _ in items]).astype(bool))
+        arrays = replay_batch(batch, actions)
+
+        for game, (idx, _, cache_path) in enumerate(items):
+            n_steps = len(actions[game])
+            results[idx] = {
+                "feedbacks": arrays["feedbacks"][game, :n_steps],
+                "board_states": arrays["board_states"][game, : n_steps + 1],
+                "first_move": arrays["first_move"][game, : n_steps + 1],
+                "game_over": arrays["game_over"][game, : n_steps + 1],
+            }
+            if cache_path is not None:
+                save_cached_replay(cache_path, results[idx])
+
+    return [
+        Replay(board_path, list(action_history), **arrays, **kwargs)
+        for board_path, action_history, arrays in zip(board_paths, action_histories, results)
+    ]
+
+
+def replay_batch(batch: BatchMineField, actions: list[np.ndarray]) -> dict[str, np.ndarray]:
+    """
+    Step a batch through compiled action arrays of different lengths and record the state after every step.
+    """
+    n_steps = max((len(game_actions) for game_actions in actions), default=0)
+    padded = np.zeros((batch.n_games, n_steps, 3), dtype=np.int64)
+    padded[..., 0] = NO_ACTION
+    for game, game_actions in enumerate(actions):
+        padded[game, : len(game_actions)] = game_actions
+
+    feedbacks = np.zeros((batch.n_games, n_steps), dtype=np.int8)
+    board_states = np.zeros((batch.n_games, n_steps + 1, batch.n_rows, batch.n_cols), dtype=np.uint8)
+    first_move = np.zeros((batch.n_games, n_steps + 1), dtype=bool)
+    game_over = np.zeros((batch.n_games, n_steps + 1), dtype=bool)
+
+    first_move[:, 0] = batch.first_move
+    game_over[:, 0] = batch.game_over
+    for step in range(n_steps):
+        feedbacks[:, step] = batch.step(padded[:, step, 0], padded[:, step, 1], padded[:, step, 2])
+        board_states[:, step + 1] = batch.board_state
+        first_move[:, step + 1] = batch.first_move
+        game_over[:, step + 1] = batch.game_over
+
+    return {"feedbacks": feedbacks, "board_states": board_states, "first_move": first_move, "game_over": game_over}
+
+
+def replay_board(
+    board_path: str, action_history: list[str], cache_dir: str = None, strict_winning_condition: bool = False, **kwargs
+) -> Replay:
+    """
+    Replay one action history, see `replay_histories`.
+    """
+    return replay_histories([board_path], [action_history], cache_dir, strict_winning_condition, **kwargs)[0]
@@ -1,15 +1,37 @@
 """
 # Author: Yinghao Li
-# Modified: November 4th, 2023
+# Modified: October 17th, 2026
 # ---------------------------------------
 # Description: GPT api call and message cache.
 """
 
 import json
+import time
+import asyncio
+import logging
 import openai
-from typing import Union
+from typing import Callable, Optional, Union
 from .prompts import *
 from .io import save_json
+from .cache import ResponseCache
+from .backend import Backend, OpenAIBackend, choice_text
+from .limiter import get_rate_limiter, count_tokens, estimate_prompt_tokens, estimate_tokens, retry_delay
+from .metrics import CallRecord
+from .context import CONTEXT_POLICIES
+from .journal import GameJournal
+
+logger = logging.getLogger(__name__)
+
+# transient api errors worth retrying; the others, e.g., invalid requests, would fail again
+RETRYABLE_ERRORS = (
+    openai.error.RateLimitError,
+    openai.error.Timeout,
+    openai.error.ServiceUnavailableError,
+    openai.error.TryAgain,
+)
+
+# finish reason of a streamed response stopped by the caller
+EARLY_STOP = "early_stop"
 
 
 class GPT:
@@ -22,6 +44,12 @@ class GPT:
         frequency_penalty: float = 0,
         presence_penalty: float = 0,
         stop: list[str] = None,
+        cache: ResponseCache = None,
+        backend: Backend = None,
+        requests_per_min: float = None,
+        tokens_per_min: float = None,
+        max_retries: int = 5,
+        retry_base_delay: float = 1.0,
     ) -> None:
         self.temperature = temperature
         self.max_tokens = max_tokens
@@ -29,59 +57,307 @@ class GPT:
         self.frequency_penalty = frequency_penalty
         self.presence_penalty = presence_penalty
         self.stop = stop
-        self.engine = load_gpt_resources(resource_path)
+        self.max_retries = max_retries
+        self.retry_base_delay = retry_base_delay
+        resources = load_gpt_resources(resource_path)
+        self.engine = resources["engine"]
+        self.backend = backend if backend is not None else OpenAIBackend(resources)
+        # recorded or scripted responses must not end up in the cache of model responses
+        self.cache = cache if self.backend.cacheable else None
+        # the quota is per engine, so all instances using it share one limiter
+        self.rate_limiter = get_rate_limiter(self.engine, requests_per_min, tokens_per_min)
+        # one record per call, in the order of the calls
+        self.calls = list()
+
+    def request_kwargs(self, messages: list[dict[str, str]]) -> dict:
+        """
+        Keyword arguments of the completion request, shared by `response` and `aresponse`.
+        """
+        kwargs = dict(
+            engine=self.engine,
+            temperature=self.temperature,
+            max_tokens=self.max_tokens,
+            top_p=self.top_p,
+            frequency_penalty=self.frequency_penalty,
+            presence_penalty=self.presence_penalty,
+            stop=self.stop,
+        )
+        if "instruct" in self.engine:
+            kwargs["prompt"] = messages[-1]["content"]
+        else:
+            kwargs["messages"] = messages
+        return kwargs
+
+    def lookup(self, request_kwargs: dict) -> tuple[Optional[str], Optional[str]]:
+        """
+        Cache key of the request and the cached response, or `None`s without a cache or on a miss.
+        """
+        if self.cache is None:
+            return None, None
+        key = self.cache.key(request_kwargs)
+        return key, self.cache.get(key)
+
+    def backoff(self, error: Exception, attempt: int) -> float:
+        """
+        Seconds to wait before retrying a request that failed with a transient `error`.
+        """
+        try:
+            retry_after = float(error.headers.get("retry-after"))
+        except (AttributeError, TypeError, ValueError):
+            retry_after = None
+        delay = retry_delay(attempt, base_delay=self.retry_base_delay, retry_after=retry_after)
+        logger.warning(
+            f"GPT request failed with {type(error).__name__}: {error}. "
+            f"Retry {attempt + 1}/{self.max_retries} in {delay:.1f}s."
+        )
+        return delay
+
+    def finish(
+        self,
+        response: str,
+        usage: dict,
+        finish_reason: Optional[str],
+        key: Optional[str],
+        n_estimated_tokens: int,
+        started: float,
+        retries: int,
+        queue_delay: float,
+    ) -> str:
+        """
+        Record the call, settle its token usage with the rate limiter and cache the response.
+        """
+        self.calls.append(
+            CallRecord(
+                latency=time.perf_counter() - started,
+                queue_delay=queue_delay,
+                retries=retries,
+                prompt_tokens=usage.get("prompt_tokens"),
+                completion_tokens=usage.get("completion_tokens"),
+                finish_reason=finish_reason,
+            )
+        )
+
+        if self.rate_limiter is not None:
+            self.rate_limiter.settle(n_estimated_tokens, usage.get("total_tokens"))
+        if key is not None:
+            self.cache.put(key, response)
+        return response
+
+    def finish_completion(self, r, *args) -> str:
+        choice = r["choices"][0]
+        return self.finish(choice_text(choice), r.get("usage") or dict(), choice.get("finish_reason"), *args)
+
+    def finish_stream(self, response: str, finish_reason: Optional[str], request_kwargs: dict, *args) -> str:
+        # streamed responses come without usage, so the tokens are estimated
+        prompt_tokens = estimate_prompt_tokens(request_kwargs)
+        completion_tokens = count_tokens(response)
+        usage = {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens,
+        }
+        return self.finish(response, usage, finish_reason, *args)
 
     def response(self, messages: Union[list[dict[str, str]], "MessageCache"]) -> str:
         """
-        Generate response from GPT.
+        Generate response from GPT, or take it from the response cache.
         """
         if isinstance(messages, MessageCache):
             messages = messages.content
 
-        if "instruct" in self.engine:
-            prompt = messages[-1]["content"]
-            r = openai.Completion.create(
-                engine=self.engine,
-                prompt=prompt,
-                temperature=self.temperature,
-                max_tokens=self.max_tokens,
-                top_p=self.top_p,
-                frequency_penalty=self.frequency_penalty,
-                presence_penalty=self.presence_penalty,
-                stop=self.stop,
-            )
-            return r["choices"][0]["text"]
-        else:
-            r = openai.ChatCompletion.create(
-                messages=messages,
-                engine=self.engine,
-                temperature=self.temperature,
-                max_tokens=self.max_tokens,
-                top_p=self.top_p,
-                frequency_penalty=self.frequency_penalty,
-                presence_penalty=self.presence_penalty,
-                stop=self.stop,
-            )
-            return r["choices"][0]["message"]["content"]
+        started = time.perf_counter()
+        request_kwargs = self.request_kwargs(messages)
+        key, cached = self.lookup(request_kwargs)
+        if cached is not None:
+            self.calls.append(CallRecord(latency=time.perf_counter() - started, cached=True))
+            return cached
+
+        n_tokens = estimate_tokens(request_kwargs)
+        queue_delay = 0.0
+        for attempt in range(self.max_retries + 1):
+            if self.rate_limiter is not None:
+                queue_delay += self.rate_limiter.acquire(n_tokens)
+            try:
+                r = self.backend.create(request_kwargs)
+                break
+            except RETRYABLE_ERRORS as e:
+                if attempt == self.max_retries:
+                    raise
+                time.sleep(self.backoff(e, attempt))
+
+        return self.finish_completion(r, key, n_tokens, started, attempt, queue_delay)
+
+    async def aresponse(self, messages: Union[list[dict[str, str]], "MessageCache"]) -> str:
+        """
+        Generate response from GPT without blocking the event loop.
+        """
+        if isinstance(messages, MessageCache):
+            messages = messages.content
+
+        started = time.perf_counter()
+        request_kwargs = self.request_kwargs(messages)
+        key, cached = self.lookup(request_kwargs)
+        if cached is not None:
+            self.calls.append(CallRecord(latency=time.perf_counter() - started, cached=True))
+            return cached
+
+        n_tokens = estimate_tokens(request_kwargs)
+        queue_delay = 0.0
+        for attempt in range(self.max_retries + 1):
+            if self.rate_limiter is not None:
+                queue_delay += await self.rate_limiter.aacquire(n_tokens)
+            try:
+                r = await self.backend.acreate(request_kwargs)
+                break
+            except RETRYABLE_ERRORS as e:
+                if attempt == self.max_retries:
+                    raise
+                await asyncio.sleep(self.backoff(e, attempt))
+
+        return self.finish_completion(r, key, n_tokens, started, attempt, queue_delay)
+
+    @staticmethod
+    def read_stream(chunks, stop_after: Callable[[str], bool]) -> tuple[str, Optional[str]]:
+        """
+        Collect the deltas of a response stream until it ends or `stop_after` accepts the latest delta.
+        """
+        deltas = list()
+        finish_reason = None
+        for delta, finish_reason in chunks:
+            deltas.append(delta)
+            if stop_after(delta):
+                # closing the stream stops the generation
+                chunks.close()
+                return "".join(deltas), EARLY_STOP
+        return "".join(deltas), finish_reason
+
+    @staticmethod
+    async def aread_stream(chunks, stop_after: Callable[[str], bool]) -> tuple[str, Optional[str]]:
+        deltas = list()
+        finish_reason = None
+        async for delta, finish_reason in chunks:
+            deltas.append(delta)
+            if stop_after(delta):
+                await chunks.aclose()
+                return "".join(deltas), EARLY_STOP
+        return "".join(deltas), finish_reason
+
+    def stream_response(
+        self,
+        messages: Union[list[dict[str, str]], "MessageCache"],
+        stop_after_factory: Callable[[], Callable[[str], bool]],
+    ) -> str:
+        """
+        Generate response from GPT as a stream, and stop the generation once `stop_after` returns `True`.
+
+        `stop_after_factory` makes a `stop_after` for every attempt, which is called with every text delta of the
+        attempt in order, e.g., to parse the response incrementally. A fresh one per attempt keeps the partial text
+        of a failed stream from being parsed together with the retried one.
+        """
+        if isinstance(messages, MessageCache):
+            messages = messages.content
+
+        started = time.perf_counter()
+        request_kwargs = self.request_kwargs(messages)
+        # an early-stopped response is shorter than the complete one, so they are cached apart
+        key, cached = self.lookup({**request_kwargs, "stream": True})
+        if cached is not None:
+            self.calls.append(CallRecord(latency=time.perf_counter() - started, cached=True))
+            return cached
+
+        n_tokens = estimate_tokens(request_kwargs)
+        queue_delay = 0.0
+        for attempt in range(self.max_retries + 1):
+            if self.rate_limiter is not None:
+                queue_delay += self.rate_limiter.acquire(n_tokens)
+            try:
+                chunks = self.backend.stream(request_kwargs)
+                response, finish_reason = self.read_stream(chunks, stop_after_factory())
+                break
+            except RETRYABLE_ERRORS as e:
+                if attempt == self.max_retries:
+                    raise
+                time.sleep(self.backoff(e, attempt))
+
+        return self.finish_stream(response, finish_reason, request_kwargs, key, n_tokens, started, attempt, queue_delay)
+
+    async def astream_response(
+        self,
+        messages: Union[list[dict[str, str]], "MessageCache"],
+        stop_after_factory: Callable[[], Callable[[str], bool]],
+    ) -> str:
+        """
+        Same as `stream_response`, without blocking the event loop.
+        """
+        if isinstance(messages, MessageCache):
+            messages = messages.content
+
+        started = time.perf_counter()
+        request_kwargs = self.request_kwargs(messages)
+        key, cached = self.lookup({**request_kwargs, "stream": True})
+        if cached is not None:
+            self.calls.append(CallRecord(latency=time.perf_counter() - started, cached=True))
+            return cached
+
+        n_tokens = estimate_tokens(request_kwargs)
+        queue_delay = 0.0
+        for attempt in range(self.max_retries + 1):
+            if self.rate_limiter is not None:
+                queue_delay += await self.rate_limiter.aacquire(n_tokens)
+            try:
+                chunks = self.backend.astream(request_kwargs)
+                response, finish_reason = await self.aread_stream(chunks, stop_after_factory())
+                break
+            except RETRYABLE_ERRORS as e:
+                if attempt == self.max_retries:
+                    raise
+                await asyncio.sleep(self.backoff(e, attempt))
+
+        return self.finish_stream(response, finish_reason, request_kwargs, key, n_tokens, started, attempt, queue_delay)
 
     def __call__(self, messages: Union[list[dict[str, str]], "MessageCache"]) -> str:
         return self.response(messages)
 
 
 class MessageCache:
-    def __init__(self, system_role: str = None) -> None:
+    def __init__(
+        self,
+        system_role: str = None,
+        context_policy: str = None,
+        max_context_tokens: int = None,
+        journal: GameJournal = None,
+    ) -> None:
         self.system_role = (
             system_role
             if system_role is not None
             else "You are a helpful assistant who is good at playing Minesweeper."
         )
+        # prunes the messages sent to the model; the complete conversation is kept in `message_cache`
+        if context_policy is not None and max_context_tokens is not None:
+            if context_policy not in CONTEXT_POLICIES:
+                raise ValueError(f"Unknown context policy: {context_policy}")
+            self.context_policy = CONTEXT_POLICIES[context_policy](max_context_tokens)
+        else:
+            self.context_policy = None
+        # what the policy pruned from the latest `content`, `None` if nothing
+        self.last_pruning = None
+
+        # every message is also appended to the journal as it is added
+        self.journal = journal
+        if self.journal is not None:
+            self.journal.write({"type": "conversation"})
+
         self.message_cache = list()
+        self.n_tokens = list()
         self.add_message("system", self.system_role)
 
     def add_message(self, role: str, content: str) -> None:
         self.message_cache.append(
             {"role": role, "content": content},
         )
+        self.n_tokens.append(count_tokens(content))
+        if self.journal is not None:
+            self.journal.write({"type": "message", "role": role, "content": content})
 
     def add_user_message(self, content: str) -> None:
         self.add_message("user", content)
@@ -91,13 +367,16 @@ class MessageCache:
 
     @property
     def content(self) -> list[dict[str, str]]:
-        return self.message_cache
+        """
+        Messages to send to the model, pruned to the token budget if a context policy is set.
+        """
+        if self.context_policy is None:
+            return self.message_cache
+        content, self.last_pruning = self.context_policy.prune(self.message_cache, self.n_tokens)
+        return content
 
     def __str__(self) -> str:
-        message = ""
-        for msg in self.message_cache:
-            message += f">> {msg['role'].upper()}:\n{msg['content']}\n\n"
-        return message
+        return format_transcript(self.message_cache)
 
     def print(self) -> None:
         print(self.__str__())
@@ -107,20 +386,41 @@ class MessageCache:
 
     def load(self, path: str) -> "MessageCache":
         with open(path, "r", encoding="utf-8") as f:
-            self.message_cache = json.load(f)
+            self.restore(json.load(f))
+        if self.journal is not None:
+            self.write_journal()
+        return self
+
+    def restore(self, messages: list[dict[str, str]]) -> "MessageCache":
+        """
+        Replace the messages, without adding them to the journal.
+        """
+        self.message_cache = list(messages)
+        self.n_tokens = [count_tokens(message["content"]) for message in self.message_cache]
+        if self.context_policy is not None:
+            # the memos of the policy are per message index
+            self.context_policy = type(self.context_policy)(self.context_policy.max_tokens)
         return self
 
+    def write_journal(self) -> None:
+        """
+        Add the messages to the journal as a new conversation.
+        """
+        self.journal.write({"type": "conversation"})
+        for message in self.message_cache:
+            self.journal.write({"type": "message", **message})
+        return None
+
     def save_plain(self, path: str) -> None:
         with open(path, "w", encoding="utf-8") as f:
             f.write(self.__str__())
 
 
-def load_gpt_resources(path: str) -> str:
-    with open(path, "r", encoding="utf-8") as f:
-        resource_dict = json.load(f)
+def format_transcript(messages: list[dict[str, str]]) -> str:
+    return "".join(f">> {msg['role'].upper()}:\n{msg['content']}\n\n" for msg in messages)
 
-    for k, v in resource_dict.items():
-        if k != "engine":
-            setattr(openai, k, v)
 
-    return resource_dict["engine"]
+def load_gpt_resources(path: str) -> dict:
+    with open(path, "r", encoding="utf-8") as f:
+        resource_dict = json.load(f)
+    return resource_dict
@@ -0,0 +1,89 @@
+"""
+# Author: Yinghao Li
+# Modified: October 16th, 2026
+# ---------------------------------------
+# Description: Append-only action history for the compressed-history prompts.
+"""
+
+import logging
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+__all__ = ["ActionHistory"]
+
+
+class ActionHistory:
+    """
+    Action and feedback lines of a game, each formatted once when the action is appended.
+
+    With `max_actions` or `max_chars`, the oldest lines are folded into a one-line summary so that at most
+    `max_actions` lines are kept verbatim and the text stays within `max_chars` characters (the latest line is
+    always kept). Without a cap, `text` is the plain concatenation of all lines.
+    """
+
+    def __init__(self, max_actions: Optional[int] = None, max_chars: Optional[int] = None):
+        self.max_actions = max_actions
+        self.max_chars = max_chars
+
+        self.lines = list()
+        self.successes = list()
+
+        # the first `n_folded` lines are replaced by the summary
+        self.n_folded = 0
+        self.n_folded_successes = 0
+        # number of characters of the lines that are kept verbatim
+        self.n_kept_chars = 0
+
+        self.joined = None
+
+    def __len__(self):
+        return len(self.lines)
+
+    def append(self, action: str, feedback: str, success: bool = True) -> None:
+        line = f"[Action {len(self.lines) + 1}]: ACTION: {action} -> FEEDBACK: {feedback}\n"
+        self.lines.append(line)
+        self.successes.append(success)
+        self.n_kept_chars += len(line)
+
+        n_folded = self.n_folded
+        while len(self.lines) - self.n_folded > 1 and self.over_budget():
+            self.n_kept_chars -= len(self.lines[self.n_folded])
+            self.n_folded_successes += self.successes[self.n_folded]
+            self.n_folded += 1
+
+        # extend the joined view unless the summary has changed
+        if self.joined is not None and self.n_folded == n_folded:
+            self.joined += line
+        else:
+            self.joined = None
+        return None
+
+    def over_budget(self) -> bool:
+        n_kept = len(self.lines) - self.n_folded
+        if self.max_actions is not None and n_kept > self.max_actions:
+            return True
+        if self.max_chars is not None and len(self.summary) + self.n_kept_chars > self.max_chars:
+            return True
+        return False
+
+    @property
+    def summary(self) -> str:
+        """
+        The line replacing the folded actions, or an empty string if no action is folded.
+        """
+        if not self.n_folded:
+            return ""
+        return (
+            f"[Actions 1-{self.n_folded}]: {self.n_folded} earlier actions are omitted, "
+            f"{self.n_folded_successes} of which were successful.\n"
+        )
+
+    @property
+    def text(self) -> str:
+        if self.joined is None:
+            self.joined = self.summary + "".join(self.lines[self.n_folded :])
+        return self.joined
+
+    def __str__(self) -> str:
+        return self.text
@@ -1,14 +1,24 @@
 """
 # Author: Yinghao Li
-# Modified: November 11th, 2023
+# Modified: October 17th, 2026
 # ---------------------------------------
 # Description: Interaction functions
 """
 
 import re
-from .prompts import GamePlayTablePrompt, GamePlayCoordinatePrompt
-from .game import MineField, ActionFeedback
+import logging
+from typing import Optional
+from dataclasses import asdict
+from .prompts import GamePlayTablePrompt, GamePlayCoordinatePrompt, get_prompt
+from .game import MineField, PackedMineField, ActionFeedback, COORDINATE_ENCODINGS
 from .gpt import GPT, MessageCache
+from .history import ActionHistory
+from .cache import get_response_cache
+from .backend import build_backend
+from .metrics import CallRecord
+from .journal import GameJournal, CHECKPOINT_VERSION
+
+logger = logging.getLogger(__name__)
 
 action_map = {
     "L": "left_click",
@@ -18,6 +28,26 @@ action_map = {
 
 number_cells = ",".join([f"`{i}'" for i in range(1, 8)])
 
+action_pattern = re.compile(r"([LMR]) *\(( *\d+) *, *(\d+) *\)")
+
+
+class ActionLineDetector:
+    """
+    Incremental check of a streamed response for a complete action after its last `ACTION:` tag, i.e., the
+    action `Interaction.parse_action_str` would take from the response so far.
+    """
+
+    def __init__(self):
+        self.text = ""
+
+    def feed(self, delta: str) -> bool:
+        self.text += delta
+        # an action is complete only with its closing parenthesis
+        if ")" not in delta:
+            return False
+        tag_idx = self.text.rfind("ACTION:")
+        return tag_idx >= 0 and action_pattern.search(self.text, tag_idx + len("ACTION:")) is not None
+
 
 class Interaction:
     def __init__(
@@ -34,11 +64,39 @@ class Interaction:
         seed: int = 42,
         use_row_column_indices: bool = True,
         represent_board_as_coordinate: bool = False,
+        coordinate_encoding: str = "full",
+        use_viewport: bool = False,
+        viewport_margin: int = 2,
+        viewport_max_windows: int = 3,
+        use_board_diff: bool = False,
+        board_diff_checkpoint_interval: int = 10,
         use_compressed_history: bool = False,
+        history_max_actions: int = None,
+        history_max_chars: int = None,
         strict_winning_condition: bool = False,
         no_example_1: bool = False,
         no_example_2: bool = False,
         no_example_3: bool = False,
+        use_packed_engine: bool = False,
+        legacy_placement: bool = False,
+        gpt_cache_path: str = None,
+        gpt_cache_mode: str = "readwrite",
+        gpt_cache_max_age_days: float = None,
+        gpt_cache_max_size_mb: float = None,
+        gpt_requests_per_min: float = None,
+        gpt_tokens_per_min: float = None,
+        gpt_max_retries: int = 5,
+        gpt_retry_base_delay: float = 1.0,
+        gpt_backend: str = "openai",
+        replay_dir: str = None,
+        mock_latency: float = 0.0,
+        mock_latency_jitter: float = 0.0,
+        mock_token_latency: float = 0.0,
+        use_streaming: bool = False,
+        context_policy: str = None,
+        max_context_tokens: int = None,
+        journal_path: str = None,
+        journal_fsync: str = "step",
         **kwargs,
     ) -> None:
         self.use_compressed_history = use_compressed_history
@@ -46,8 +104,9 @@ class Interaction:
         self.no_example_2 = no_example_2
         self.no_example_3 = no_example_3
 
+        mine_field_cls = PackedMineField if use_packed_engine else MineField
         if board_path is not None:
-            self.m = MineField(
+            self.m = mine_field_cls(
                 empty_cell=empty_cell,
                 mine_cell=mine_cell,
                 flag_cell=flag_cell,
@@ -55,7 +114,7 @@ class Interaction:
                 strict_winning_condition=strict_winning_condition,
             ).load_board(board_path)
         else:
-            self.m = MineField(
+            self.m = mine_field_cls(
                 n_rows=n_rows,
                 n_cols=n_cols,
                 n_mines=n_mines,
@@ -65,36 +124,99 @@ class Interaction:
                 flag_cell=flag_cell,
                 unchecked_cell=unchecked_cell,
                 strict_winning_condition=strict_winning_condition,
+                legacy_placement=legacy_placement,
             )
 
-        self.gpt = GPT(resource_path=gpt_resource_path)
-        self.messages = MessageCache()
+        cache = get_response_cache(gpt_cache_path, gpt_cache_mode, gpt_cache_max_age_days, gpt_cache_max_size_mb)
+        backend = build_backend(
+            gpt_backend,
+            board_path=board_path,
+            replay_dir=replay_dir,
+            mock_latency=mock_latency,
+            mock_latency_jitter=mock_latency_jitter,
+            mock_token_latency=mock_token_latency,
+            board_size=(self.m.n_rows, self.m.n_cols),
+            seed=seed,
+        )
+        self.gpt = GPT(
+            resource_path=gpt_resource_path,
+            cache=cache,
+            backend=backend,
+            requests_per_min=gpt_requests_per_min,
+            tokens_per_min=gpt_tokens_per_min,
+            max_retries=gpt_max_retries,
+            retry_base_delay=gpt_retry_base_delay,
+        )
+        self.use_streaming = use_streaming
         self.represent_board_as_coordinate = represent_board_as_coordinate
+        if coordinate_encoding not in COORDINATE_ENCODINGS:
+            raise ValueError(f"Unknown coordinate encoding: {coordinate_encoding}")
+        self.coordinate_encoding = coordinate_encoding
+        self.use_viewport = use_viewport
+        self.viewport_margin = viewport_margin
+        self.viewport_max_windows = viewport_max_windows
+        # board diffs only apply to the natural conversation, where the previous boards stay in the context
+        self.use_board_diff = use_board_diff and not use_compressed_history
+        self.board_diff_checkpoint_interval = board_diff_checkpoint_interval
         if represent_board_as_coordinate:
-            self.prompt = GamePlayCoordinatePrompt(mine_field=self.m)
+            self.prompt = get_prompt(
+                GamePlayCoordinatePrompt,
+                mine_field=self.m,
+                coordinate_encoding=coordinate_encoding,
+                use_viewport=use_viewport,
+                use_board_diff=self.use_board_diff,
+            )
         else:
-            self.prompt = GamePlayTablePrompt(mine_field=self.m, with_row_column_ids=use_row_column_indices)
+            self.prompt = get_prompt(
+                GamePlayTablePrompt,
+                mine_field=self.m,
+                with_row_column_ids=use_row_column_indices,
+                use_viewport=use_viewport,
+                use_board_diff=self.use_board_diff,
+            )
 
-        init_examples = (
+        examples = (
             f"--- EXAMPLES ---\n"
             f"{self.prompt.example_1 if not self.no_example_1 else ''}\n"
             f"{self.prompt.example_2 if not self.no_example_1 else ''}\n"
             f"{self.prompt.example_3 if not self.no_example_1 else ''}"
             "--- END OF EXAMPLES ---\n\n"
         )
-        self.init_prompt = (
+        # the static head shared by the initial prompt and every compressed-history prompt
+        self.instructions = (
             f"{self.prompt.wiki_game}\n"
             f"{self.prompt.action_options}\n"
             f"{self.prompt.action_format}\n"
             f"{self.prompt.action_regulation}\n"
-            f"{init_examples}"
-            f"--- CURRENT BOARD ---\n```\n{self.m.to_str_table()}\n```\n\n"
+            f"{examples}"
+        )
+        self.init_prompt = (
+            f"{self.instructions}"
+            f"--- CURRENT BOARD ---\n```\n{self.board_to_str(initial=True)}\n```\n\n"
             f"{self.prompt.init_response_guide}"
         )
+        # messages and steps are appended to the journal as the game goes, so a crashed game leaves its record
+        self.journal = GameJournal(journal_path, fsync=journal_fsync) if journal_path is not None else None
+        if self.journal is not None:
+            self.journal.write({"type": "game", **self.settings})
+        # the compressed history starts a new conversation every step, so only the natural conversation is pruned
+        self.messages = MessageCache(
+            context_policy=context_policy, max_context_tokens=max_context_tokens, journal=self.journal
+        )
+        # what the context policy pruned from each request
+        self.context_prunings = list()
         self.step_idx = 1
         self.action_feedback = ActionFeedback.SUCCESS
         self.action_feedback_list = list()
         self.action_history = list()
+        # responses of the executed steps
+        self.responses = list()
+        # formatted action and feedback lines for the compressed-history prompts
+        self.history = ActionHistory(max_actions=history_max_actions, max_chars=history_max_chars)
+        # how the board is presented in each user turn, "full" or "diff"
+        self.board_modes = list()
+        # number of engine deltas already reflected in the boards sent to the model
+        self.n_sent_deltas = 0
 
         self.game_feedback_to_prompt = {
             ActionFeedback.SUCCESS: "Action successful!",
@@ -115,10 +237,42 @@ class Interaction:
             ActionFeedback.START_BY_RIGHT_CLICK: f"Please begin by left-clicking on a cell.",
         }
 
+    @property
+    def n_valid_actions(self) -> int:
+        """
+        Number of actions the game accepted, including the one that hit a mine.
+        """
+        valid_feedbacks = (ActionFeedback.SUCCESS, ActionFeedback.GAME_OVER, ActionFeedback.GAME_WIN)
+        return sum(feedback in valid_feedbacks for feedback in self.action_feedback_list)
+
+    @property
+    def is_over(self) -> bool:
+        return self.action_feedback in (ActionFeedback.GAME_WIN, ActionFeedback.GAME_OVER)
+
     def step(self) -> str:
         self.update_user_prompt()
+        if self.use_streaming:
+            response = self.gpt.stream_response(self.messages, lambda: ActionLineDetector().feed)
+        else:
+            response = self.gpt(self.messages)
+        return self.apply_response(response)
 
-        response = self.gpt(self.messages)
+    async def astep(self) -> str:
+        """
+        Same as `step`, but awaits the model response so that several games can be played concurrently.
+        """
+        self.update_user_prompt()
+        if self.use_streaming:
+            response = await self.gpt.astream_response(self.messages, lambda: ActionLineDetector().feed)
+        else:
+            response = await self.gpt.aresponse(self.messages)
+        return self.apply_response(response)
+
+    def apply_response(self, response: str) -> str:
+        """
+        Record the model response of the current step and execute its action.
+        """
+        self.context_prunings.append(self.messages.last_pruning)
         self.messages.add_assistant_message(response)
 
         action, row_idx, col_idx = self.parse_action_str(response)
@@ -126,10 +280,151 @@ class Interaction:
 
         self.action_feedback = self.excute_action(action, row_idx, col_idx)
         self.action_feedback_list.append(self.action_feedback)
+        self.history.append(
+            self.action_history[-1],
+            self.game_feedback_to_prompt[self.action_feedback],
+            success=self.action_feedback in (ActionFeedback.SUCCESS, ActionFeedback.GAME_WIN),
+        )
+        if self.journal is not None:
+            self.journal.write(
+                {
+                    "type": "step",
+                    "step_idx": self.step_idx,
+                    "response": response,
+                    "action": self.action_history[-1],
+                    "feedback": self.action_feedback.name,
+                    "board_mode": self.board_modes[-1],
+                    "context_pruning": self.context_prunings[-1],
+                    "call": asdict(self.gpt.calls[-1]),
+                }
+            )
 
+        self.responses.append(response)
         self.step_idx += 1
         return response
 
+    def replay_step(self, record: dict) -> str:
+        """
+        Redo a step of an interrupted game with the response and the call record journaled when it was played.
+        """
+        self.update_user_prompt()
+        self.messages.last_pruning = record["context_pruning"]
+        self.gpt.calls.append(CallRecord(**record["call"]))
+        return self.apply_response(record["response"])
+
+    @property
+    def settings(self) -> dict:
+        """
+        What a checkpoint or a journal applies to: a game played with the same board, engine and prompts.
+        """
+        return {
+            "engine": type(self.m).__name__,
+            "init_prompt": self.init_prompt,
+            "use_compressed_history": self.use_compressed_history,
+        }
+
+    def checkpoint(self) -> dict:
+        """
+        State of the game after the latest step, from which `resume` continues the game.
+        """
+        return {
+            "version": CHECKPOINT_VERSION,
+            **self.settings,
+            "step_idx": self.step_idx,
+            "board": self.m.snapshot(),
+            # the deltas not yet presented to the model, which the next changed-cell listing is made of
+            "unsent_deltas": self.m.delta_log[self.n_sent_deltas :],
+            "messages": self.messages.message_cache,
+            "action_history": self.action_history,
+            "action_feedback_list": self.action_feedback_list,
+            "history": self.history,
+            "board_modes": self.board_modes,
+            "context_prunings": self.context_prunings,
+            "responses": self.responses,
+            "calls": self.gpt.calls,
+        }
+
+    def restore(self, checkpoint: dict) -> None:
+        self.m.restore(checkpoint["board"])
+        self.m.delta_log = list(checkpoint["unsent_deltas"])
+        self.n_sent_deltas = 0
+
+        self.messages.restore(checkpoint["messages"])
+        self.step_idx = checkpoint["step_idx"]
+        self.action_history = list(checkpoint["action_history"])
+        self.action_feedback_list = list(checkpoint["action_feedback_list"])
+        self.action_feedback = self.action_feedback_list[-1] if self.action_feedback_list else ActionFeedback.SUCCESS
+        self.history = checkpoint["history"]
+        self.board_modes = list(checkpoint["board_modes"])
+        self.context_prunings = list(checkpoint["context_prunings"])
+        self.messages.last_pruning = self.context_prunings[-1] if self.context_prunings else None
+        self.responses = list(checkpoint["responses"])
+        self.gpt.calls = list(checkpoint["calls"])
+        return None
+
+    def resume(self, checkpoint: Optional[dict], records: list[dict]) -> int:
+        """
+        Continue an interrupted game from its latest checkpoint, then redo the later steps in its journal
+        `records` with their journaled responses, so that no step already paid for is requested again. A checkpoint
+        or a journal of a game played with other settings is ignored.
+
+        Returns the number of steps the game is resumed after.
+        """
+        settings = self.settings
+        if checkpoint is not None and any(checkpoint[key] != value for key, value in settings.items()):
+            logger.warning("The checkpoint is of a game played with other settings. Starting over.")
+            checkpoint = None
+            records = list()
+        # the journal starts with the settings of its game
+        header = {"type": "game", **settings}
+        if records and records[0] != header:
+            logger.warning("The journal is of a game played with other settings. Starting over.")
+            checkpoint = None
+            records = list()
+
+        if checkpoint is not None:
+            self.restore(checkpoint)
+            if self.journal is not None:
+                # the journal is kept up to the checkpoint; the later steps are journaled again as they are redone
+                n_records = next(
+                    (
+                        idx + 1
+                        for idx, record in enumerate(records)
+                        if record["type"] == "step" and record["step_idx"] == self.step_idx - 1
+                    ),
+                    None,
+                )
+                if n_records is not None:
+                    self.journal.rewrite(records[:n_records])
+                else:
+                    logger.warning(f"The journal {self.journal.path} stops before the checkpoint.")
+                    self.journal.rewrite(records if records else [header])
+                    self.messages.write_journal()
+
+        for record in records:
+            if record["type"] != "step" or record["step_idx"] < self.step_idx:
+                continue
+            if record["step_idx"] != self.step_idx or self.is_over:
+                break
+            self.replay_step(record)
+            if self.action_feedback.name != record["feedback"]:
+                logger.warning(f"Step {record['step_idx']} does not match the journal. Stopping the replay.")
+                break
+
+        # e.g., the recorded responses of the replay backend consumed by the redone steps
+        self.gpt.backend.skip(self.step_idx - 1)
+        return self.step_idx - 1
+
+    def close_journal(self) -> None:
+        """
+        Mark the game as finished in the journal and close it.
+        """
+        if self.journal is None:
+            return None
+        self.journal.write({"type": "end", "n_steps": self.step_idx - 1, "feedback": self.action_feedback.name})
+        self.journal.close()
+        return None
+
     def excute_action(self, action: str, row_idx: str, col_idx: str):
         action = action_map[action]
         row_idx = int(row_idx)
@@ -139,6 +434,47 @@ class Interaction:
 
         return action_response
 
+    def board_to_str(self, initial: bool = False) -> str:
+        """
+        Render the current board as configured.
+
+        The initial board is always a table unless the viewport is used.
+        """
+        if self.use_viewport:
+            if self.represent_board_as_coordinate and not initial:
+                return self.m.to_dict_viewport(
+                    self.coordinate_encoding, self.viewport_margin, self.viewport_max_windows
+                )
+            return self.m.to_str_viewport(self.viewport_margin, self.viewport_max_windows)
+        if self.represent_board_as_coordinate and not initial:
+            return self.m.to_dict_table(self.coordinate_encoding)
+        return self.m.to_str_table()
+
+    def board_to_prompt(self) -> str:
+        """
+        Present the current board in a follow-up turn, as the full board or as the cells changed since the last
+        presented board, and record which one is used. A full board is also sent when the turns since the last
+        one no longer fit in the context budget.
+        """
+        interval = self.board_diff_checkpoint_interval
+        checkpoint = interval > 0 and (self.step_idx - 1) % interval == 0
+        # the context policy keeps the turns since the latest full board; once they outgrow the budget, a new full
+        # board lets the older ones go
+        pruning = self.messages.last_pruning
+        if pruning is not None and pruning.get("reference_board") is not None and pruning.get("over_budget"):
+            checkpoint = True
+        if self.use_board_diff and not checkpoint:
+            changes = self.m.to_diff_table(self.n_sent_deltas)
+            if not changes:
+                changes = "No cell has changed."
+            prompt = f"--- CHANGED CELLS ---\n```\n{changes}\n```\n\n"
+            self.board_modes.append("diff")
+        else:
+            prompt = f"--- CURRENT BOARD ---\n```\n{self.board_to_str()}\n```\n\n"
+            self.board_modes.append("full")
+        self.n_sent_deltas = len(self.m.delta_log)
+        return prompt
+
     def update_user_prompt(self) -> str:
         if self.use_compressed_history:
             prompt = self.update_user_prompt_compressed_history()
@@ -149,13 +485,11 @@ class Interaction:
     def update_user_prompt_natural_conversation(self) -> str:
         if self.step_idx == 1:
             prompt = f"{self.init_prompt}"
+            self.board_modes.append("full")
             self.messages.add_user_message(prompt)
         else:
             prompt = self.feedback_to_prompt()
-            if self.represent_board_as_coordinate:
-                prompt += f"--- CURRENT BOARD ---\n```\n{self.m.to_dict_table()}\n```\n\n"
-            else:
-                prompt += f"--- CURRENT BOARD ---\n```\n{self.m.to_str_table()}\n```\n\n"
+            prompt += self.board_to_prompt()
 
             prompt += f"{self.prompt.action_regulation}\n"
             prompt += "REASONING:\n\nACTION:\n"
@@ -165,40 +499,24 @@ class Interaction:
     def update_user_prompt_compressed_history(self) -> str:
         if self.step_idx == 1:
             prompt = f"{self.init_prompt}"
+            self.board_modes.append("full")
             self.messages.add_user_message(prompt)
         else:
-            if self.represent_board_as_coordinate:
-                current_board = f"--- CURRENT BOARD ---\n```\n{self.m.to_dict_table()}\n```\n"
-            else:
-                current_board = f"--- CURRENT BOARD ---\n```\n{self.m.to_str_table()}\n```\n"
-
-            examples = (
-                f"--- EXAMPLES ---\n"
-                f"{self.prompt.example_1 if not self.no_example_1 else ''}\n"
-                f"{self.prompt.example_2 if not self.no_example_1 else ''}\n"
-                f"{self.prompt.example_3 if not self.no_example_1 else ''}"
-                "--- END OF EXAMPLES ---\n\n"
-            )
+            self.board_modes.append("full")
+            current_board = f"--- CURRENT BOARD ---\n```\n{self.board_to_str()}\n```\n"
             prompt = (
-                f"{self.prompt.wiki_game}\n"
-                f"{self.prompt.action_options}\n"
-                f"{self.prompt.action_format}\n"
-                f"{self.prompt.action_regulation}\n"
-                f"{examples}"
+                f"{self.instructions}"
                 f"--- YOUR ACTION HISTORY ---\n{self.compose_action_history_and_feedbacks()}\n\n"
                 f"{current_board}\n"
                 f"{self.prompt.response_guide}"
             )
             # clear the message cache
-            self.messages = MessageCache()
+            self.messages = MessageCache(journal=self.journal)
             self.messages.add_user_message(prompt)
         return prompt
 
     def compose_action_history_and_feedbacks(self) -> str:
-        text = ""
-        for i, (action, feedback) in enumerate(zip(self.action_history, self.action_feedback_list)):
-            text += f"[Action {i + 1}]: ACTION: {action} -> FEEDBACK: {self.game_feedback_to_prompt[feedback]}\n"
-        return text
+        return self.history.text
 
     def feedback_to_prompt(self) -> str:
         if self.action_feedback == ActionFeedback.SUCCESS:
@@ -214,7 +532,7 @@ class Interaction:
     def parse_action_str(self, response: str) -> tuple[str, str, str]:
         response_ = re.sub(r"(?s)(.*)ACTION:", "", response)
         response_ = response_.strip()
-        match_result = re.search(r"([LMR]) *\(( *\d+) *, *(\d+) *\)", response_)
+        match_result = action_pattern.search(response_)
         try:
             action, row_idx, col_idx = match_result.groups()
         except (AttributeError, TypeError):
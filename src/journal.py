@@ -0,0 +1,144 @@
+"""
+# Author: Yinghao Li
+# Modified: October 17th, 2026
+# ---------------------------------------
+# Description: Append-only JSONL journal of a game, written as the game is played, and game checkpoints.
+"""
+
+import os
+import json
+import pickle
+import logging
+import os.path as osp
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+__all__ = [
+    "GameJournal",
+    "read_journal",
+    "journal_transcript",
+    "save_checkpoint",
+    "load_checkpoint",
+    "FSYNC_POLICIES",
+    "CHECKPOINT_VERSION",
+]
+
+# none:    flush every record to the operating system, which survives a crash of the process
+# step:    also fsync after every step record, which survives a crash of the machine up to the last step
+# message: fsync after every record
+FSYNC_POLICIES = ("none", "step", "message")
+
+# bump when the content of the checkpoints changes meaning
+CHECKPOINT_VERSION = 1
+
+
+class GameJournal:
+    """
+    One JSON record per line, appended as the game goes.
+
+    Records have a `type`: `game` opens the journal with the settings of the game, `conversation` starts a new
+    message cache (the compressed history starts one every step), `message` is a message added to it, `step` is
+    an executed action and `end` closes the game.
+    """
+
+    def __init__(self, path: str, fsync: str = "step"):
+        if fsync not in FSYNC_POLICIES:
+            raise ValueError(f"Unknown fsync policy: {fsync}")
+        self.path = path
+        self.fsync = fsync
+
+        if osp.dirname(path):
+            os.makedirs(osp.dirname(path), exist_ok=True)
+        # a journal left by an interrupted run is started over
+        self.file = open(path, "w", encoding="utf-8")
+
+    def write(self, record: dict) -> None:
+        if self.file is None:
+            raise ValueError(f"Journal {self.path} is closed.")
+        self.file.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self.file.flush()
+        if self.fsync == "message" or (self.fsync == "step" and record["type"] in ("step", "end")):
+            os.fsync(self.file.fileno())
+        return None
+
+    def rewrite(self, records: list[dict]) -> None:
+        """
+        Replace the content of the journal with `records`, e.g., those of a resumed game up to its checkpoint.
+        """
+        self.file.seek(0)
+        self.file.truncate()
+        for record in records:
+            self.file.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self.file.flush()
+        if self.fsync != "none":
+            os.fsync(self.file.fileno())
+        return None
+
+    def close(self) -> None:
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+        return None
+
+
+def read_journal(path: str) -> list[dict]:
+    """
+    Read the records of a journal; a line cut off by a crash is dropped.
+    """
+    records = list()
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                records.append(json.loads(line))
+            except json.JSONDecodeError:
+                logger.warning(f"Dropping the incomplete last record of {path}.")
+                break
+    return records
+
+
+def journal_transcript(records: list[dict]) -> str:
+    """
+    Transcript of the latest message cache of a journal, the same as `str(MessageCache)` at that point.
+    """
+    # imported here to avoid the circular import through `gpt`
+    from .gpt import format_transcript
+
+    messages = list()
+    for record in records:
+        if record["type"] == "conversation":
+            messages = list()
+        elif record["type"] == "message":
+            messages.append(record)
+    return format_transcript(messages)
+
+
+def save_checkpoint(checkpoint: dict, path: str) -> None:
+    """
+    Pickle a game checkpoint; the previous checkpoint is replaced only once the new one is completely written.
+    """
+    if osp.dirname(path):
+        os.makedirs(osp.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        pickle.dump(checkpoint, f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+    return None
+
+
+def load_checkpoint(path: str) -> Optional[dict]:
+    """
+    Load a game checkpoint, or `None` if it is unreadable or from another checkpoint version.
+    """
+    try:
+        with open(path, "rb") as f:
+            checkpoint = pickle.load(f)
+    except (OSError, EOFError, pickle.UnpicklingError) as e:
+        logger.warning(f"Failed to load the checkpoint {path}: {e}")
+        return None
+    if checkpoint.get("version") != CHECKPOINT_VERSION:
+        logger.warning(f"Ignoring the checkpoint {path} of another version.")
+        return None
+    return checkpoint
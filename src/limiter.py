@@ -0,0 +1,192 @@
+"""
+# Author: Yinghao Li
+# Modified: October 16th, 2026
+# ---------------------------------------
+# Description: Client-side rate limiting and retry backoff for the GPT api calls.
+"""
+
+import time
+import random
+import asyncio
+import threading
+import logging
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+__all__ = [
+    "RateLimiter",
+    "get_rate_limiter",
+    "count_tokens",
+    "estimate_prompt_tokens",
+    "estimate_tokens",
+    "retry_delay",
+]
+
+# engine -> limiter shared by all `GPT` instances of the process
+rate_limiters = dict()
+rate_limiters_lock = threading.Lock()
+
+# backoff jitter is drawn apart from the global `random` state, which the tasks seed to sample their questions
+backoff_rng = random.Random()
+
+
+class TokenBucket:
+    """
+    Bucket refilled at `rate_per_min` units per minute and holding at most one minute of quota.
+
+    `reserve` always takes the units, letting the level go negative, and returns how long the caller has to wait
+    before the reservation is covered. Later callers therefore queue behind the earlier ones in arrival order.
+    """
+
+    def __init__(self, rate_per_min: float):
+        self.rate = rate_per_min / 60
+        self.capacity = rate_per_min
+        self.level = rate_per_min
+        self.updated = time.monotonic()
+
+    def refill(self, now: float) -> None:
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+        return None
+
+    def reserve(self, amount: float, now: float) -> float:
+        self.refill(now)
+        self.level -= amount
+        return max(0.0, -self.level / self.rate)
+
+    def refund(self, amount: float) -> None:
+        self.level = min(self.capacity, self.level + amount)
+        return None
+
+
+class RateLimiter:
+    """
+    Token-bucket limiter on requests per minute and tokens per minute.
+
+    Both limits are optional. The token count of a request is an estimate taken before the call; `settle`
+    corrects it with the usage reported by the api so that the limiter runs at the quota rather than below it.
+    """
+
+    def __init__(
+        self, name: str = None, requests_per_min: Optional[float] = None, tokens_per_min: Optional[float] = None
+    ):
+        self.name = name
+        self.request_bucket = TokenBucket(requests_per_min) if requests_per_min else None
+        self.token_bucket = TokenBucket(tokens_per_min) if tokens_per_min else None
+        self.lock = threading.Lock()
+
+        self.n_requests = 0
+        self.n_delayed = 0
+        self.total_delay = 0.0
+        self.max_delay = 0.0
+
+    def reserve(self, n_tokens: int) -> float:
+        """
+        Take the quota of one request with `n_tokens` tokens and return the queueing delay in seconds.
+        """
+        with self.lock:
+            now = time.monotonic()
+            delay = 0.0
+            if self.request_bucket is not None:
+                delay = max(delay, self.request_bucket.reserve(1, now))
+            if self.token_bucket is not None:
+                delay = max(delay, self.token_bucket.reserve(n_tokens, now))
+
+            self.n_requests += 1
+            if delay > 0:
+                self.n_delayed += 1
+                self.total_delay += delay
+                self.max_delay = max(self.max_delay, delay)
+        return delay
+
+    def acquire(self, n_tokens: int) -> float:
+        delay = self.reserve(n_tokens)
+        if delay > 0:
+            time.sleep(delay)
+        return delay
+
+    async def aacquire(self, n_tokens: int) -> float:
+        delay = self.reserve(n_tokens)
+        if delay > 0:
+            await asyncio.sleep(delay)
+        return delay
+
+    def settle(self, n_estimated_tokens: int, n_used_tokens: Optional[int]) -> None:
+        """
+        Give back the over-estimated tokens of a finished request, or take the under-estimated ones.
+        """
+        if self.token_bucket is None or n_used_tokens is None:
+            return None
+        with self.lock:
+            self.token_bucket.refund(n_estimated_tokens - n_used_tokens)
+        return None
+
+    @property
+    def stats(self) -> dict:
+        return {
+            "requests": self.n_requests,
+            "delayed": self.n_delayed,
+            "total_delay": self.total_delay,
+            "mean_delay": self.total_delay / self.n_requests if self.n_requests else 0.0,
+            "max_delay": self.max_delay,
+        }
+
+    def log_stats(self) -> None:
+        stats = self.stats
+        logger.info(
+            f"Rate limiter {self.name}: {stats['requests']} requests, {stats['delayed']} delayed; queueing delay "
+            f"{stats['total_delay']:.1f}s in total, {stats['mean_delay']:.2f}s on average, "
+            f"{stats['max_delay']:.2f}s at most."
+        )
+        return None
+
+
+def get_rate_limiter(
+    engine: str, requests_per_min: Optional[float] = None, tokens_per_min: Optional[float] = None
+) -> Optional[RateLimiter]:
+    """
+    Get the rate limiter of `engine` shared within the process, or `None` if neither limit is set.
+
+    The limits of the first call for an engine are kept.
+    """
+    if not requests_per_min and not tokens_per_min:
+        return None
+
+    with rate_limiters_lock:
+        limiter = rate_limiters.get(engine)
+        if limiter is None:
+            limiter = RateLimiter(engine, requests_per_min=requests_per_min, tokens_per_min=tokens_per_min)
+            rate_limiters[engine] = limiter
+    return limiter
+
+
+def count_tokens(text: str) -> int:
+    """
+    Rough token count of `text` at about 4 characters per token.
+    """
+    return len(text) // 4 + 1
+
+
+def estimate_prompt_tokens(request_kwargs: dict) -> int:
+    if "messages" in request_kwargs:
+        return sum(count_tokens(message["content"]) for message in request_kwargs["messages"])
+    return count_tokens(request_kwargs["prompt"])
+
+
+def estimate_tokens(request_kwargs: dict) -> int:
+    """
+    Upper estimate of the tokens a request counts against the quota: the prompt tokens plus the completion
+    budget `max_tokens`.
+    """
+    return estimate_prompt_tokens(request_kwargs) + (request_kwargs.get("max_tokens") or 0)
+
+
+def retry_delay(attempt: int, base_delay: float = 1.0, max_delay: float = 60.0, retry_after: float = None) -> float:
+    """
+    Full-jitter exponential backoff before retry `attempt` (0-based), no shorter than the server's `Retry-After`.
+    """
+    delay = backoff_rng.uniform(0, min(max_delay, base_delay * 2**attempt))
+    if retry_after is not None:
+        delay = max(delay, retry_after)
+    return delay
@@ -0,0 +1,97 @@
+"""
+# Author: Yinghao Li
+# Modified: October 16th, 2026
+# ---------------------------------------
+# Description: Per-call records of the GPT api calls and their per-game and per-run aggregates.
+"""
+
+import logging
+import numpy as np
+from collections import Counter
+from dataclasses import dataclass
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+__all__ = ["CallRecord", "summarize_calls", "summarize_run", "log_run_summary"]
+
+
+@dataclass
+class CallRecord:
+    """
+    Measurements of one `GPT` call.
+
+    `latency` is the wall-clock time from the request to the response, including the queueing delay of the rate
+    limiter and the retries. Token counts are those reported by the backend and are `None` for cached responses.
+    """
+
+    latency: float
+    queue_delay: float = 0.0
+    retries: int = 0
+    prompt_tokens: Optional[int] = None
+    completion_tokens: Optional[int] = None
+    finish_reason: Optional[str] = None
+    cached: bool = False
+
+    @property
+    def total_tokens(self) -> int:
+        return (self.prompt_tokens or 0) + (self.completion_tokens or 0)
+
+
+def summarize_calls(calls: list[CallRecord], n_valid_actions: Optional[int] = None) -> dict:
+    """
+    Totals of the calls of one game or task.
+    """
+    summary = {
+        "n_calls": len(calls),
+        "n_cached": sum(call.cached for call in calls),
+        "n_retries": sum(call.retries for call in calls),
+        "latency": sum(call.latency for call in calls),
+        "queue_delay": sum(call.queue_delay for call in calls),
+        "prompt_tokens": sum(call.prompt_tokens or 0 for call in calls),
+        "completion_tokens": sum(call.completion_tokens or 0 for call in calls),
+        "total_tokens": sum(call.total_tokens for call in calls),
+        "finish_reasons": dict(Counter(call.finish_reason for call in calls if call.finish_reason is not None)),
+    }
+    if n_valid_actions is not None:
+        summary["n_valid_actions"] = n_valid_actions
+    return summary
+
+
+def summarize_run(calls: list[CallRecord], game_summaries: list[dict]) -> dict:
+    """
+    Aggregate the calls and game summaries of a run: latency percentiles over the calls answered by the backend,
+    and tokens per game and per valid action.
+    """
+    latencies = [call.latency for call in calls if not call.cached]
+    total_tokens = sum(summary["total_tokens"] for summary in game_summaries)
+    n_valid_actions = sum(summary.get("n_valid_actions", 0) for summary in game_summaries)
+
+    return {
+        "n_games": len(game_summaries),
+        "n_calls": len(calls),
+        "n_cached": sum(call.cached for call in calls),
+        "n_retries": sum(call.retries for call in calls),
+        "latency_p50": float(np.percentile(latencies, 50)) if latencies else None,
+        "latency_p95": float(np.percentile(latencies, 95)) if latencies else None,
+        "queue_delay": sum(call.queue_delay for call in calls),
+        "prompt_tokens": sum(summary["prompt_tokens"] for summary in game_summaries),
+        "completion_tokens": sum(summary["completion_tokens"] for summary in game_summaries),
+        "tokens_per_game": total_tokens / len(game_summaries) if game_summaries else None,
+        "tokens_per_valid_action": total_tokens / n_valid_actions if n_valid_actions else None,
+        "finish_reasons": dict(Counter(call.finish_reason for call in calls if call.finish_reason is not None)),
+    }
+
+
+def log_run_summary(summary: dict) -> None:
+    def fmt(value, spec):
+        return "n/a" if value is None else format(value, spec)
+
+    logger.info(
+        f"GPT calls: {summary['n_calls']} in {summary['n_games']} games ({summary['n_cached']} cached, "
+        f"{summary['n_retries']} retries); latency p50 {fmt(summary['latency_p50'], '.2f')}s, "
+        f"p95 {fmt(summary['latency_p95'], '.2f')}s; {fmt(summary['tokens_per_game'], '.1f')} tokens per game, "
+        f"{fmt(summary['tokens_per_valid_action'], '.1f')} tokens per valid action; "
+        f"finish reasons {summary['finish_reasons']}."
+    )
+    return None
@@ -1,5 +1,12 @@
 from .board_understanding import BoardUnderstandingPrompt
 from .game_play_coordinate import GamePlayCoordinatePrompt
 from .game_play_table import GamePlayTablePrompt
+from .templates import get_prompt, clear_prompt_cache
 
-__all__ = ["BoardUnderstandingPrompt", "GamePlayCoordinatePrompt", "GamePlayTablePrompt"]
+__all__ = [
+    "BoardUnderstandingPrompt",
+    "GamePlayCoordinatePrompt",
+    "GamePlayTablePrompt",
+    "get_prompt",
+    "clear_prompt_cache",
+]
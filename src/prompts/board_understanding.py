@@ -1,3 +1,4 @@
+from functools import cached_property
 from src.game import MineField
 
 
@@ -31,7 +32,7 @@ class BoardUnderstandingPrompt:
         self.represent_board_as_coordinates = represent_board_as_coordinates
         self.with_row_column_ids = with_row_column_ids
 
-    @property
+    @cached_property
     def desc(self):
         if not self.represent_board_as_coordinates:
             description = f"You will be presented with a {self.n_rows} by {self.n_cols} board for the Minesweeper game."
@@ -56,7 +57,7 @@ class BoardUnderstandingPrompt:
 
         return description
 
-    @property
+    @cached_property
     def navigation_example1(self):
         if self.with_row_column_ids:
             example = f"""--- PARTIAL BOARD ---
@@ -81,7 +82,7 @@ ANSWER: `1'
 """
         return example
 
-    @property
+    @cached_property
     def navigation_dict_example1(self):
         example = f"""--- PARTIAL BOARD ---
 (1,1): {self.unchecked_cell}
@@ -106,7 +107,7 @@ ANSWER: \"1\""
 """
         return example
 
-    @property
+    @cached_property
     def navigation_example2(self):
         return f"""--- PARTIAL BOARD ---
 "0","1","2","3","4"
@@ -119,7 +120,7 @@ QUESTION: What is the cell at coordinate (4,1)?
 ANSWER: `{self.unchecked_cell}'
 """
 
-    @property
+    @cached_property
     def counting_example1(self):
         return f"""--- PARTIAL BOARD ---
 "0","1","2","3","4","5"
@@ -148,7 +149,7 @@ All of these neighboring cells are `{self.unchecked_cell}'. So, the number of ce
 ANSWER: 0.
 """
 
-    @property
+    @cached_property
     def counting_dict_example1(self):
         example = f"""--- PARTIAL BOARD ---
 (1,1): {self.flag_cell}
@@ -1,11 +1,12 @@
 """
 # Author: Yinghao Li
-# Modified: November 3rd, 2023
+# Modified: October 16th, 2026
 # ---------------------------------------
 # Description: Macro description of the game.
 """
 
 import math
+from functools import cached_property
 from src.game import MineField
 
 
@@ -19,6 +20,9 @@ class GamePlayCoordinatePrompt:
         n_cols: int = 9,
         n_mines: int = 10,
         mine_field: MineField = None,
+        coordinate_encoding: str = "full",
+        use_viewport: bool = False,
+        use_board_diff: bool = False,
         **kwargs,
     ):
         if mine_field is not None:
@@ -35,14 +39,30 @@ class GamePlayCoordinatePrompt:
             self.n_rows: int = n_rows
             self.n_cols: int = n_cols
             self.n_mines: int = n_mines
+        self.coordinate_encoding = coordinate_encoding
+        self.use_viewport = use_viewport
+        self.use_board_diff = use_board_diff
 
-    @property
+    @cached_property
     def wiki_game(self):
         desc = f"""--- MINESWEEPER INTRODUCTION ---
 In Minesweeper, {self.n_mines} hidden mines are scattered throughout a {self.n_rows} by {self.n_cols} board, which is divided into cells."""
 
         desc += f' The cells are presented as "coordinate: state" mappings. A coordinate (x,y) represents the element at the x-th row and y-th column in the board, where x and y, starting from 1, are the row and column indices, respectively.'
 
+        if self.coordinate_encoding == "opened":
+            desc += f' Only the opened and flagged cells are listed; all the other cells are unopened.'
+        elif self.coordinate_encoding == "rle":
+            desc += f' Each line lists a row, where consecutive cells with the same state are merged into "(x,y1)-(x,y2): state", covering the cells from column y1 to column y2 of row x.'
+        elif self.coordinate_encoding == "frontier":
+            desc += f" Only the flagged cells and the cells on the border between the opened and unopened areas are listed; the other cells are either unopened or surrounded by opened cells."
+
+        if self.use_viewport:
+            desc += f" Only the cells within the windows around the explored area are listed, and a summary line after them describes the cells outside of the windows."
+
+        if self.use_board_diff:
+            desc += f' After your actions, the board may be given as the cells that have changed since the last board you saw, listed as "(x,y): state" mappings; all the other cells remain unchanged.'
+
         desc += f""" Cells have multiple possible states:
 - Unopened cells (represented by \"{self.unchecked_cell}\", which cover the board at the start of the game, can also be made by removing flags)
 - Numbered cells (represented by \"1\" to \"8\", which indicate the number of mines in the eight neighboring cells, including those diagonally adjacent)
@@ -53,7 +73,7 @@ A player selects a cell to open it. If a player opens a cell containing a mine,
 """
         return desc
 
-    @property
+    @cached_property
     def action_options(self):
         desc = f"""--- ACTION OPTIONS ---
 There are three permissible actions in Minesweeper:
@@ -64,7 +84,7 @@ There are three permissible actions in Minesweeper:
 """
         return desc
 
-    @property
+    @cached_property
     def action_format(self):
         desc = f"""--- ACTION FORMAT ---
 Each of your actions should be formatted as \"A(row,col)\", where:
@@ -75,7 +95,7 @@ For instance, an action like \"L(1,2)\" translates to a left-click on the cell l
 """
         return desc
 
-    @property
+    @cached_property
     def action_regulation(self):
         desc = f"""please ensure:
 - You do not duplicate actions.
@@ -83,7 +103,7 @@ For instance, an action like \"L(1,2)\" translates to a left-click on the cell l
 """
         return desc
 
-    @property
+    @cached_property
     def init_response_guide(self):
         desc = f"""--- RESPONSE GUIDE ---
 Let's think step by step.
@@ -95,7 +115,7 @@ ACTION:
 """
         return desc
 
-    @property
+    @cached_property
     def response_guide(self):
         desc = f"""--- RESPONSE GUIDE ---
 Let's think step by step.
@@ -107,7 +127,7 @@ ACTION:
 """
         return desc
 
-    @property
+    @cached_property
     def example_1(self):
         desc = f"""Example 1:
 Notice that the board is displayed in partial.
@@ -136,7 +156,7 @@ ACTION: R(2,3)
 """
         return desc
 
-    @property
+    @cached_property
     def example_2(self):
         desc = f"""Example 2:
 Notice that the board is displayed in partial.
@@ -165,7 +185,7 @@ ACTION: M(1,5)
 """
         return desc
 
-    @property
+    @cached_property
     def example_3(self):
         desc = f"""Example 3:
 Notice that the board is displayed in partial.
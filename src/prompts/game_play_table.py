@@ -1,11 +1,12 @@
 """
 # Author: Yinghao Li
-# Modified: November 3rd, 2023
+# Modified: October 16th, 2026
 # ---------------------------------------
 # Description: Macro description of the game.
 """
 
 import math
+from functools import cached_property
 from src.game import MineField
 
 
@@ -20,6 +21,8 @@ class GamePlayTablePrompt:
         n_mines: int = 10,
         mine_field: MineField = None,
         with_row_column_ids: bool = True,
+        use_viewport: bool = False,
+        use_board_diff: bool = False,
     ):
         if mine_field is not None:
             self.unchecked_cell = mine_field.unchecked_cell
@@ -36,16 +39,23 @@ class GamePlayTablePrompt:
             self.n_cols: int = n_cols
             self.n_mines: int = n_mines
         self.with_row_column_ids = with_row_column_ids
+        self.use_viewport = use_viewport
+        self.use_board_diff = use_board_diff
 
-    @property
+    @cached_property
     def wiki_game(self):
         desc = f"""--- MINESWEEPER INTRODUCTION ---
 In Minesweeper, {self.n_mines} hidden mines are scattered throughout a {self.n_rows} by {self.n_cols} board, which is divided into cells."""
         desc += " The rows are seperated by newlines, and columns by commas."
 
-        if self.with_row_column_ids:
+        if self.use_viewport:
+            desc += f" Only the windows around the explored area are shown, each structured as a table whose first row and column are labeled using numbers in double quotation marks to indicate the actual row and column indices in the board. A summary line after the windows describes the cells outside of them."
+        elif self.with_row_column_ids:
             desc += f" The board is structured as a {self.n_rows+1} by {self.n_cols+1} table, with the first row and column labeled using numbers in double quotation marks to indicate row and column indices."
 
+        if self.use_board_diff:
+            desc += f' After your actions, the board may be given as the cells that have changed since the last board you saw, listed as "(x,y): state" mappings; all the other cells remain unchanged.'
+
         desc += f""" Cells have multiple possible states:
 - Unopened cells (represented by `{self.unchecked_cell}', which cover the board at the start of the game, can also be made by removing flags)
 - Numbered cells (represented by `1' to `8', which indicate the number of mines in the eight neighboring cells, including those diagonally adjacent)
@@ -56,7 +66,7 @@ A player selects a cell to open it. If a player opens a cell containing a mine,
 """
         return desc
 
-    @property
+    @cached_property
     def action_options(self):
         desc = f"""--- ACTION OPTIONS ---
 There are three permissible actions in Minesweeper:
@@ -67,7 +77,7 @@ There are three permissible actions in Minesweeper:
 """
         return desc
 
-    @property
+    @cached_property
     def action_format(self):
         desc = f"""--- ACTION FORMAT ---
 Each of your actions should be formatted as \"A(row,col)\", where:
@@ -78,7 +88,7 @@ For instance, an action like \"L(1,2)\" translates to a left-click on the cell l
 """
         return desc
 
-    @property
+    @cached_property
     def action_regulation(self):
         desc = f"""please ensure:
 - You do not duplicate actions.
@@ -86,7 +96,7 @@ For instance, an action like \"L(1,2)\" translates to a left-click on the cell l
 """
         return desc
 
-    @property
+    @cached_property
     def init_response_guide(self):
         desc = f"""--- RESPONSE GUIDE ---
 Let's think step by step.
@@ -98,7 +108,7 @@ ACTION:
 """
         return desc
 
-    @property
+    @cached_property
     def response_guide(self):
         desc = f"""--- RESPONSE GUIDE ---
 Let's think step by step.
@@ -110,7 +120,7 @@ ACTION:
 """
         return desc
 
-    @property
+    @cached_property
     def example_1(self):
         desc = f"""Example 1:
 Notice that the board is displayed in partial.
@@ -128,7 +138,7 @@ ACTION: R(2,3)
 """
         return desc
 
-    @property
+    @cached_property
     def example_2(self):
         desc = f"""Example 2:
 Notice that the board is displayed in partial.
@@ -146,7 +156,7 @@ ACTION: M(1,5)
 """
         return desc
 
-    @property
+    @cached_property
     def example_3(self):
         desc = f"""Example 3:
 Notice that the board is displayed in partial.
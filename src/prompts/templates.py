@@ -0,0 +1,52 @@
+"""
+# Author: Yinghao Li
+# Modified: October 16th, 2026
+# ---------------------------------------
+# Description: Process-wide cache of prompt templates.
+"""
+
+import threading
+import logging
+from src.game import MineField
+
+logger = logging.getLogger(__name__)
+
+__all__ = ["get_prompt", "clear_prompt_cache"]
+
+# board attributes read by the prompt classes from `mine_field`
+board_attributes = ("unchecked_cell", "flag_cell", "empty_cell", "n_rows", "n_cols", "n_mines")
+
+# (prompt class, arguments) -> prompt instance
+prompt_cache = dict()
+prompt_cache_lock = threading.Lock()
+
+
+def get_prompt(prompt_cls, mine_field: MineField = None, **kwargs):
+    """
+    Get a prompt instance shared by all games with the same symbols, board size and prompt flags.
+
+    The prompt properties only depend on the constructor arguments and are cached by the instance after the
+    first access, so each static prompt segment is rendered once per process and argument set.
+
+    Parameters
+    ----------
+    prompt_cls: one of the prompt classes, e.g., `GamePlayTablePrompt`
+    mine_field: the game whose symbols and board size are used
+    kwargs: the other constructor arguments
+    """
+    if mine_field is not None:
+        kwargs = {**{attr: getattr(mine_field, attr) for attr in board_attributes}, **kwargs}
+    key = (prompt_cls, tuple(sorted(kwargs.items())))
+
+    with prompt_cache_lock:
+        prompt = prompt_cache.get(key)
+        if prompt is None:
+            prompt = prompt_cls(**kwargs)
+            prompt_cache[key] = prompt
+    return prompt
+
+
+def clear_prompt_cache() -> None:
+    with prompt_cache_lock:
+        prompt_cache.clear()
+    return None
@@ -1,15 +1,22 @@
+import os
 import os.path as osp
 import sys
 import logging
 import glob
+import asyncio
 from tqdm.auto import tqdm
 from datetime import datetime
+from typing import Optional
+from dataclasses import asdict
 
 from src.argparser import ArgumentParser
 from src.args import Arguments, Config
 from src.io import set_logging, init_dir, save_json
 from src.interaction import Interaction
-from src.game import ActionFeedback
+from src.cache import get_response_cache
+from src.limiter import rate_limiters
+from src.metrics import summarize_calls, summarize_run, log_run_summary
+from src.journal import read_journal, save_checkpoint, load_checkpoint
 
 logger = logging.getLogger(__name__)
 
@@ -21,36 +28,167 @@ def main(args: Arguments):
     else:
         board_paths = [config.board_path_or_dir]
 
-    for board_path in tqdm(board_paths):
+    games = list()
+    for board_path in board_paths:
         output_path = osp.join(config.output_dir, f"{osp.basename(board_path)}")
 
         if osp.exists(output_path):
             logger.warning(f"Output file {output_path} already exists! Skipping...")
             continue
+        if config.gpt_backend == "replay" and not osp.exists(osp.join(config.replay_dir, osp.basename(board_path))):
+            logger.warning(f"No recorded game of {board_path} in {config.replay_dir}! Skipping...")
+            continue
+        games.append((board_path, output_path))
+
+    if config.n_concurrent_games > 1:
+        run_calls, game_summaries = asyncio.run(play_games_concurrently(games, config))
+        log_gpt_stats(config, run_calls, game_summaries)
+        return None
 
-        interaction = Interaction(board_path=board_path, **config.as_dict())
-        responses = list()
-        for _ in range(config.max_steps):
+    run_calls = list()
+    game_summaries = list()
+    for board_path, output_path in tqdm(games):
+        interaction = start_game(board_path, output_path, config)
+        while interaction.step_idx <= config.max_steps and not interaction.is_over:
             try:
-                response = interaction.step()
-                responses.append(response)
+                interaction.step()
             except ValueError:
                 logger.error("Exiting due to invalid response format!")
                 break
+            checkpoint_game(interaction, output_path, config)
 
-            if interaction.action_feedback in (ActionFeedback.GAME_WIN, ActionFeedback.GAME_OVER):
-                break
+        game_summaries.append(save_game(interaction, output_path, config))
+        run_calls += interaction.gpt.calls
+
+    log_gpt_stats(config, run_calls, game_summaries)
+    return None
+
+
+async def play_games_concurrently(games: list[tuple[str, str]], config: Config) -> tuple[list, list[dict]]:
+    """
+    Play up to `config.n_concurrent_games` games at a time; the steps of each game stay sequential.
+
+    Returns the GPT call records and call summaries of the finished games.
+    """
+    semaphore = asyncio.BoundedSemaphore(config.n_concurrent_games)
+    progress_bar = tqdm(total=len(games))
+
+    async def play_game(board_path: str, output_path: str) -> tuple[list, dict]:
+        async with semaphore:
+            interaction = start_game(board_path, output_path, config)
+            while interaction.step_idx <= config.max_steps and not interaction.is_over:
+                try:
+                    await interaction.astep()
+                except ValueError:
+                    logger.error(f"Exiting {board_path} due to invalid response format!")
+                    break
+                checkpoint_game(interaction, output_path, config)
+
+            # save each game as soon as it finishes
+            game_summary = save_game(interaction, output_path, config)
+            progress_bar.update()
+        return interaction.gpt.calls, game_summary
+
+    # a failed game is logged without cancelling the others, and is resumed in the next run
+    results = await asyncio.gather(*(play_game(*game) for game in games), return_exceptions=True)
+    run_calls = list()
+    game_summaries = list()
+    for (board_path, _), result in zip(games, results):
+        if isinstance(result, Exception):
+            logger.error(f"Game on {board_path} failed: {result!r}")
+            continue
+        run_calls += result[0]
+        game_summaries.append(result[1])
+    progress_bar.close()
+    return run_calls, game_summaries
+
+
+def log_gpt_stats(config: Config, run_calls: list, game_summaries: list[dict]) -> None:
+    # the games share the process-wide response cache and rate limiters
+    cache = get_response_cache(config.gpt_cache_path)
+    if cache is not None:
+        cache.log_stats()
+    for rate_limiter in rate_limiters.values():
+        rate_limiter.log_stats()
+
+    if not game_summaries:
+        return None
+    run_summary = summarize_run(run_calls, game_summaries)
+    log_run_summary(run_summary)
+    if config.run_summary_path is not None:
+        save_json(run_summary, config.run_summary_path, collapse_level=2)
+    return None
+
+
+def journal_path(output_path: str, config: Config) -> Optional[str]:
+    """
+    Path of the journal of the game saved to `output_path`, or `None` without journals.
+    """
+    if not config.save_journal:
+        return None
+    return f"{osp.splitext(output_path)[0]}.jsonl"
+
+
+def checkpoint_path(output_path: str) -> str:
+    return f"{osp.splitext(output_path)[0]}.ckpt"
+
+
+def start_game(board_path: str, output_path: str, config: Config) -> Interaction:
+    """
+    Create the interaction of a game, resumed from the checkpoint and the journal of an interrupted run if any.
+    """
+    path = journal_path(output_path, config)
+    records = list()
+    checkpoint = None
+    if config.resume_games:
+        # read before the interaction starts the journal over
+        if path is not None and osp.exists(path):
+            records = read_journal(path)
+        if osp.exists(checkpoint_path(output_path)):
+            checkpoint = load_checkpoint(checkpoint_path(output_path))
+
+    interaction = Interaction(board_path=board_path, journal_path=path, **config.as_dict())
+    if checkpoint is not None or records:
+        n_steps = interaction.resume(checkpoint, records)
+        logger.info(f"Resumed the game on {board_path} after step {n_steps}.")
+    return interaction
+
+
+def checkpoint_game(interaction: Interaction, output_path: str, config: Config) -> None:
+    """
+    Save a checkpoint of an unfinished game every `config.checkpoint_interval` steps.
+    """
+    interval = config.checkpoint_interval
+    if interval > 0 and not interaction.is_over and (interaction.step_idx - 1) % interval == 0:
+        save_checkpoint(interaction.checkpoint(), checkpoint_path(output_path))
+    return None
+
+
+def save_game(interaction: Interaction, output_path: str, config: Config) -> dict:
+    """
+    Save a finished game with its per-step GPT call records, and return the summary of the calls.
 
-        output_dict = {
-            "conversation": str(interaction.messages),
-            "action_history": interaction.action_history,
-            "responses": responses,
-        }
-        init_dir(config.output_dir, clear_original_content=False)
-        save_json(output_dict, output_path, collapse_level=3)
+    The plain-text transcript is the `conversation` of the output; `assist/journal_transcript.py` writes it to a
+    `.txt` file from the output or the journal on demand.
+    """
+    interaction.close_journal()
+    call_summary = summarize_calls(interaction.gpt.calls, n_valid_actions=interaction.n_valid_actions)
+    output_dict = {
+        "conversation": str(interaction.messages),
+        "action_history": interaction.action_history,
+        "responses": interaction.responses,
+        "board_modes": interaction.board_modes,
+        "context_prunings": interaction.context_prunings,
+        "calls": [asdict(call) for call in interaction.gpt.calls],
+        "call_summary": call_summary,
+    }
+    init_dir(config.output_dir, clear_original_content=False)
+    save_json(output_dict, output_path, collapse_level=3)
 
-        with open(output_path.replace(".json", ".txt"), "w", encoding="utf-8") as f:
-            f.write(str(interaction.messages))
+    # the output supersedes the checkpoint
+    if osp.exists(checkpoint_path(output_path)):
+        os.remove(checkpoint_path(output_path))
+    return call_summary
 
 
 if __name__ == "__main__":
@@ -1,37 +1,32 @@
 """
 # Author: Yinghao Li
-# Modified: November 8th, 2023
+# Modified: October 16th, 2026
 # ---------------------------------------
 # Description: Test table understanding on cell content retrieval.
 """
 
 import os.path as osp
-import re
 import json
 import sys
 import logging
 import glob
 import random
 import numpy as np
-import time
 from datetime import datetime
+from typing import Optional
 from dataclasses import dataclass, field
 from tqdm.auto import tqdm
 
 from src.argparser import ArgumentParser
 from src.io import set_logging, logging_args, init_dir, save_json
-from src.game import MineField, ActionFeedback
+from src.game import count_neighbors, replay_histories
 from src.gpt import GPT, MessageCache
-from src.prompts import BoardUnderstandingPrompt
+from src.cache import get_response_cache
+from src.batch import BATCH_MODES, write_batch_requests, read_batch_results
+from src.prompts import BoardUnderstandingPrompt, get_prompt
 
 logger = logging.getLogger(__name__)
 
-action_type_map = {
-    "L": "left_click",
-    "M": "middle_click",
-    "R": "right_click",
-}
-
 
 @dataclass
 class Arguments:
@@ -47,6 +42,39 @@ class Arguments:
     gpt_resource_path: str = field(
         default="./resources/gpt35.16k.json", metadata={"help": "path to the GPT resource file."}
     )
+    gpt_cache_path: str = field(
+        default=None, metadata={"help": "path to the SQLite cache of GPT responses. No caching if not specified."}
+    )
+    gpt_cache_mode: str = field(
+        default="readwrite", metadata={"help": "response cache mode: `readwrite`, `readonly` or `bypass`."}
+    )
+    gpt_cache_max_age_days: Optional[float] = field(
+        default=None, metadata={"help": "drop cached responses older than this number of days."}
+    )
+    gpt_cache_max_size_mb: Optional[float] = field(
+        default=None, metadata={"help": "drop the least recently used responses beyond this cache size."}
+    )
+    gpt_requests_per_min: Optional[float] = field(
+        default=None, metadata={"help": "request quota per minute shared by all GPT calls of the process."}
+    )
+    gpt_tokens_per_min: Optional[float] = field(
+        default=None, metadata={"help": "token quota per minute shared by all GPT calls of the process."}
+    )
+    gpt_max_retries: int = field(
+        default=5, metadata={"help": "number of retries of a GPT call failed by rate limits or timeouts."}
+    )
+    gpt_retry_base_delay: float = field(
+        default=1.0, metadata={"help": "base delay in seconds of the jittered exponential retry backoff."}
+    )
+    batch_mode: str = field(
+        default=None,
+        metadata={
+            "help": "`export` to write the GPT requests to `batch_requests_path`, or `ingest` to read the responses "
+            "from `batch_results_path`. Call the api online if not specified."
+        },
+    )
+    batch_requests_path: str = field(default=None, metadata={"help": "where to write the batch request file."})
+    batch_results_path: str = field(default=None, metadata={"help": "the batch result file to read responses from."})
     n_sample_per_board: int = field(
         default=3, metadata={"help": "number of sampled progress board per original board."}
     )
@@ -56,44 +84,65 @@ class Arguments:
     use_row_column_indices: bool = field(default=False, metadata={"help": "whether to use row and column indices."})
     use_examples: bool = field(default=False, metadata={"help": "whether to use an example."})
     seed: int = field(default=42, metadata={"help": "Random seed."})
+    replay_cache_dir: str = field(
+        default=None, metadata={"help": "where to cache the replayed game states. No caching if not specified."}
+    )
 
 
 def main(args: Arguments):
+    if args.batch_mode is not None and args.batch_mode not in BATCH_MODES:
+        raise ValueError(f"Unknown batch mode: {args.batch_mode}")
+
     random.seed(args.seed)
     init_dir(osp.dirname(args.output_path), clear_original_content=False)
 
-    gpt = GPT(resource_path=args.gpt_resource_path)
+    cache = get_response_cache(
+        args.gpt_cache_path, args.gpt_cache_mode, args.gpt_cache_max_age_days, args.gpt_cache_max_size_mb
+    )
+    gpt = GPT(
+        resource_path=args.gpt_resource_path,
+        cache=cache,
+        requests_per_min=args.gpt_requests_per_min,
+        tokens_per_min=args.gpt_tokens_per_min,
+        max_retries=args.gpt_max_retries,
+        retry_base_delay=args.gpt_retry_base_delay,
+    )
 
     result_list = list()
+    batch_requests = list()
+    batch_results = read_batch_results(args.batch_results_path) if args.batch_mode == "ingest" else None
 
-    for board_path in tqdm(glob.glob(osp.join(args.data_dir, "*"))):
-        if not board_path.endswith(".json"):
-            continue
+    board_paths = [path for path in glob.glob(osp.join(args.data_dir, "*")) if path.endswith(".json")]
+    action_histories = list()
+    for board_path in board_paths:
         with open(board_path, "r", encoding="utf-8") as f:
             board_dict = json.load(f)
+        action_histories.append(board_dict["action_history"][: board_dict["n_actions"]])
+
+    # replay all boards to their n_actions at once
+    replays = replay_histories(board_paths, action_histories, cache_dir=args.replay_cache_dir)
 
-        # load the board
-        m = MineField()
-        m.load_board(board_path, load_action_history=True)
+    for replay in tqdm(replays):
+        # load the board at n_actions
+        m = replay.mine_field(-1)
 
-        # get the board at n_actions
-        for action_idx in range(board_dict["n_actions"]):
-            action = parse_action_str(m.action_history[action_idx])
-            getattr(m, f"on_{action_type_map[action[0]]}")(*action[1:])
+        # neighbor counts of every candidate symbol over the whole board.
+        # The original per-cell sums take the 3x3 window at 0-based (x, y) for the 1-based coordinate (x, y);
+        # padding one zero row and column keeps that ground truth, including the clipped last row and column.
+        target_symbols = [m.flag_cell, m.empty_cell, "1", "2"]
+        board_disp = np.pad(m.board_disp, ((0, 1), (0, 1)), constant_values="")
+        neighbor_counts = {symbol: count_neighbors(board_disp == symbol) for symbol in target_symbols}
 
-        for _ in range(args.n_sample_per_board):
+        for sample_idx in range(args.n_sample_per_board):
             # randomly sample a cell coordinate to ask
             x, y = random.randint(1, m.n_rows), random.randint(1, m.n_cols)
-            target_symbol = random.choice([m.flag_cell, m.empty_cell, "1", "2"])
+            target_symbol = random.choice(target_symbols)
 
-            r_start = max(x - 1, 0)
-            r_end = min(x + 2, m.n_rows)
-            c_start = max(y - 1, 0)
-            c_end = min(y + 2, m.n_cols)
-            ground_truth = int(np.sum(m.board_disp[r_start:r_end, c_start:c_end] == target_symbol))
+            ground_truth = int(neighbor_counts[target_symbol][x, y])
 
             # initialize the prompt
-            prompt = BoardUnderstandingPrompt(
+            prompt = get_prompt(
+                BoardUnderstandingPrompt,
                 mine_field=m,
                 represent_board_as_coordinates=args.use_coordinate_representation,
                 with_row_column_ids=args.use_row_column_indices,
@@ -125,7 +174,17 @@ def main(args: Arguments):
             )
             message_cache.add_user_message(user_message)
 
-            response = gpt.response(message_cache)
+            # stable across runs as long as the data and the seed are unchanged
+            custom_id = f"{osp.splitext(osp.basename(replay.board_path))[0]}-{sample_idx}"
+            if args.batch_mode == "export":
+                batch_requests.append((custom_id, gpt.request_kwargs(message_cache.content)))
+                continue
+            if args.batch_mode == "ingest":
+                if custom_id not in batch_results:
+                    logger.warning(f"No result of request {custom_id} in {args.batch_results_path}.")
+                response = batch_results.get(custom_id)
+            else:
+                response = gpt.response(message_cache)
 
             result_list.append(
                 {
@@ -133,21 +192,17 @@ def main(args: Arguments):
                     "ground_truth": ground_truth,
                 }
             )
-            time.sleep(1)
-
-    save_json(result_list, args.output_path, collapse_level=3)
 
+    if args.batch_mode == "export":
+        write_batch_requests(batch_requests, args.batch_requests_path)
+        return None
 
-def parse_action_str(action_str: str) -> str:
-    action_str = action_str.strip()
-    match_result = re.search(r"([LMR]) *\(( *\d+) *, *(\d+) *\)", action_str)
-    try:
-        action, row_idx, col_idx = match_result.groups()
-    except (AttributeError, TypeError):
-        # TODO: this can be improved to provide feedback to GPT
-        raise ValueError("Invalid response format.")
+    save_json(result_list, args.output_path, collapse_level=3)
 
-    return action, int(row_idx), int(col_idx)
+    if cache is not None:
+        cache.log_stats()
+    if gpt.rate_limiter is not None:
+        gpt.rate_limiter.log_stats()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,75 @@
+"""
+# Author: Yinghao Li
+# Modified: October 17th, 2026
+# ---------------------------------------
+# Description: Pinned messages of the context policies.
+"""
+
+import pytest
+
+from src.context import DropBoardsPolicy, CONTEXT_POLICIES, N_PINNED_MESSAGES
+from src.limiter import count_tokens
+
+BOARD = "--- CURRENT BOARD ---\n```\n" + "\n".join(["? ? ? ? ?"] * 5) + "\n```\n\n"
+DIFF = "--- CHANGED CELLS ---\n```\n(2,3): ? -> 1\n```\n\n"
+
+
+def build_messages(n_turns: int, board_modes: str = None) -> list[dict[str, str]]:
+    """
+    `board_modes` has an `f` (full board) or a `d` (changed cells) per turn; all boards are full by default.
+    """
+    board_modes = board_modes if board_modes is not None else "f" * n_turns
+    messages = [
+        {"role": "system", "content": "You are a helpful assistant."},
+        {"role": "user", "content": f"Rules of the game.\n{BOARD}Your first action?"},
+    ]
+    for mode in board_modes[:n_turns]:
+        messages.append({"role": "assistant", "content": "REASONING: safe.\nACTION: L(1,1)"})
+        messages.append({"role": "user", "content": f"{BOARD if mode == 'f' else DIFF}Your next action?"})
+    return messages
+
+
+def test_drop_boards_keeps_the_pinned_messages():
+    messages = build_messages(6)
+    n_tokens = [count_tokens(message["content"]) for message in messages]
+    # tight enough to strip every unpinned board before the latest one
+    policy = DropBoardsPolicy(max_tokens=sum(n_tokens) // 2)
+
+    kept, record = policy.prune(messages, n_tokens)
+
+    assert kept[:N_PINNED_MESSAGES] == messages[:N_PINNED_MESSAGES]
+    assert all(idx >= N_PINNED_MESSAGES for idx in record["dropped_boards"])
+    assert record["dropped_boards"]
+    assert kept[-1] == messages[-1]
+
+
+@pytest.mark.parametrize("policy_name", list(CONTEXT_POLICIES))
+def test_prune_keeps_the_board_of_the_changed_cells(policy_name):
+    messages = build_messages(12, board_modes="ffffffffdddd")
+    n_tokens = [count_tokens(message["content"]) for message in messages]
+    reference_idx = N_PINNED_MESSAGES + 2 * 7 + 1
+    # room for the turns since the latest full board, but not for all the turns before it
+    budget = sum(n_tokens[:N_PINNED_MESSAGES]) + sum(n_tokens[reference_idx - 1 :]) + 100
+    policy = CONTEXT_POLICIES[policy_name](max_tokens=budget)
+
+    kept, record = policy.prune(messages, n_tokens)
+
+    assert record["reference_board"] == reference_idx
+    assert not record["over_budget"]
+    assert all(idx < reference_idx - 1 for idx in record["dropped_messages"])
+    assert record["dropped_messages"]
+    assert kept[-2 * 4 - 2 :] == messages[reference_idx - 1 :]
+
+
+@pytest.mark.parametrize("policy_name", list(CONTEXT_POLICIES))
+def test_prune_reports_changed_cells_over_the_budget(policy_name):
+    messages = build_messages(6, board_modes="fddddd")
+    n_tokens = [count_tokens(message["content"]) for message in messages]
+    # too tight even for the turns since the latest full board
+    policy = CONTEXT_POLICIES[policy_name](max_tokens=sum(n_tokens[:N_PINNED_MESSAGES]))
+
+    kept, record = policy.prune(messages, n_tokens)
+
+    assert record["reference_board"] == N_PINNED_MESSAGES + 1
+    assert record["over_budget"]
+    assert kept[-2 * 5 - 1 :] == messages[N_PINNED_MESSAGES + 1 :]
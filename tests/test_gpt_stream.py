@@ -0,0 +1,66 @@
+"""
+# Author: Yinghao Li
+# Modified: October 17th, 2026
+# ---------------------------------------
+# Description: Retries of streamed GPT responses.
+"""
+
+import json
+import asyncio
+import openai
+
+from src.gpt import GPT, EARLY_STOP
+from src.backend import Backend
+from src.interaction import ActionLineDetector
+
+
+class FlakyStreamBackend(Backend):
+    """
+    Fails the first stream after a partial action, then streams the complete response.
+    """
+
+    cacheable = False
+
+    def __init__(self):
+        self.n_streams = 0
+
+    def stream(self, request_kwargs: dict):
+        self.n_streams += 1
+        if self.n_streams == 1:
+            yield "REASONING: (2,3) is safe.\nACTION: L(2,", None
+            raise openai.error.Timeout("stream interrupted")
+        for delta in ["3) has no mine around, so reveal another cell.\n", "ACTION: L(4,5)", "\nDone."]:
+            yield delta, None
+        yield "", "stop"
+
+    async def astream(self, request_kwargs: dict):
+        for chunk in self.stream(request_kwargs):
+            yield chunk
+
+
+def build_gpt(tmp_path) -> GPT:
+    resource_path = tmp_path / "resources.json"
+    resource_path.write_text(json.dumps({"engine": "gpt-test"}))
+    return GPT(resource_path=str(resource_path), backend=FlakyStreamBackend(), retry_base_delay=0.0)
+
+
+def test_stream_retry_starts_a_fresh_detector(tmp_path):
+    gpt = build_gpt(tmp_path)
+    messages = [{"role": "user", "content": "play"}]
+
+    response = gpt.stream_response(messages, lambda: ActionLineDetector().feed)
+
+    assert response == "3) has no mine around, so reveal another cell.\nACTION: L(4,5)"
+    assert gpt.calls[-1].retries == 1
+    assert gpt.calls[-1].finish_reason == EARLY_STOP
+
+
+def test_async_stream_retry_starts_a_fresh_detector(tmp_path):
+    gpt = build_gpt(tmp_path)
+    messages = [{"role": "user", "content": "play"}]
+
+    response = asyncio.run(gpt.astream_response(messages, lambda: ActionLineDetector().feed))
+
+    assert response == "3) has no mine around, so reveal another cell.\nACTION: L(4,5)"
+    assert gpt.calls[-1].retries == 1
+    assert gpt.calls[-1].finish_reason == EARLY_STOP